@@ -0,0 +1,128 @@
+"""Throughput of the archive engine on a mixed tree.
+
+Generates a tree of ``--size-gb`` gigabytes mixing compressible text, random
+(incompressible) data and many small files, plus a few members larger than the
+spool threshold, then archives it twice per format: once with the former single
+threaded ``zipfile.ZipFile.write`` loop (deflate) or ``tarfile`` ``w:gz``, once with
+``build_archive`` for each worker count. The default size keeps a run short; the
+figure quoted in the README uses ``--size-gb 10``.
+
+Usage:
+    poetry run python -m benchmarks.bench_archive --size-gb 10 --workers 1 4 8
+"""
+
+import argparse
+import os
+import random
+import tarfile
+import tempfile
+import time
+import zipfile
+from typing import Any, Callable, Tuple
+
+# Importing the tools builds the LLM configuration; no request is sent.
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+# pylint: disable=wrong-import-position
+from src.tools.archive import build_archive
+from src.tools.traversal import iter_files
+
+WORDS = b"log error warning request user file folder agent search index cache ".split()
+
+
+def _text(size: int, rng: random.Random) -> bytes:
+    words = []
+    total = 0
+    while total < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        total += len(word) + 1
+    return b" ".join(words)[:size]
+
+
+def make_tree(root: str, size: int, seed: int = 0) -> None:
+    """Creates a mixed tree of about `size` bytes below `root`."""
+    rng = random.Random(seed)
+    text_block = _text(1024 * 1024, rng)
+    written = 0
+    folder = 0
+    while written < size:
+        directory = os.path.join(root, f"d{folder // 50}", f"s{folder % 50}")
+        os.makedirs(directory, exist_ok=True)
+        # Many small text files, a few medium random files, one large text file
+        for i in range(100):
+            with open(os.path.join(directory, f"small{i}.txt"), "wb") as file:
+                file.write(text_block[: rng.randint(200, 8000)])
+                written += file.tell()
+        for i in range(4):
+            with open(os.path.join(directory, f"blob{i}.bin"), "wb") as file:
+                file.write(os.urandom(rng.randint(256, 2048) * 1024))
+                written += file.tell()
+        with open(os.path.join(directory, "large.log"), "wb") as file:
+            for _ in range(rng.randint(8, 32)):
+                file.write(text_block)
+            written += file.tell()
+        folder += 1
+
+
+def zip_baseline(source: str, archive: str) -> None:
+    """The former implementation, recursive: one thread, member after member."""
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        for path in iter_files(source):
+            zf.write(path, os.path.relpath(path, source))
+
+
+def tar_baseline(source: str, archive: str) -> None:
+    """Single threaded tar.gz through `tarfile`."""
+    with tarfile.open(archive, "w:gz", compresslevel=6) as tar:
+        for path in iter_files(source):
+            tar.add(path, os.path.relpath(path, source))
+
+
+def timed(function: Callable[..., Any], *args, **kwargs) -> Tuple[float, Any]:
+    """Runs `function` once and returns the elapsed seconds and its result."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    """Times the baseline and each worker count for every archive format."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", help="Archive an existing tree instead")
+    parser.add_argument("--size-gb", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--formats", nargs="+", default=["zip", "tar.gz"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        source = args.path
+        if source is None:
+            source = os.path.join(scratch, "tree")
+            make_tree(source, int(args.size_gb * 2**30))
+        total = sum(os.path.getsize(path) for path in iter_files(source))
+        print(f"tree: {source} ({total / 2**20:.0f} MiB)")
+
+        for archive_format in args.formats:
+            archive = os.path.join(scratch, f"out.{archive_format}")
+            baseline = zip_baseline if archive_format == "zip" else tar_baseline
+            elapsed, _ = timed(baseline, source, archive)
+            size = os.path.getsize(archive)
+            print(
+                f"{archive_format:6s} baseline     {elapsed:8.2f}s  "
+                f"{total / 2**20 / elapsed:8.1f} MiB/s  ratio {size / total:.3f}"
+            )
+            for workers in args.workers:
+                elapsed, stats = timed(
+                    build_archive, source, archive, archive_format, workers=workers
+                )
+                print(
+                    f"{archive_format:6s} workers={workers:<3d}  {elapsed:8.2f}s  "
+                    f"{total / 2**20 / elapsed:8.1f} MiB/s  "
+                    f"ratio {stats['ratio']:.3f}"
+                )
+            os.remove(archive)
+
+
+if __name__ == "__main__":
+    main()
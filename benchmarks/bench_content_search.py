@@ -0,0 +1,89 @@
+"""Throughput of the parallel content search as the worker count grows.
+
+Generates a synthetic tree of text files, a fraction of which contain the keyword,
+and runs ``parallel_search`` over it with an increasing number of workers. The tree
+is searched once before timing so that every run reads from the page cache; pass an
+existing directory with ``--path`` to measure a cold or remote file system instead.
+
+Usage:
+    poetry run python -m benchmarks.bench_content_search --files 2000 --size 262144
+"""
+
+import functools
+import os
+import random
+import time
+
+# Importing the tools builds the LLM configuration; no request is sent.
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from benchmarks.common import (  # pylint: disable=wrong-import-position
+    benchmark_parser,
+    benchmark_tree,
+)
+from src.tools.content_search import (  # pylint: disable=wrong-import-position
+    parallel_search,
+)
+from src.tools.traversal import iter_files  # pylint: disable=wrong-import-position
+
+KEYWORD = b"needle-in-the-haystack"
+
+
+def make_tree(root: str, files: int, size: int, hit_ratio: float) -> None:
+    """Writes `files` text files of `size` bytes spread over 32 directories."""
+    rng = random.Random(0)
+    line = b"lorem ipsum dolor sit amet, consectetur adipiscing elit\n"
+    body = (line * (size // len(line) + 1))[:size]
+    for i in range(files):
+        directory = os.path.join(root, f"dir{i % 32:02d}")
+        os.makedirs(directory, exist_ok=True)
+        data = body
+        if rng.random() < hit_ratio:
+            # Put the keyword near the end so the whole file is read
+            data = body[: -len(KEYWORD) - 1] + KEYWORD + b"\n"
+        with open(os.path.join(directory, f"file{i:06d}.txt"), "wb") as file:
+            file.write(data)
+
+
+def run(path: str, workers: int, executor: str) -> tuple:
+    """Returns the elapsed time and the number of matches for one search."""
+    start = time.perf_counter()
+    found = parallel_search(
+        iter_files(path), KEYWORD, workers=workers, executor=executor
+    )
+    return time.perf_counter() - start, len(found)
+
+
+def main() -> None:
+    """Runs the benchmark and prints throughput per worker count."""
+    parser = benchmark_parser(__doc__, "search an existing tree instead")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=256 * 1024)
+    parser.add_argument("--hit-ratio", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    make = functools.partial(
+        make_tree, files=args.files, size=args.size, hit_ratio=args.hit_ratio
+    )
+    with benchmark_tree(args.path, make) as path:
+        total_bytes = sum(os.path.getsize(p) for p in iter_files(path))
+        run(path, max(args.workers), args.executor)  # warm the page cache
+
+        print(
+            f"tree: {path} ({total_bytes / 2**20:.0f} MiB), executor: {args.executor}"
+        )
+        baseline = None
+        for workers in args.workers:
+            elapsed, matches = run(path, workers, args.executor)
+            baseline = baseline or elapsed
+            print(
+                f"workers={workers:3d}  {elapsed:7.3f}s  "
+                f"{total_bytes / 2**20 / elapsed:9.1f} MiB/s  "
+                f"speed-up {baseline / elapsed:5.2f}x  matches={matches}"
+            )
+
+
+if __name__ == "__main__":
+    main()
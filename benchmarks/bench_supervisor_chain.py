@@ -0,0 +1,52 @@
+"""Micro-benchmark of the per-turn overhead of the supervisor routing chain.
+
+Compares rebuilding the prompt, the ``RouteResponse`` schema and the
+structured-output model on every turn with reusing the cached chain. No LLM
+call is made, so only the setup overhead is measured.
+
+Usage:
+    poetry run python -m benchmarks.bench_supervisor_chain --turns 200
+"""
+
+import argparse
+import os
+import time
+
+# Building ChatOpenAI requires a key even though no request is sent.
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from src.agents.supervisor_agent import (  # pylint: disable=wrong-import-position
+    build_supervisor_chain,
+    members,
+)
+
+
+def time_turns(turns: int, cached: bool) -> float:
+    """Returns the mean time per turn, in microseconds, to obtain the chain."""
+    workers = tuple(members)
+    build_supervisor_chain.cache_clear()
+    start = time.perf_counter()
+    for _ in range(turns):
+        if cached:
+            build_supervisor_chain(workers)
+        else:
+            build_supervisor_chain.__wrapped__(workers)
+    return (time.perf_counter() - start) / turns * 1e6
+
+
+def main() -> None:
+    """Runs the benchmark and prints the per-turn overhead."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    rebuilt = time_turns(args.turns, cached=False)
+    cached = time_turns(args.turns, cached=True)
+    print(f"turns:            {args.turns}")
+    print(f"rebuilt per turn: {rebuilt:10.1f} us")
+    print(f"cached per turn:  {cached:10.1f} us")
+    print(f"speed-up:         {rebuilt / cached:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""System calls and wall time of the directory listing tools on large directories.
+
+Generates a flat directory with ``--entries`` entries (a fraction of them folders)
+and runs each listing tool twice: once with the former ``os.listdir`` plus
+``os.path.isdir``/``os.path.isfile``/``os.path.getsize`` implementation, once with
+the ``os.scandir`` based traversal layer. System calls are counted in-process by
+wrapping the ``os`` functions the implementations use, including the ``stat`` calls
+made through directory entries.
+
+Usage:
+    poetry run python -m benchmarks.bench_traversal --entries 100000
+"""
+
+import functools
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+# Importing the tools builds the LLM configuration; no request is sent.
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from benchmarks.common import (  # pylint: disable=wrong-import-position
+    benchmark_parser,
+    benchmark_tree,
+)
+from src.tools import traversal  # pylint: disable=wrong-import-position
+
+# Set by `count_syscalls` while a measurement runs
+calls: Counter = Counter()
+
+
+class CountingEntry:
+    """Wraps a directory entry to count the `stat` calls that reach the kernel."""
+
+    def __init__(self, entry: os.DirEntry):
+        self._entry = entry
+        self._stat_cached = False
+
+    def __getattr__(self, name: str):
+        return getattr(self._entry, name)
+
+    def __fspath__(self) -> str:
+        return self._entry.path
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        """Counts the first `stat`; later ones are served from the entry cache."""
+        if not self._stat_cached:
+            calls["stat"] += 1
+            self._stat_cached = True
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class CountingScandir:
+    """Context manager and iterator standing in for `os.scandir`."""
+
+    def __init__(self, scandir: Callable, path: str):
+        calls["scandir"] += 1
+        self._iterator = scandir(path)
+
+    def __enter__(self) -> "CountingScandir":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._iterator.close()
+
+    def __iter__(self) -> Iterator[CountingEntry]:
+        for entry in self._iterator:
+            yield CountingEntry(entry)
+
+
+@contextmanager
+def count_syscalls() -> Iterator[Counter]:
+    """Counts calls to the `os` functions that issue a system call per invocation."""
+    originals = {name: getattr(os, name) for name in ("stat", "listdir", "scandir")}
+
+    def counting(name: str) -> Callable:
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return originals[name](*args, **kwargs)
+
+        return wrapper
+
+    calls.clear()
+    os.stat = counting("stat")
+    os.listdir = counting("listdir")
+    os.scandir = lambda path=".": CountingScandir(originals["scandir"], path)
+    try:
+        yield calls
+    finally:
+        for name, function in originals.items():
+            setattr(os, name, function)
+
+
+# Former implementations of the tools, kept here as the baseline
+def legacy_list_folders(path: str) -> list:
+    """Lists the folders of `path` with one stat per entry."""
+    return [
+        item for item in os.listdir(path) if os.path.isdir(os.path.join(path, item))
+    ]
+
+
+def legacy_list_files(path: str) -> list:
+    """Lists the files of `path` with one stat per entry."""
+    return [f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
+
+
+def legacy_folder_size(path: str) -> int:
+    """Sums the file sizes of `path` with two stats per entry."""
+    return sum(
+        os.path.getsize(os.path.join(path, f))
+        for f in os.listdir(path)
+        if os.path.isfile(os.path.join(path, f))
+    )
+
+
+def scandir_folder_size(path: str) -> int:
+    """Sums the file sizes of `path` from the cached scandir entries."""
+    return sum(entry.stat().st_size for entry in traversal.file_entries(path))
+
+
+CASES: Dict[str, tuple] = {
+    "list_folders": (legacy_list_folders, traversal.dir_names),
+    "list_files": (legacy_list_files, traversal.file_names),
+    "get_folder_size": (legacy_folder_size, scandir_folder_size),
+}
+
+
+def make_directory(root: str, entries: int, dir_ratio: float) -> None:
+    """Creates `entries` empty files and folders directly inside `root`."""
+    folders = int(entries * dir_ratio)
+    for i in range(folders):
+        os.mkdir(os.path.join(root, f"folder{i:07d}"))
+    for i in range(entries - folders):
+        with open(os.path.join(root, f"file{i:07d}.txt"), "wb") as file:
+            file.write(b"x" * (i % 512))
+
+
+def measure(function: Callable, path: str, repeat: int) -> tuple:
+    """Returns the best wall time, the system call counts and the result of a tool.
+
+    The time is taken without instrumentation; the calls are counted on a separate run.
+    """
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(path)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    with count_syscalls() as counted:
+        function(path)
+    return elapsed, sum(counted.values()), result
+
+
+def main() -> None:
+    """Runs the benchmark and prints system calls and wall time per tool."""
+    parser = benchmark_parser(__doc__, "list an existing directory instead")
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--dir-ratio", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    make = functools.partial(
+        make_directory, entries=args.entries, dir_ratio=args.dir_ratio
+    )
+    with benchmark_tree(args.path, make) as path:
+        os.listdir(path)  # warm the dentry cache
+
+        print(f"directory: {path} ({len(os.listdir(path))} entries)")
+        for name, (legacy, current) in CASES.items():
+            legacy_time, legacy_calls, legacy_result = measure(
+                legacy, path, args.repeat
+            )
+            current_time, current_calls, current_result = measure(
+                current, path, args.repeat
+            )
+            assert legacy_result == current_result, f"{name}: results differ"
+            print(
+                f"{name:16s} listdir: {legacy_calls:7d} syscalls "
+                f"{legacy_time:7.3f}s | scandir: {current_calls:7d} "
+                f"syscalls {current_time:7.3f}s | speed-up "
+                f"{legacy_time / current_time:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Helpers shared by the benchmarks."""
+
+import argparse
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+
+def benchmark_parser(doc: str, path_help: str) -> argparse.ArgumentParser:
+    """
+    Returns the argument parser of a benchmark, with its `--path` option.
+
+    :param doc: The module docstring; its first line describes the benchmark.
+    :param path_help: The help of `--path`, which measures existing data instead.
+    :return: The parser, to which the benchmark adds its own options.
+    """
+    parser = argparse.ArgumentParser(description=doc.splitlines()[0])
+    parser.add_argument("--path", help=path_help)
+    return parser
+
+
+@contextmanager
+def benchmark_tree(path: Optional[str], make: Callable[[str], None]) -> Iterator[str]:
+    """
+    Yields the directory a benchmark runs on.
+
+    :param path: An existing directory given with `--path`, used as is.
+    :param make: Fills a scratch directory when no path is given; the scratch
+                 directory is removed afterwards.
+    :return: A context manager yielding the directory.
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        if path is None:
+            path = scratch
+            make(path)
+        yield path
@@ -4,17 +4,21 @@ This module contains the definition of agent nodes that interact with various
 file operation tools using a language model.
 """
 
+import operator
 from functools import partial
-from typing import Sequence
+from typing import Annotated, Sequence
 from typing_extensions import TypedDict
 from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.prebuilt import create_react_agent
+from src.agents.tool_node import ConcurrentToolNode
 
 from src.tools import (
     get_tools_file_operations,
     get_tools_file_search,
     get_tools_file_utils,
     get_tools_folder_operations,
+    get_tools_results,
 )
 
 
@@ -24,10 +28,15 @@ class AgentState(TypedDict):
     Attributes:
         messages: A sequence of messages exchanged between agents.
         next: A string indicating the next routing target in the graph.
+        fast_route: The executor chosen by the fast-path router, if any.
+        routing_calls_saved: The number of supervisor LLM calls skipped by the
+            fast-path router during the run.
     """
 
     messages: Sequence[BaseMessage]
     next: str
+    fast_route: str
+    routing_calls_saved: Annotated[int, operator.add]
 
 
 def agent_node(state: AgentState, agent, name: str) -> dict:
@@ -47,6 +56,40 @@ def agent_node(state: AgentState, agent, name: str) -> dict:
     }
 
 
+async def aagent_node(state: AgentState, agent, name: str) -> dict:
+    """Asynchronously invoke the agent with the current state.
+
+    Args:
+        state: The current state of the agent.
+        agent: The agent to invoke.
+        name: The name of the agent.
+
+    Returns:
+        A dictionary containing the updated messages.
+    """
+    result = await agent.ainvoke(state)
+    return {
+        "messages": [HumanMessage(content=result["messages"][-1].content, name=name)]
+    }
+
+
+def make_node(agent, name: str) -> RunnableLambda:
+    """Wrap an agent into a graph node usable from both sync and async runs.
+
+    Args:
+        agent: The agent to invoke.
+        name: The name of the agent.
+
+    Returns:
+        A runnable exposing the synchronous and asynchronous node functions.
+    """
+    return RunnableLambda(
+        partial(agent_node, agent=agent, name=name),
+        afunc=partial(aagent_node, agent=agent, name=name),
+        name=name,
+    )
+
+
 def create_nodes(llm) -> tuple:
     """Create agent nodes for the workflow.
 
@@ -54,29 +97,31 @@ def create_nodes(llm) -> tuple:
         llm: The language model used to create agents.
 
     Returns:
-        A tuple of partial functions representing different agent nodes.
+        A tuple of runnables representing different agent nodes.
     """
-    file_operations_agent = create_react_agent(llm, tools=get_tools_file_operations())
-    file_operations_node = partial(
-        agent_node, agent=file_operations_agent, name="FileOperationAgent"
+    # Every agent can page through and summarize the large results of its tools,
+    # and runs the independent tool calls of a message concurrently
+    results_tools = get_tools_results()
+
+    file_operations_agent = create_react_agent(
+        llm, tools=ConcurrentToolNode(get_tools_file_operations() + results_tools)
     )
+    file_operations_node = make_node(file_operations_agent, "FileOperationAgent")
 
-    file_search_agent = create_react_agent(llm, tools=get_tools_file_search())
-    file_search_node = partial(
-        agent_node, agent=file_search_agent, name="FileSearchAgents"
+    file_search_agent = create_react_agent(
+        llm, tools=ConcurrentToolNode(get_tools_file_search() + results_tools)
     )
+    file_search_node = make_node(file_search_agent, "FileSearchAgents")
 
-    file_utils_agent = create_react_agent(llm, tools=get_tools_file_utils())
-    file_utils_node = partial(
-        agent_node, agent=file_utils_agent, name="FileUtilsAgents"
+    file_utils_agent = create_react_agent(
+        llm, tools=ConcurrentToolNode(get_tools_file_utils() + results_tools)
     )
+    file_utils_node = make_node(file_utils_agent, "FileUtilsAgents")
 
     folder_operations_agent = create_react_agent(
-        llm, tools=get_tools_folder_operations()
-    )
-    folder_operations_node = partial(
-        agent_node, agent=folder_operations_agent, name="FolderOperation"
+        llm, tools=ConcurrentToolNode(get_tools_folder_operations() + results_tools)
     )
+    folder_operations_node = make_node(folder_operations_agent, "FolderOperation")
 
     return (
         file_operations_node,
@@ -0,0 +1,145 @@
+"""Module for the deterministic fast-path router.
+
+The fast-path router runs in front of the LLM supervisor and settles the
+routing decisions that are predictable from the conversation alone, such as
+sending a single-intent request straight to the matching executor or
+finishing right after that executor answered. When no rule is confident the
+decision is left to the supervisor agent.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Sequence
+
+# A rule inspects the workflow state and returns the next member, "FINISH",
+# or None when it is not confident.
+RouteRule = Callable[[dict], Optional[str]]
+
+# Words that mean the request needs more than one step.
+MULTI_STEP_PATTERN = re.compile(
+    r"\b(then|and|after|afterwards|for (each|every|those|these|all of))\b|[;,]",
+    re.IGNORECASE,
+)
+
+# Words in an executor reply that mean the task may not be complete.
+UNFINISHED_PATTERN = re.compile(
+    r"\b(error|failed|unable|cannot|can't|could not|couldn't|need|please provide)\b|\?",
+    re.IGNORECASE,
+)
+
+INTENT_PATTERNS: Dict[str, Sequence[re.Pattern]] = {
+    "FileSearchAgents": (
+        re.compile(r"\b(find|search|locate|look for)\b.*\bfiles?\b", re.IGNORECASE),
+    ),
+    "FolderOperation": (
+        re.compile(
+            r"\b(create|rename|move|copy|list|count)\b.*\b(sub)?(folders?|directories)\b",
+            re.IGNORECASE,
+        ),
+        re.compile(r"\b(folder|directory) size\b", re.IGNORECASE),
+    ),
+    "FileUtilsAgents": (
+        re.compile(r"\b(compress|zip|archive)\b", re.IGNORECASE),
+        re.compile(r"\b(size of|delete|copy|move)\b.*\bfile\b", re.IGNORECASE),
+    ),
+    "FileOperationAgent": (
+        re.compile(r"\b(read|write|append to|rename)\b.*\bfile\b", re.IGNORECASE),
+    ),
+}
+
+
+def _messages(state: dict) -> list:
+    """Return the messages of the workflow state."""
+    return list(state.get("messages") or [])
+
+
+def single_intent_rule(state: dict) -> Optional[str]:
+    """Route a fresh single-step request to the only executor it matches.
+
+    Args:
+        state: The current state of the workflow.
+
+    Returns:
+        The member to run next, or None when the request is ambiguous.
+    """
+    messages = _messages(state)
+    if len(messages) != 1 or getattr(messages[0], "name", None):
+        return None
+
+    text = str(messages[0].content)
+    if MULTI_STEP_PATTERN.search(text):
+        return None
+
+    matched = [
+        member
+        for member, patterns in INTENT_PATTERNS.items()
+        if any(pattern.search(text) for pattern in patterns)
+    ]
+    return matched[0] if len(matched) == 1 else None
+
+
+def finish_after_answer_rule(state: dict) -> Optional[str]:
+    """Finish once the executor chosen by the fast path returned an answer.
+
+    Args:
+        state: The current state of the workflow.
+
+    Returns:
+        "FINISH" when the answer looks final, otherwise None.
+    """
+    messages = _messages(state)
+    fast_route = state.get("fast_route")
+    if not messages or not fast_route:
+        return None
+
+    last = messages[-1]
+    if getattr(last, "name", None) != fast_route:
+        return None
+    if UNFINISHED_PATTERN.search(str(last.content)):
+        return None
+    return "FINISH"
+
+
+DEFAULT_RULES: List[RouteRule] = [single_intent_rule, finish_after_answer_rule]
+
+
+class FastPathRouter:
+    """Ordered collection of routing rules tried before the LLM supervisor.
+
+    Attributes:
+        rules: The rules, tried in order until one is confident.
+    """
+
+    def __init__(self, rules: Optional[Sequence[RouteRule]] = None):
+        self.rules: List[RouteRule] = list(DEFAULT_RULES if rules is None else rules)
+
+    def register(self, rule: RouteRule) -> RouteRule:
+        """Add a rule to the router; usable as a decorator.
+
+        Args:
+            rule: The rule to add.
+
+        Returns:
+            The rule itself.
+        """
+        self.rules.append(rule)
+        return rule
+
+    def route(self, state: dict) -> Optional[dict]:
+        """Decide the next step locally when a rule is confident.
+
+        Args:
+            state: The current state of the workflow.
+
+        Returns:
+            A state update with the next step and the saved LLM call, or None
+            when the supervisor agent has to decide.
+        """
+        for rule in self.rules:
+            decision = rule(state)
+            if decision is None:
+                continue
+            update = {"next": decision, "routing_calls_saved": 1}
+            if decision != "FINISH":
+                update["fast_route"] = decision
+            return update
+        return None
@@ -1,7 +1,95 @@
 """Module for managing workflow graphs in file operations using agents."""
 
-from langgraph.graph import END, START  # Importing only what is necessary
-from .supervisor_agent import members, supervisor_agent
+import hashlib
+import json
+import threading
+from typing import Dict, Optional
+
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, START, StateGraph  # Importing only what is necessary
+from langgraph.graph.state import CompiledStateGraph
+from src.llm.openai import llm
+from src.tools import (
+    get_tools_file_operations,
+    get_tools_file_search,
+    get_tools_file_utils,
+    get_tools_folder_operations,
+    get_tools_results,
+)
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+from .executor_agent import AgentState, create_nodes
+from .fast_router import FastPathRouter
+from .supervisor_agent import (
+    asupervisor_agent,
+    build_supervisor_chain,
+    members,
+    supervisor_agent,
+)
+
+# Compiled graphs keyed by the fingerprint of the configuration and tool set.
+# A compiled graph holds no per-run state, so one instance can serve any number
+# of concurrent requests.
+_compiled_graphs: Dict[str, CompiledStateGraph] = {}
+_graph_lock = threading.Lock()
+
+routing_config = config.get("routing", {})
+
+# Pre-router consulted before every supervisor LLM call; register extra rules
+# with ``fast_router.register``.
+fast_router = FastPathRouter()
+
+
+def _fast_path(state) -> Optional[dict]:
+    """Return the fast-path routing decision, if the router is enabled and confident."""
+    if not routing_config.get("fast_path", True):
+        return None
+    decision = fast_router.route(state)
+    if decision is not None:
+        logger.debug("Fast-path routing to %s", decision["next"])
+    return decision
+
+
+def _llm_decision(response) -> dict:
+    """Convert the supervisor response into a state update."""
+    next_step = response["next"] if isinstance(response, dict) else response.next
+    # The supervisor took over, so its choice no longer follows the fast path
+    return {"next": next_step, "fast_route": ""}
+
+
+def routed_supervisor(state) -> dict:
+    """Route locally when the fast path is confident, else ask the supervisor.
+
+    Args:
+        state: The current state of the workflow.
+
+    Returns:
+        A state update holding the next routing target.
+    """
+    decision = _fast_path(state)
+    if decision is not None:
+        return decision
+    return _llm_decision(supervisor_agent(state))
+
+
+async def arouted_supervisor(state) -> dict:
+    """Asynchronous counterpart of ``routed_supervisor``.
+
+    Args:
+        state: The current state of the workflow.
+
+    Returns:
+        A state update holding the next routing target.
+    """
+    decision = _fast_path(state)
+    if decision is not None:
+        return decision
+    return _llm_decision(await asupervisor_agent(state))
+
+
+def route_next(state) -> str:
+    """Read the routing target chosen by the supervisor node."""
+    return state["next"]
 
 
 def add_nodes_to_graph(
@@ -27,7 +115,10 @@ def add_nodes_to_graph(
     workflow.add_node("FileSearchAgents", file_search_node)
     workflow.add_node("FileUtilsAgents", file_utils_node)
     workflow.add_node("FolderOperation", folder_operations_node)
-    workflow.add_node("Supervisor", supervisor_agent)
+    workflow.add_node(
+        "Supervisor",
+        RunnableLambda(routed_supervisor, afunc=arouted_supervisor, name="Supervisor"),
+    )
     return workflow
 
 
@@ -44,12 +135,95 @@ def add_edges_to_graph(workflow):
         # Workers report back to the supervisor when done
         workflow.add_edge(member, "Supervisor")
 
-    # The supervisor populates the "next" field in the graph state
-    # which routes to a node or finishes
+    # The supervisor populates the "next" field in the graph state, either from
+    # the fast-path router or from the LLM, which routes to a node or finishes
     conditional_map = {k: k for k in members}
     conditional_map["FINISH"] = END
-    workflow.add_conditional_edges("Supervisor", lambda x: x["next"], conditional_map)
+    workflow.add_conditional_edges("Supervisor", route_next, conditional_map)
 
     # Finally, add entrypoint
     workflow.add_edge(START, "Supervisor")
     return workflow
+
+
+def build_graph(model) -> CompiledStateGraph:
+    """Build and compile the supervisor/executor workflow graph.
+
+    Args:
+        model: The language model used to create the executor agents.
+
+    Returns:
+        The compiled workflow graph.
+    """
+    file_operations_node, file_search_node, file_utils_node, folder_operations_node = (
+        create_nodes(model)
+    )
+
+    workflow = StateGraph(AgentState)
+    workflow = add_nodes_to_graph(
+        workflow,
+        file_operations_node,
+        file_search_node,
+        file_utils_node,
+        folder_operations_node,
+    )
+    workflow = add_edges_to_graph(workflow)
+    return workflow.compile()
+
+
+def graph_fingerprint() -> str:
+    """Return a digest identifying the configuration and tool set of the graph.
+
+    Returns:
+        A hex digest that changes whenever the LLM configuration, the members or
+        the tools exposed to the executor agents change.
+    """
+    tool_sets = [
+        get_tools_file_operations(),
+        get_tools_file_search(),
+        get_tools_file_utils(),
+        get_tools_folder_operations(),
+        get_tools_results(),
+    ]
+    payload = {
+        "openai": config.get("openai", {}),
+        "routing": routing_config,
+        "tool_execution": config.get("tool_execution", {}),
+        "members": members,
+        "tools": [[tool.name for tool in tools] for tools in tool_sets],
+    }
+    serialized = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def get_graph() -> CompiledStateGraph:
+    """Return the shared compiled graph, compiling it on first use.
+
+    The graph is recompiled only when the fingerprint of the configuration or
+    the tool set changes.
+
+    Returns:
+        The compiled workflow graph.
+    """
+    key = graph_fingerprint()
+    graph = _compiled_graphs.get(key)
+    if graph is not None:
+        return graph
+
+    with _graph_lock:
+        graph = _compiled_graphs.get(key)
+        if graph is None:
+            logger.info("Compiling agent graph (fingerprint %s)", key[:12])
+            build_supervisor_chain.cache_clear()
+            graph = build_graph(llm)
+            _compiled_graphs.clear()
+            _compiled_graphs[key] = graph
+    return graph
+
+
+def invalidate_graph() -> None:
+    """Drop the compiled graph and supervisor chain so the next request rebuilds them."""
+    with _graph_lock:
+        _compiled_graphs.clear()
+        build_supervisor_chain.cache_clear()
+    logger.info("Compiled agent graph invalidated")
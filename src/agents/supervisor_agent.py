@@ -5,7 +5,8 @@ between various worker agents, directing their actions and managing
 conversations.
 """
 
-from typing import Literal
+from functools import lru_cache
+from typing import Literal, Tuple
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from pydantic import BaseModel
 from src.llm.openai import llm
@@ -18,31 +19,32 @@ members = [
 ]
 
 
-def supervisor_agent(state) -> dict:
-    """Manage the workflow between worker agents.
+@lru_cache(maxsize=None)
+def build_supervisor_chain(workers: Tuple[str, ...] = tuple(members)):
+    """Build the routing chain used by the supervisor agent.
 
-    This function constructs a prompt for the supervisor agent, directing it
+    The chain constructs a prompt for the supervisor agent, directing it
     to oversee the conversation among worker agents and to determine the
-    next actions based on their responses.
+    next actions based on their responses. The prompt, the response schema
+    and the structured-output model are built once per member set and the
+    resulting chain is reused on every supervisor turn.
 
     Args:
-        state: The current state of the workflow, containing messages and
-               other relevant data.
+        workers: The names of the worker agents the supervisor can route to.
 
     Returns:
-        A dictionary containing the output of the supervisor agent's
-        processing.
+        A runnable that maps the workflow state to a routing decision.
     """
     system_prompt = (
         "You are a supervisor responsible for managing a conversation among the "
-        f"following workers: {', '.join(members)}. Your role is to facilitate "
+        f"following workers: {', '.join(workers)}. Your role is to facilitate "
         "the discussion, ensuring that each worker performs their assigned task and "
         "provides their results and status updates. Use the provided context to "
         "guide the conversation and make decisions. Once all tasks are complete, "
         "respond with 'FINISH' to indicate the end of the conversation.\n"
     )
 
-    options = ["FINISH"] + members
+    options = ["FINISH"] + list(workers)
 
     class RouteResponse(BaseModel):
         """Represents the next action for the supervisor agent.
@@ -70,7 +72,34 @@ def supervisor_agent(state) -> dict:
                 "commentary. Your response should be clear and decisive.",
             ),
         ]
-    ).partial(options=str(options), members=", ".join(members))
+    ).partial(options=str(options), members=", ".join(workers))
+
+    return prompt | llm.with_structured_output(RouteResponse)
+
+
+def supervisor_agent(state) -> dict:
+    """Manage the workflow between worker agents.
+
+    Args:
+        state: The current state of the workflow, containing messages and
+               other relevant data.
 
-    supervisor_chain = prompt | llm.with_structured_output(RouteResponse)
-    return supervisor_chain.invoke(state)
+    Returns:
+        A dictionary containing the output of the supervisor agent's
+        processing.
+    """
+    return build_supervisor_chain().invoke(state)
+
+
+async def asupervisor_agent(state) -> dict:
+    """Asynchronously manage the workflow between worker agents.
+
+    Args:
+        state: The current state of the workflow, containing messages and
+               other relevant data.
+
+    Returns:
+        A dictionary containing the output of the supervisor agent's
+        processing.
+    """
+    return await build_supervisor_chain().ainvoke(state)
@@ -0,0 +1,242 @@
+"""Module for executing the tool calls of the executor agents.
+
+When the model asks for several tools in one message, ``ConcurrentToolNode`` runs
+the calls in parallel on a bounded pool instead of one after another. Calls that
+touch the same path, or a path inside another one, are kept in the order the model
+gave them whenever one of them changes the file system; each tool can also be limited
+to a number of concurrent calls, across all the sessions of the process. The results
+are returned in the original order.
+
+``ConcurrentToolNode`` overrides ``ToolNode._func`` and ``ToolNode._afunc``, which are
+private: the public node runs the calls of a message on its own executor and offers no
+hook to order or limit them. Their signatures are those of langgraph 0.2.43, the
+version pinned in pyproject.toml; check them when upgrading langgraph.
+"""
+
+import asyncio
+import os
+import threading
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+from langchain_core.messages import ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor, get_config_list
+from langchain_core.tools import BaseTool
+from langgraph.prebuilt import ToolNode
+from src.tools.tool_flags import is_read_only
+from src.utils.configuration_utils import config as app_config
+
+tool_execution_config = app_config.get("tool_execution", {})
+
+# "parallel" runs independent calls concurrently, "sequential" one after another
+MODE = tool_execution_config.get("mode", "parallel")
+MAX_WORKERS = tool_execution_config.get("max_workers", 8)
+TOOL_LIMITS: Dict[str, int] = tool_execution_config.get("tool_limits", {}) or {}
+
+# Tool arguments holding a folder, and the names joined to it
+FOLDER_ARGS = ("path", "source_path", "destination_path", "destination", "directory")
+NAME_ARGS = (
+    "filename",
+    "old_filename",
+    "new_filename",
+    "zip_filename",
+    "archive_filename",
+    "folder_name",
+    "old_folder_name",
+    "new_folder_name",
+    "child_folder",
+)
+
+
+def call_paths(call: ToolCall) -> Set[str]:
+    """Returns the absolute paths a tool call reads or changes."""
+    args = call.get("args") or {}
+    folders = [args[key] for key in FOLDER_ARGS if isinstance(args.get(key), str)]
+    names = [args[key] for key in NAME_ARGS if isinstance(args.get(key), str)]
+    paths = {
+        os.path.join(folder, name) for folder in folders if folder for name in names
+    } or {folder for folder in folders if folder}
+    if isinstance(args.get("paths"), list):
+        paths.update(path for path in args["paths"] if isinstance(path, str))
+    return {os.path.abspath(path) for path in paths}
+
+
+def _overlap(first: Set[str], second: Set[str]) -> bool:
+    """Returns True if a path of one set equals or contains a path of the other."""
+    for a in first:
+        for b in second:
+            if a == b or b.startswith(a.rstrip(os.sep) + os.sep):
+                return True
+            if a.startswith(b.rstrip(os.sep) + os.sep):
+                return True
+    return False
+
+
+def plan_lanes(
+    tool_calls: Sequence[ToolCall], read_only: AbstractSet[str]
+) -> List[List[int]]:
+    """
+    Groups tool calls into lanes that can run concurrently.
+
+    Two calls share a lane when their paths overlap and at least one of them is not
+    read-only; the calls of a lane keep the order of the model.
+
+    :param tool_calls: The tool calls of one model message.
+    :param read_only: The names of the tools that never change the file system; any
+                      other tool is treated as a write.
+    :return: The indices of the calls of each lane, in order.
+    """
+    if MODE == "sequential":
+        return [list(range(len(tool_calls)))] if tool_calls else []
+    parent = list(range(len(tool_calls)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    paths = [call_paths(call) for call in tool_calls]
+    writes = [call["name"] not in read_only for call in tool_calls]
+    for i in range(len(tool_calls)):
+        for j in range(i):
+            if (writes[i] or writes[j]) and _overlap(paths[i], paths[j]):
+                parent[find(i)] = find(j)
+    lanes: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(tool_calls)):
+        lanes[find(i)].append(i)
+    return list(lanes.values())
+
+
+class ToolSlots:
+    """
+    Semaphore shared by threads and event loops.
+
+    Threads acquire it with ``with``, coroutines with ``async with``, so the calls of
+    a tool are limited together whether the graph runs synchronously or not and on
+    whichever event loop. A released slot is handed to the oldest waiter.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._free = limit
+        self._lock = threading.Lock()
+        self._waiters: Deque[Union[threading.Event, asyncio.Future]] = deque()
+
+    def __enter__(self) -> None:
+        with self._lock:
+            if self._free:
+                self._free -= 1
+                return
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        waiter.wait()
+
+    def __exit__(self, *_: Any) -> None:
+        self.release()
+
+    async def __aenter__(self) -> None:
+        with self._lock:
+            if self._free:
+                self._free -= 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                handed = waiter not in self._waiters
+                if not handed:
+                    self._waiters.remove(waiter)
+            if handed:
+                self.release()
+            raise
+
+    async def __aexit__(self, *_: Any) -> None:
+        self.release()
+
+    def release(self) -> None:
+        """Frees a slot, or hands it to the oldest waiter."""
+        with self._lock:
+            if not self._waiters:
+                self._free += 1
+                return
+            waiter = self._waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# Created once: the graph, and its tool nodes, are shared by every session
+tool_slots = {name: ToolSlots(limit) for name, limit in TOOL_LIMITS.items()}
+
+
+class ConcurrentToolNode(ToolNode):
+    """Tool node running the independent tool calls of a message concurrently."""
+
+    def __init__(self, tools: Sequence[Union[BaseTool, Callable]], **kwargs: Any):
+        super().__init__(tools, **kwargs)
+        # Taken from the tool definitions, see `src.tools.tool_flags.read_only`
+        self.read_only_tools = frozenset(
+            name for name, tool in self.tools_by_name.items() if is_read_only(tool)
+        )
+
+    # The input is passed positionally; the name would shadow the builtin
+    # pylint: disable-next=arguments-renamed
+    def _func(self, tool_input: Any, config: RunnableConfig, *, store: Any) -> Any:
+        tool_calls, output_type = self._parse_input(tool_input, store)
+        config_list = get_config_list(config, len(tool_calls))
+        outputs: List[Optional[ToolMessage]] = [None] * len(tool_calls)
+
+        def run_lane(lane: List[int]) -> None:
+            for i in lane:
+                with tool_slots.get(tool_calls[i]["name"], nullcontext()):
+                    outputs[i] = self._run_one(tool_calls[i], config_list[i])
+
+        lanes = plan_lanes(tool_calls, self.read_only_tools)
+        if len(lanes) <= 1:
+            for lane in lanes:
+                run_lane(lane)
+        else:
+            with ContextThreadPoolExecutor(min(MAX_WORKERS, len(lanes))) as pool:
+                list(pool.map(run_lane, lanes))
+        return outputs if output_type == "list" else {self.messages_key: outputs}
+
+    # pylint: disable-next=arguments-renamed
+    async def _afunc(
+        self, tool_input: Any, config: RunnableConfig, *, store: Any
+    ) -> Any:
+        tool_calls, output_type = self._parse_input(tool_input, store)
+        outputs: List[Optional[ToolMessage]] = [None] * len(tool_calls)
+        # Like the thread pool of `_func`, bounds the calls of this step only
+        workers = asyncio.Semaphore(MAX_WORKERS)
+
+        async def run_lane(lane: List[int]) -> None:
+            for i in lane:
+                async with tool_slots.get(tool_calls[i]["name"], nullcontext()):
+                    async with workers:
+                        outputs[i] = await self._arun_one(tool_calls[i], config)
+
+        await asyncio.gather(
+            *(run_lane(lane) for lane in plan_lanes(tool_calls, self.read_only_tools))
+        )
+        return outputs if output_type == "list" else {self.messages_key: outputs}
@@ -1,11 +1,56 @@
 # main.py
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from src.agents.graph_agent import get_graph
 from src.controllers.forfilecommands_controller import router as agent_router
+from src.controllers.index_controller import router as index_router
+from src.controllers.jobs_controller import router as jobs_router
+from src.controllers.stats_controller import router as stats_router
+from src.handlers.forfilecommands_handler import astream_command
+from src.jobs.job_queue import start_job_queue, stop_job_queue
+from src.tools.content_index import (
+    content_index_config,
+    is_watched,
+    open_content_index,
+)
+from src.tools.file_index import open_file_index
+from src.tools.file_watcher import start_file_watcher, stop_file_watcher
+from src.tools.folder_stats import invalidate_folder_stats
+from src.tools.tool_cache import tool_cache
+from src.utils.executor_utils import (
+    install_session_semaphore,
+    install_tool_executor,
+)
 
-app = FastAPI()
 
-# Include the agent router
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Compile the agent graph, bound the tool pool and the sessions, and start the
+    file watcher and the job workers."""
+    loop = asyncio.get_running_loop()
+    install_tool_executor(loop)
+    install_session_semaphore(loop)
+    get_graph()
+    if is_watched():
+        watcher = start_file_watcher(open_file_index())
+        watcher.add_listener(invalidate_folder_stats)
+        watcher.add_listener(tool_cache.invalidate)
+        if content_index_config.get("enabled", False):
+            watcher.add_listener(open_content_index().update_paths)
+    await start_job_queue(astream_command)
+    yield
+    await stop_job_queue()
+    stop_file_watcher()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Include the agent, job, file index and statistics routers
 app.include_router(agent_router)
+app.include_router(jobs_router)
+app.include_router(index_router)
+app.include_router(stats_router)
 
 if __name__ == "__main__":
     import uvicorn
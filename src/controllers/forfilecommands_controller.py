@@ -4,10 +4,18 @@ This module defines endpoints for executing commands via agents and
 checks for potentially dangerous commands.
 """
 
-from typing import List
-from fastapi import APIRouter, HTTPException, status
+import json
+import time
+from typing import AsyncGenerator, AsyncIterator, List, Optional
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from src.handlers.forfilecommands_handler import execute_command
+from src.handlers.forfilecommands_handler import (
+    MAX_BATCH_SIZE,
+    abatch_execute_commands,
+    aexecute_command,
+    astream_command,
+)
 from src.utils.logger_utils import logger
 
 router = APIRouter()
@@ -19,6 +27,39 @@ class Message(BaseModel):
     msg: str
 
 
+class AgentRequest(Message):
+    """Model representing a command and its per-request options."""
+
+    use_cache: Optional[bool] = None
+
+
+class BatchRequest(BaseModel):
+    """Model representing a batch of commands and their options."""
+
+    messages: List[Message]
+    use_cache: Optional[bool] = None
+    concurrency: Optional[int] = None
+
+
+class BatchItem(BaseModel):
+    """Model representing the outcome of one command of a batch."""
+
+    index: int
+    msg: str
+    output: str
+    status: int
+    seconds: float
+
+
+class BatchResponse(BaseModel):
+    """Model representing the outcome of a batch of commands."""
+
+    results: List[BatchItem]
+    succeeded: int
+    failed: int
+    seconds: float
+
+
 command_history: List[str] = []
 
 
@@ -31,13 +72,14 @@ command_history: List[str] = []
         "using an agent."
     ),
 )
-async def agent_command(message: Message):
+async def agent_command(message: AgentRequest):
     """
     Executes a command using the specified agent and returns the output along with
     the command history.
 
     - **message**: A JSON object containing the command to be executed in the
-                   `msg` field.
+                   `msg` field and an optional `use_cache` flag switching the LLM
+                   response cache on or off for this request.
 
     Returns:
         - **output**: The log messages generated during the command execution.
@@ -50,7 +92,7 @@ async def agent_command(message: Message):
     logger.info("Received command: %s", message.msg)  # Log the received command
 
     # Execute the command and obtain output and status code
-    output, status_code = execute_command(message.msg)
+    output, status_code = await aexecute_command(message.msg, message.use_cache)
 
     logger.info(
         "Command execution completed. Output: %s, Status Code: %d", output, status_code
@@ -65,3 +107,108 @@ async def agent_command(message: Message):
         )
 
     return Message(msg=str(output))
+
+
+@router.post(
+    "/agent/batch",
+    response_model=BatchResponse,
+    summary="Execute many commands via agents concurrently",
+    description=(
+        "This endpoint receives a list of message objects and executes their "
+        "commands concurrently, returning the output, status and duration of each."
+    ),
+)
+async def agent_command_batch(batch: BatchRequest):
+    """
+    Executes a batch of commands concurrently.
+
+    - **batch**: A JSON object with the `messages` to execute, an optional
+                 `use_cache` flag and an optional `concurrency` overriding the
+                 `server.batch_concurrency` fan-out.
+
+    Returns:
+        - **results**: The output, status code and duration of each command, in
+                       the order of the messages. A failed command does not stop
+                       the others.
+        - **succeeded** / **failed**: The number of commands in each outcome.
+        - **seconds**: The duration of the whole batch.
+
+    Raises:
+        HTTPException: Raised with a status code of 400 if the batch is empty or
+                       larger than `server.max_batch_size`.
+    """
+    if not batch.messages or len(batch.messages) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch must contain between 1 and {MAX_BATCH_SIZE} messages.",
+        )
+    logger.info("Received batch of %d commands", len(batch.messages))
+    start = time.perf_counter()
+    results: List[BatchItem] = [
+        BatchItem(**result)
+        for result in await abatch_execute_commands(
+            [message.msg for message in batch.messages],
+            batch.use_cache,
+            batch.concurrency,
+        )
+    ]
+    succeeded = sum(1 for result in results if result.status == 200)
+    logger.info(
+        "Batch completed: %d succeeded, %d failed", succeeded, len(results) - succeeded
+    )
+    return BatchResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        seconds=round(time.perf_counter() - start, 3),
+    )
+
+
+async def _server_sent_events(
+    request: Request, events: AsyncGenerator[dict, None]
+) -> AsyncIterator[str]:
+    """Formats progress events as server-sent events, stopping on disconnect."""
+    try:
+        async for event in events:
+            if event["event"] == "heartbeat":
+                # A comment line keeps idle proxies from closing the stream
+                if await request.is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+                continue
+            data = json.dumps(event["data"], default=str)
+            yield f"event: {event['event']}\ndata: {data}\n\n"
+    finally:
+        await events.aclose()
+
+
+@router.post(
+    "/agent/stream",
+    summary="Execute a command via agent and stream its progress",
+    description=(
+        "This endpoint executes a command like `/agent` and streams the supervisor "
+        "decisions, tool calls, tool results and executor messages as server-sent "
+        "events while the agents run, ending with a `final` or `error` event."
+    ),
+    response_class=StreamingResponse,
+)
+async def agent_command_stream(message: AgentRequest, request: Request):
+    """
+    Executes a command and streams the progress of the agents.
+
+    - **message**: A JSON object containing the command to be executed in the
+                   `msg` field and an optional `use_cache` flag.
+
+    Returns:
+        A `text/event-stream` response. Each event has a type (`supervisor`,
+        `tool_call`, `tool_result`, `message`, `final` or `error`) and a JSON
+        payload. The run is cancelled when the client disconnects.
+    """
+    logger.info("Received streaming command: %s", message.msg)
+    events = astream_command(message.msg, message.use_cache)
+    return StreamingResponse(
+        _server_sent_events(request, events),
+        media_type="text/event-stream",
+        # Ask reverse proxies not to buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,106 @@
+"""Module for FastAPI controllers managing the file index.
+
+This module defines endpoints for building, refreshing and inspecting the file
+metadata index used by the search tools.
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel
+from src.handlers.index_handler import index_status, refresh_index, watcher_status
+from src.utils.logger_utils import logger
+
+router = APIRouter()
+
+
+class IndexRequest(BaseModel):
+    """Model representing a request to index a directory."""
+
+    path: str
+    full: bool = False
+
+
+class IndexStatus(BaseModel):
+    """Model representing the content of the file index."""
+
+    db_path: str
+    roots: List[str]
+    dirs: int
+    files: int
+
+
+class WatcherStatus(BaseModel):
+    """Model representing the state of the file watcher."""
+
+    running: bool
+    backend: Optional[str] = None
+    queue_depth: int = 0
+    lag_seconds: float = 0.0
+    last_batch_seconds: float = 0.0
+    events_received: int = 0
+    paths_applied: int = 0
+    batches: int = 0
+
+
+@router.post(
+    "/index",
+    response_model=Dict[str, int],
+    summary="Build or refresh the file index",
+    description=(
+        "This endpoint indexes a directory, rescanning only the directories whose "
+        "modification time changed unless a full build is requested."
+    ),
+)
+async def index_directory(request: IndexRequest):
+    """
+    Builds or incrementally refreshes the file index for a directory.
+
+    - **request**: A JSON object with the directory `path` and an optional `full`
+                   flag forcing a complete rescan.
+
+    Returns:
+        The number of scanned and skipped directories and of indexed files.
+
+    Raises:
+        HTTPException: Raised with the handler status code if indexing fails.
+    """
+    logger.info("Indexing request for: %s (full=%s)", request.path, request.full)
+    loop = asyncio.get_running_loop()
+    output, status_code = await loop.run_in_executor(
+        None, refresh_index, request.path, request.full
+    )
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail=output)
+    return output
+
+
+@router.get(
+    "/index",
+    response_model=IndexStatus,
+    summary="Inspect the file index",
+    description="This endpoint returns the indexed roots and the index size.",
+    status_code=status.HTTP_200_OK,
+)
+async def get_index_status():
+    """
+    Returns the indexed roots and the number of indexed directories and files.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, index_status)
+
+
+@router.get(
+    "/index/watcher",
+    response_model=WatcherStatus,
+    summary="Inspect the file watcher",
+    description=(
+        "This endpoint returns the backend, lag and queue depth of the watcher "
+        "keeping the file index fresh."
+    ),
+)
+async def get_watcher_status():
+    """
+    Returns the state of the file watcher.
+    """
+    return watcher_status()
@@ -0,0 +1,137 @@
+"""Module for FastAPI controllers managing background jobs.
+
+This module defines endpoints for submitting agent commands as background jobs and for
+polling, cancelling and monitoring them.
+"""
+
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel
+from src.handlers.jobs_handler import cancel_job, job_metrics, job_status, submit_job
+from src.utils.logger_utils import logger
+
+router = APIRouter()
+
+
+class JobRequest(BaseModel):
+    """Model representing a command to run as a background job."""
+
+    msg: str
+    use_cache: Optional[bool] = None
+
+
+class JobId(BaseModel):
+    """Model representing the id of a submitted job."""
+
+    id: str
+
+
+class JobStatus(BaseModel):
+    """Model representing the state of a job."""
+
+    id: str
+    command: str
+    use_cache: Optional[bool] = None
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Dict[str, Any]
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+
+class JobMetrics(BaseModel):
+    """Model representing the load of the job queue."""
+
+    workers: int
+    queue_depth: int
+    running: int
+    jobs: Dict[str, int]
+    oldest_queued_seconds: float
+    wait_seconds_mean: float
+    wait_seconds_max: float
+
+
+@router.post(
+    "/jobs",
+    response_model=JobId,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Run a command as a background job",
+    description=(
+        "This endpoint queues a command for execution by the agents and returns the "
+        "id of the job immediately."
+    ),
+)
+async def create_job(request: JobRequest):
+    """
+    Queues a command for background execution.
+
+    - **request**: A JSON object containing the command in the `msg` field and an
+                   optional `use_cache` flag.
+
+    Returns:
+        The id of the job, to poll with `GET /jobs/{id}`.
+    """
+    logger.info("Received job: %s", request.msg)
+    return {"id": await submit_job(request.msg, request.use_cache)}
+
+
+@router.get(
+    "/jobs/metrics",
+    response_model=JobMetrics,
+    summary="Inspect the job queue",
+    description=(
+        "This endpoint returns the number of queued and running jobs and the time "
+        "recent jobs waited in the queue."
+    ),
+)
+async def get_job_metrics():
+    """
+    Returns the queue depth, the number of running jobs and the wait times.
+    """
+    return await job_metrics()
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobStatus,
+    summary="Get the status of a job",
+    description=(
+        "This endpoint returns the status, the progress and, once finished, the "
+        "result or error of a job."
+    ),
+)
+async def get_job(job_id: str):
+    """
+    Returns the status, progress and result of a job.
+
+    Raises:
+        HTTPException: Raised with a status code of 404 if the job does not exist.
+    """
+    job = await job_status(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' not found."
+        )
+    return job
+
+
+@router.delete(
+    "/jobs/{job_id}",
+    response_model=JobStatus,
+    summary="Cancel a job",
+    description="This endpoint cancels a queued or running job.",
+)
+async def delete_job(job_id: str):
+    """
+    Cancels a queued or running job.
+
+    Raises:
+        HTTPException: Raised with a status code of 404 if the job does not exist, or
+                       409 if it has already finished.
+    """
+    output, status_code = await cancel_job(job_id)
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail=output)
+    return output
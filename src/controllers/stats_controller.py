@@ -0,0 +1,76 @@
+"""Module for FastAPI controllers reporting runtime statistics.
+
+This module defines endpoints exposing the counters of the server caches.
+"""
+
+import asyncio
+from typing import Dict
+from fastapi import APIRouter
+from pydantic import BaseModel
+from src.handlers.stats_handler import llm_cache_stats, tool_cache_stats
+
+router = APIRouter()
+
+
+class LLMCacheStats(BaseModel):
+    """Model representing the counters of the LLM response cache."""
+
+    enabled: bool
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    bypassed: int
+    hit_rate: float
+    memory_entries: int
+    disk_entries: int = 0
+    disk_bytes: int = 0
+
+
+class ToolStats(BaseModel):
+    """Model representing the counters of one memoized tool."""
+
+    hits: int
+    misses: int
+    invalidations: int
+    hit_rate: float
+
+
+class ToolCacheStats(BaseModel):
+    """Model representing the counters of the tool result cache."""
+
+    enabled: bool
+    entries: int
+    tools: Dict[str, ToolStats]
+
+
+@router.get(
+    "/stats/llm_cache",
+    response_model=LLMCacheStats,
+    summary="Inspect the LLM response cache",
+    description=(
+        "This endpoint returns the hit and miss counters of the LLM response cache "
+        "and the number and size of the cached responses."
+    ),
+)
+async def get_llm_cache_stats():
+    """
+    Returns the hit and miss counters and the size of the LLM response cache.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, llm_cache_stats)
+
+
+@router.get(
+    "/stats/tool_cache",
+    response_model=ToolCacheStats,
+    summary="Inspect the tool result cache",
+    description=(
+        "This endpoint returns the number of memoized file system tool results and "
+        "the hit rate of each tool."
+    ),
+)
+async def get_tool_cache_stats():
+    """
+    Returns the number of memoized tool results and the hit rate of each tool.
+    """
+    return tool_cache_stats()
@@ -3,66 +3,268 @@
 This module provides functions to execute shell commands and check for command validity.
 """
 
+import asyncio
+import time
+from typing import Any, AsyncGenerator, List, Mapping, Optional, Tuple
 from langchain_core.messages import HumanMessage
-from langgraph.graph import StateGraph
-from src.agents.executor_agent import create_nodes, AgentState
-from src.agents.graph_agent import add_edges_to_graph, add_nodes_to_graph
-from src.llm.openai import llm
+from src.agents.graph_agent import get_graph
+from src.agents.supervisor_agent import members
+from src.llm.cache import llm_cache_enabled
+from src.utils.executor_utils import get_session_semaphore, server_config
 from src.utils.logger_utils import logger
 
+# Progress events buffered ahead of a slow client before the run is paused
+STREAM_QUEUE_SIZE = server_config.get("stream_queue_size", 64)
+# Idle time after which a heartbeat is sent, so that proxies keep the stream open
+STREAM_HEARTBEAT_SECONDS = server_config.get("stream_heartbeat_seconds", 15)
+# Commands of one batch running at the same time, and the largest accepted batch
+BATCH_CONCURRENCY = server_config.get("batch_concurrency", 8)
+MAX_BATCH_SIZE = server_config.get("max_batch_size", 256)
+# Tool outputs are truncated in progress events; the agent still sees them in full
+STREAM_MAX_OUTPUT_CHARS = 500
 
-def execute_command(command: str) -> str:
+
+def _initial_state(command: str) -> dict:
+    """Builds the per-request graph input for the given command."""
+    return {"messages": [HumanMessage(content=command)]}
+
+
+def _record_event(log_agents: list, event: dict) -> None:
+    """Appends a streamed graph event to the agents log."""
+    if "__end__" not in event:
+        log_agents.append(event)
+        log_agents.append("------------------")
+        logger.debug("%s", event)
+        logger.debug("------------------")
+
+
+def _last_response(log_agents: list) -> str:
+    """Extracts the response of the last executor agent from the agents log."""
+    last_agent = log_agents[-4]
+    last_response = last_agent[next(iter(last_agent))]["messages"][-1].content
+    logger.debug("Last agent response: %s", last_response)
+    return last_response
+
+
+def _routing_calls_saved(log_agents: list) -> int:
+    """Counts the supervisor LLM calls skipped by the fast-path router."""
+    saved = 0
+    for event in log_agents:
+        update = event.get("Supervisor") if isinstance(event, dict) else None
+        if isinstance(update, dict):
+            saved += update.get("routing_calls_saved", 0)
+    logger.info("LLM routing calls saved by the fast path: %d", saved)
+    return saved
+
+
+def _error_response(error: Exception) -> Tuple[str, int]:
+    """Maps an exception raised while running the graph to a response."""
+    if isinstance(error, (ValueError, TypeError)):  # Catch specific exceptions
+        logger.error("Error executing command: %s", error)
+        return str(error), 400  # Returning a 400 for specific errors
+
+    if isinstance(error, (RuntimeError, KeyError)):
+        logger.error("Runtime or Key error occurred: %s", error)
+        return str(error), 500  # Adjust the error handling as necessary
+
+    logger.error("An unexpected error occurred: %s", error)
+    return "An unexpected error occurred.", 500
+
+
+def execute_command(command: str, use_cache: Optional[bool] = None) -> Tuple[str, int]:
     """Executes the given shell command and returns the output and error.
 
     Args:
         command (str): The shell command to be executed.
+        use_cache (Optional[bool]): Serve repeated LLM calls from the response cache;
+            None uses the ``llm_cache.enabled`` setting.
 
     Returns:
-        tuple: A tuple containing the output and error from the command execution.
+        tuple: A tuple containing the output and the status code.
     """
-    # GRAPH
-    file_operations_node, file_search_node, file_utils_node, folder_operations_node = (
-        create_nodes(llm)
-    )
+    # GRAPH: compiled once and shared between requests
+    graph = get_graph()
+
+    log_agents: List[Any] = []
+
+    try:
+        with llm_cache_enabled(use_cache):
+            for s in graph.stream(_initial_state(command)):
+                _record_event(log_agents, s)
+        _routing_calls_saved(log_agents)
+        return _last_response(log_agents), 200
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return _error_response(e)
+
+
+async def aexecute_command(
+    command: str, use_cache: Optional[bool] = None
+) -> Tuple[str, int]:
+    """Executes the given command on the event loop without blocking it.
+
+    The number of sessions running at the same time is bounded by the
+    ``server.max_concurrent_sessions`` setting; extra requests wait for a slot.
+
+    Args:
+        command (str): The command to be executed.
+        use_cache (Optional[bool]): Serve repeated LLM calls from the response cache;
+            None uses the ``llm_cache.enabled`` setting.
+
+    Returns:
+        tuple: A tuple containing the output and the status code.
+    """
+    graph = get_graph()
+
+    log_agents: List[Any] = []
+
+    async with get_session_semaphore():
+        try:
+            with llm_cache_enabled(use_cache):
+                async for s in graph.astream(_initial_state(command)):
+                    _record_event(log_agents, s)
+            _routing_calls_saved(log_agents)
+            return _last_response(log_agents), 200
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return _error_response(e)
+
+
+async def abatch_execute_commands(
+    commands: List[str],
+    use_cache: Optional[bool] = None,
+    concurrency: Optional[int] = None,
+) -> List[dict]:
+    """Executes many commands concurrently and returns the outcome of each one.
+
+    At most ``concurrency`` commands of the batch run at the same time, each as
+    an ordinary session sharing the compiled graph, the model client and the
+    caches. A failing command is reported in its result and does not stop the
+    others.
+
+    Args:
+        commands (List[str]): The commands to be executed.
+        use_cache (Optional[bool]): Serve repeated LLM calls from the response cache;
+            None uses the ``llm_cache.enabled`` setting.
+        concurrency (Optional[int]): The fan-out of the batch; None uses the
+            ``server.batch_concurrency`` setting.
+
+    Returns:
+        List[dict]: One result per command, in order, with its ``output``, its
+        ``status`` code and the ``seconds`` it took.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency or BATCH_CONCURRENCY))
 
-    workflow = StateGraph(AgentState)
+    async def run(index: int, command: str) -> dict:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                output, status_code = await aexecute_command(command, use_cache)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                output, status_code = _error_response(e)
+            return {
+                "index": index,
+                "msg": command,
+                "output": str(output),
+                "status": status_code,
+                "seconds": round(time.perf_counter() - start, 3),
+            }
 
-    workflow = add_nodes_to_graph(
-        workflow,
-        file_operations_node,
-        file_search_node,
-        file_utils_node,
-        folder_operations_node,
+    return await asyncio.gather(
+        *(run(index, command) for index, command in enumerate(commands))
     )
-    workflow = add_edges_to_graph(workflow)
-    graph = workflow.compile()
 
-    log_agents = []
 
-    try:
-        for s in graph.stream({"messages": [HumanMessage(content=command)]}):
-            if "__end__" not in s:
-                log_agents.append(s)
-                log_agents.append("------------------")
-                logger.debug("%s", s)
-                logger.debug("------------------")
-
-        last_agent = log_agents[-4]
-        last_response = last_agent[next(iter(last_agent))]["messages"][-1].content
-        logger.debug("Last agent response: %s", last_response)
-        return last_response, 200
-
-    except (ValueError, TypeError) as e:  # Catch specific exceptions
-        logger.error("Error executing command: %s", e)
-        return str(e), 400  # Returning a 400 for specific errors
-
-    except (
-        RuntimeError,
-        KeyError,
-    ) as e:  # Example of catching other specific exceptions
-        logger.error("Runtime or Key error occurred: %s", e)
-        return str(e), 500  # Adjust the error handling as necessary
-
-    except Exception as e:  # Catch any other unexpected exceptions
-        logger.error("An unexpected error occurred: %s", e)
-        return "An unexpected error occurred.", 500
+def _progress_event(raw: Mapping[str, Any]) -> Optional[dict]:
+    """Maps a LangGraph v2 stream event to a progress event, or None to skip it."""
+    kind, name, depth = raw["event"], raw["name"], len(raw["parent_ids"])
+    data = raw.get("data", {})
+    if kind == "on_chain_end" and depth == 0:
+        messages = data.get("output", {}).get("messages", [])
+        return {"event": "final", "data": {"msg": messages[-1].content}}
+    if kind == "on_chain_end" and depth == 1 and name == "Supervisor":
+        output = data.get("output", {})
+        return {
+            "event": "supervisor",
+            "data": {
+                "next": output["next"],
+                "fast_path": bool(output.get("fast_route")),
+            },
+        }
+    if kind == "on_chain_end" and depth == 1 and name in members:
+        message = data["output"]["messages"][-1]
+        return {"event": "message", "data": {"agent": name, "msg": message.content}}
+    if kind == "on_tool_start":
+        return {
+            "event": "tool_call",
+            "data": {"tool": name, "input": data.get("input")},
+        }
+    if kind == "on_tool_end":
+        output = data.get("output")
+        content = str(getattr(output, "content", output))
+        if len(content) > STREAM_MAX_OUTPUT_CHARS:
+            content = content[:STREAM_MAX_OUTPUT_CHARS] + "..."
+        return {"event": "tool_result", "data": {"tool": name, "output": content}}
+    return None
+
+
+async def astream_command(
+    command: str, use_cache: Optional[bool] = None
+) -> AsyncGenerator[dict, None]:
+    """Executes the given command and yields progress events as they happen.
+
+    Events are supervisor decisions, tool calls and results, executor messages
+    and a final ``final`` or ``error`` event; a ``heartbeat`` event is yielded
+    whenever the run is silent for ``server.stream_heartbeat_seconds``.
+
+    The run is produced into a bounded queue: when the client reads slower than
+    the graph progresses, the queue fills up and the run waits. When the
+    consumer stops iterating, for instance because the client disconnected, the
+    run is cancelled before its next step.
+
+    Args:
+        command (str): The command to be executed.
+        use_cache (Optional[bool]): Serve repeated LLM calls from the response cache;
+            None uses the ``llm_cache.enabled`` setting.
+
+    Yields:
+        dict: Progress events with an ``event`` type and a ``data`` payload.
+    """
+    graph = get_graph()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+    async def produce() -> None:
+        try:
+            with llm_cache_enabled(use_cache):
+                async for raw in graph.astream_events(
+                    _initial_state(command), version="v2"
+                ):
+                    event = _progress_event(raw)
+                    if event is not None:
+                        await queue.put(event)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            detail, status_code = _error_response(e)
+            await queue.put(
+                {"event": "error", "data": {"detail": detail, "status": status_code}}
+            )
+        await queue.put(None)
+
+    async with get_session_semaphore():
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield {"event": "heartbeat", "data": {}}
+                    continue
+                if event is None:
+                    break
+                yield event
+        finally:
+            if not producer.done():
+                logger.info("Stream closed by the client, cancelling the run")
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,43 @@
+"""Module for handling file index maintenance.
+
+This module provides functions to build, refresh and inspect the file metadata index.
+"""
+
+from src.tools.file_index import open_file_index
+from src.tools.file_watcher import get_file_watcher
+from src.utils.logger_utils import logger
+
+
+def refresh_index(path: str, full: bool = False) -> tuple:
+    """Builds or incrementally refreshes the file index for a directory.
+
+    Args:
+        path (str): The directory to index.
+        full (bool): Rescan every directory instead of only the changed ones.
+
+    Returns:
+        tuple: A tuple containing the refresh statistics and the status code.
+    """
+    try:
+        return open_file_index().refresh(path, full=full), 200
+
+    except (NotADirectoryError, FileNotFoundError) as e:
+        logger.error("Cannot index '%s': %s", path, e)
+        return str(e), 400
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("An unexpected error occurred while indexing: %s", e)
+        return "An unexpected error occurred.", 500
+
+
+def index_status() -> dict:
+    """Returns the indexed roots and the size of the file index."""
+    return open_file_index().status()
+
+
+def watcher_status() -> dict:
+    """Returns the lag and queue depth of the file watcher, if it is running."""
+    watcher = get_file_watcher()
+    if watcher is None:
+        return {"running": False}
+    return watcher.status()
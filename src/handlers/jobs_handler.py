@@ -0,0 +1,57 @@
+"""Module for handling background jobs.
+
+This module provides functions to submit agent commands as background jobs, and to
+inspect and cancel them.
+"""
+
+from typing import Optional
+from src.jobs.job_queue import JobQueue, get_job_queue
+
+
+def _queue() -> JobQueue:
+    queue = get_job_queue()
+    if queue is None:
+        raise RuntimeError("The job queue is not running.")
+    return queue
+
+
+async def submit_job(command: str, use_cache: Optional[bool] = None) -> str:
+    """Queues a command for background execution.
+
+    Args:
+        command (str): The command to be executed.
+        use_cache (Optional[bool]): Serve repeated LLM calls from the response cache;
+            None uses the ``llm_cache.enabled`` setting.
+
+    Returns:
+        str: The id of the job.
+    """
+    return await _queue().submit(command, use_cache)
+
+
+async def job_status(job_id: str) -> Optional[dict]:
+    """Returns the status, progress and result of a job, or None if it does not exist."""
+    return await _queue().get(job_id)
+
+
+async def cancel_job(job_id: str) -> tuple:
+    """Cancels a queued or running job.
+
+    Args:
+        job_id (str): The id of the job.
+
+    Returns:
+        tuple: A tuple containing the job or an error message, and the status code.
+    """
+    try:
+        job = await _queue().cancel(job_id)
+    except ValueError as e:
+        return str(e), 409
+    if job is None:
+        return f"Job '{job_id}' not found.", 404
+    return job, 200
+
+
+async def job_metrics() -> dict:
+    """Returns the queue depth, the number of running jobs and the wait times."""
+    return await _queue().metrics()
@@ -0,0 +1,17 @@
+"""Module for handling runtime statistics.
+
+This module provides functions to report the counters of the server caches.
+"""
+
+from src.llm.cache import llm_cache
+from src.tools.tool_cache import tool_cache
+
+
+def llm_cache_stats() -> dict:
+    """Returns the hit and miss counters and the size of the LLM response cache."""
+    return llm_cache.stats()
+
+
+def tool_cache_stats() -> dict:
+    """Returns the number of memoized tool results and the hit rate of each tool."""
+    return tool_cache.stats()
@@ -0,0 +1,17 @@
+"""
+Jobs Module.
+
+This module runs agent commands as background jobs: a SQLite store persists the jobs
+and a bounded pool of asyncio workers executes them.
+"""
+
+from .job_queue import JobQueue, get_job_queue, start_job_queue, stop_job_queue
+from .job_store import JobStore
+
+__all__ = [
+    "JobQueue",
+    "JobStore",
+    "get_job_queue",
+    "start_job_queue",
+    "stop_job_queue",
+]
@@ -0,0 +1,216 @@
+"""
+Job Queue Module.
+
+This module runs the agent jobs in the background on a bounded pool of asyncio
+workers. Each job is executed through a runner yielding the progress events of the
+agents, so a job reports its progress while it runs; the state of every job is kept in
+the job store, and the jobs left queued or running by a previous server are queued
+again on start.
+"""
+
+import asyncio
+import statistics
+import time
+from typing import AsyncIterator, Callable, Dict, Optional
+from src.jobs.job_store import (
+    FAILED,
+    FINISHED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobStore,
+)
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+jobs_config = config.get("jobs", {})
+
+# Runs a command and yields its progress events (see `astream_command`)
+JobRunner = Callable[[str, Optional[bool]], AsyncIterator[dict]]
+
+
+class JobQueue:
+    """Bounded pool of workers executing the jobs of a job store."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        runner: JobRunner,
+        workers: int = 4,
+        metrics_window: int = 100,
+    ):
+        """
+        :param store: The store persisting the jobs.
+        :param runner: Runs a command and yields its progress events.
+        :param workers: The number of jobs executed at the same time.
+        :param metrics_window: The number of recent jobs the wait times are taken from.
+        """
+        self.store = store
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.metrics_window = metrics_window
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._workers: list = []
+        self._running: Dict[str, asyncio.Task] = {}
+
+    async def _call(self, function: Callable, *args):
+        """Runs a blocking store call off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def start(self) -> None:
+        """Queues the waiting jobs of the store and starts the workers."""
+        for job_id in await self._call(self.store.recover_unfinished):
+            self._queue.put_nowait(job_id)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(
+            "Started %d job workers, %d jobs queued", self.workers, self._queue.qsize()
+        )
+
+    async def stop(self) -> None:
+        """Stops the workers; interrupted jobs are marked failed on the next start."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, command: str, use_cache: Optional[bool] = None) -> str:
+        """Stores and queues a new job, returning its id."""
+        job_id = await self._call(self.store.create, command, use_cache)
+        self._queue.put_nowait(job_id)
+        logger.info("Queued job %s: %s", job_id, command)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """Returns a job, or None if it does not exist."""
+        return await self._call(self.store.get, job_id)
+
+    async def cancel(self, job_id: str) -> Optional[dict]:
+        """
+        Cancels a queued or running job.
+
+        :return: The job after cancellation, or None if it does not exist.
+        :raises ValueError: If the job has already finished.
+        """
+        job = await self._call(self.store.get, job_id)
+        if job is None:
+            return None
+        if job["status"] in FINISHED:
+            raise ValueError(f"Job '{job_id}' has already {job['status']}.")
+        if not await self._call(self.store.cancel, job_id, QUEUED):
+            task = self._running.get(job_id)
+            if task is not None:
+                task.cancel()
+                await asyncio.wait({task})
+            # A start interrupted by the cancellation may not have been stored yet
+            await self._call(self.store.cancel, job_id, RUNNING, QUEUED)
+        logger.info("Cancelled job %s", job_id)
+        return await self._call(self.store.get, job_id)
+
+    async def _work(self) -> None:
+        """Worker loop: runs queued jobs one at a time."""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                # Registered before the job is started, so a cancel always reaches it
+                task = asyncio.create_task(self._start_and_run(job_id))
+                self._running[job_id] = task
+                try:
+                    await asyncio.wait({task})
+                except asyncio.CancelledError:
+                    # Server shutdown: the job stays running and is queued again
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    raise
+                finally:
+                    self._running.pop(job_id, None)
+            finally:
+                self._queue.task_done()
+
+    async def _start_and_run(self, job_id: str) -> None:
+        """Starts a queued job and executes it, unless it was cancelled meanwhile."""
+        if not await self._call(self.store.start, job_id):
+            return  # cancelled while queued
+        await self._run(await self._call(self.store.get, job_id))
+
+    async def _run(self, job: dict) -> None:
+        """Executes one job, recording its progress and outcome.
+
+        A cancelled run records nothing: `cancel` marks the job as cancelled, and a
+        job interrupted by a shutdown stays running until the next start fails it.
+        """
+        job_id = job["id"]
+        progress = {"events": 0}
+        status, result = FAILED, None
+        error: Optional[str] = "The run ended without a result."
+        try:
+            async for event in self.runner(job["command"], job["use_cache"]):
+                if event["event"] == "heartbeat":
+                    continue
+                progress["events"] += 1
+                progress["last_event"] = event["event"]
+                if event["event"] == "tool_call":
+                    progress["last_tool"] = event["data"]["tool"]
+                elif event["event"] == "supervisor":
+                    progress["last_agent"] = event["data"]["next"]
+                elif event["event"] == "final":
+                    status, result, error = SUCCEEDED, event["data"]["msg"], None
+                elif event["event"] == "error":
+                    error = event["data"]["detail"]
+                await self._call(self.store.update_progress, job_id, dict(progress))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Job %s failed: %s", job_id, e)
+            error = str(e)
+        await self._call(self.store.finish, job_id, status, result, error)
+        logger.info("Job %s %s", job_id, status)
+
+    async def metrics(self) -> dict:
+        """Returns the queue depth, the number of running jobs and the wait times."""
+        counts = await self._call(self.store.counts)
+        oldest = await self._call(self.store.oldest_queued)
+        waits = await self._call(self.store.recent_waits, self.metrics_window)
+        return {
+            "workers": self.workers,
+            "queue_depth": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "jobs": counts,
+            "oldest_queued_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "wait_seconds_mean": round(statistics.fmean(waits), 3) if waits else 0.0,
+            "wait_seconds_max": round(max(waits), 3) if waits else 0.0,
+        }
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    """Returns the running job queue, or None if it was not started."""
+    return _job_queue
+
+
+async def start_job_queue(runner: JobRunner) -> JobQueue:
+    """
+    Creates and starts the shared job queue, resuming the jobs left by a previous run.
+
+    :param runner: Runs a command and yields its progress events.
+    :return: The started queue.
+    """
+    global _job_queue  # pylint: disable=global-statement
+    _job_queue = JobQueue(
+        JobStore(jobs_config.get("db_path", ".jobs.sqlite3")),
+        runner,
+        workers=jobs_config.get("workers", 4),
+        metrics_window=jobs_config.get("metrics_window", 100),
+    )
+    await _job_queue.start()
+    return _job_queue
+
+
+async def stop_job_queue() -> None:
+    """Stops the shared job queue if it is running."""
+    global _job_queue  # pylint: disable=global-statement
+    if _job_queue is not None:
+        await _job_queue.stop()
+        _job_queue = None
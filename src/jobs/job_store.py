@@ -0,0 +1,181 @@
+"""
+Job Store Module.
+
+This module persists the agent jobs in a local SQLite database, so that queued jobs
+survive a restart of the server, jobs interrupted by it are reported as failed, and
+finished jobs can still be inspected.
+"""
+
+import json
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+from src.utils.sqlite_utils import connect, create_schema
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    command TEXT NOT NULL,
+    use_cache INTEGER,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    progress TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+INTERRUPTED_ERROR = (
+    "Interrupted by a server shutdown. The job was not run again because its "
+    "changes may be partly applied; check the files and submit it again."
+)
+
+COLUMNS = (
+    "id",
+    "command",
+    "use_cache",
+    "status",
+    "created_at",
+    "started_at",
+    "finished_at",
+    "progress",
+    "result",
+    "error",
+)
+
+
+def _job(row: tuple) -> dict:
+    """Converts a database row into a job dict."""
+    job = dict(zip(COLUMNS, row))
+    job["use_cache"] = None if job["use_cache"] is None else bool(job["use_cache"])
+    job["progress"] = json.loads(job["progress"])
+    return job
+
+
+class JobStore:
+    """SQLite-backed store of the agent jobs."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._write_lock = threading.Lock()
+        create_schema(self.db_path, SCHEMA)
+
+    def _write(self, query: str, params: tuple) -> int:
+        """Runs a write query and returns the number of changed rows."""
+        with connect(self.db_path, self._write_lock) as conn:
+            return conn.execute(query, params).rowcount
+
+    def create(self, command: str, use_cache: Optional[bool] = None) -> str:
+        """Stores a new queued job and returns its id."""
+        job_id = uuid.uuid4().hex
+        self._write(
+            "INSERT INTO jobs (id, command, use_cache, status, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (job_id, command, use_cache, QUEUED, time.time()),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Returns a job, or None if it does not exist."""
+        with connect(self.db_path) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _job(row) if row is not None else None
+
+    def start(self, job_id: str) -> bool:
+        """Marks a queued job as running; returns False if it is no longer queued."""
+        return bool(
+            self._write(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), job_id, QUEUED),
+            )
+        )
+
+    def update_progress(self, job_id: str, progress: dict) -> None:
+        """Stores the progress of a running job."""
+        self._write(
+            "UPDATE jobs SET progress = ? WHERE id = ?",
+            (json.dumps(progress, default=str), job_id),
+        )
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Stores the outcome of a running job; a cancelled job is left as is."""
+        self._write(
+            "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? "
+            "WHERE id = ? AND status = ?",
+            (status, time.time(), result, error, job_id, RUNNING),
+        )
+
+    def cancel(self, job_id: str, *statuses: str) -> bool:
+        """Cancels a job if it is still in one of `statuses`; returns False otherwise."""
+        return bool(
+            self._write(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status "
+                f"IN ({', '.join('?' * len(statuses))})",
+                (CANCELLED, time.time(), job_id, *statuses),
+            )
+        )
+
+    def recover_unfinished(self) -> List[str]:
+        """
+        Fails the jobs interrupted by a shutdown and returns the jobs still queued.
+
+        An interrupted job is not run again: its command may have moved, deleted or
+        changed files before the shutdown, and running it from the start would repeat
+        those changes.
+
+        :return: The ids of all queued jobs, oldest first.
+        """
+        with connect(self.db_path, self._write_lock) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE status = ?",
+                (FAILED, time.time(), INTERRUPTED_ERROR, RUNNING),
+            )
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of jobs in each status."""
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def oldest_queued(self) -> Optional[float]:
+        """Returns the creation time of the oldest queued job, if any."""
+        with connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT MIN(created_at) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()
+        return row[0]
+
+    def recent_waits(self, limit: int) -> List[float]:
+        """Returns the queue wait time of the most recently started jobs."""
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT started_at - created_at FROM jobs WHERE started_at IS NOT NULL "
+                "ORDER BY started_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [row[0] for row in rows]
@@ -6,4 +6,5 @@ including the OpenAI API. It facilitates model initialization, configuration,
 and function calls to generate text based on user input or predefined prompts.
 """
 
+from .cache import llm_cache, llm_cache_enabled
 from .openai import llm
@@ -0,0 +1,296 @@
+"""
+LLM Cache Module.
+
+This module provides the response cache of the chat model, shared by the supervisor and
+the executor agents. Responses are keyed on the model and its parameters (which
+LangChain passes as the `llm_string`, including any bound tools or structured output
+schema) and on the normalized message list: message ids, which differ on every run,
+are dropped and whitespace in the user messages is collapsed.
+
+Lookups go through an in-memory LRU tier, then an on-disk SQLite tier. Both expire
+entries after a TTL; the SQLite tier also evicts the least recently used entries above
+a size limit. The cache can be switched on or off for a single request.
+
+Only model responses are cached. Tool calls still run against the live file system,
+and since tool results become part of the next message list, a turn that follows a tool
+call is only served from the cache if the tool returned the same result.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, ContextManager, Iterator, Optional, Tuple
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from src.utils.configuration_utils import config, resolve_path
+from src.utils.logger_utils import logger
+from src.utils.sqlite_utils import connect, create_schema
+
+llm_cache_config = config.get("llm_cache", {})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+# Per-request switch; None means the configured default
+_cache_enabled: ContextVar[Optional[bool]] = ContextVar(
+    "llm_cache_enabled", default=None
+)
+
+WHITESPACE = re.compile(r"\s+")
+HUMAN_MESSAGE = ["langchain", "schema", "messages", "HumanMessage"]
+
+
+def _normalize(value: Any) -> Any:
+    """Drops the message ids and collapses the whitespace of the user messages."""
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    # Serialized objects carry their class path as a list under "id"
+    normalized = {
+        key: _normalize(item)
+        for key, item in value.items()
+        if key != "id" or isinstance(item, list)
+    }
+    kwargs = normalized.get("kwargs")
+    if (
+        value.get("id") == HUMAN_MESSAGE
+        and isinstance(kwargs, dict)
+        and isinstance(kwargs.get("content"), str)
+    ):
+        kwargs["content"] = WHITESPACE.sub(" ", kwargs["content"]).strip()
+    return normalized
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    Returns the cache key of a model call.
+
+    :param prompt: The message list serialized by LangChain.
+    :param llm_string: The serialized model and call parameters.
+    :return: A hex digest of the model, its parameters and the normalized messages.
+    """
+    try:
+        messages = json.dumps(_normalize(json.loads(prompt)), sort_keys=True)
+    except ValueError:
+        messages = prompt
+    return hashlib.sha256(f"{llm_string}\0{messages}".encode("utf-8")).hexdigest()
+
+
+def is_cache_enabled() -> bool:
+    """Returns True if the cache is used for the current request."""
+    enabled = _cache_enabled.get()
+    return llm_cache_config.get("enabled", False) if enabled is None else enabled
+
+
+@contextmanager
+def llm_cache_enabled(enabled: Optional[bool]) -> Iterator[None]:
+    """
+    Switches the cache on or off for the calls made inside the block.
+
+    The switch is a context variable, so it follows the request into the graph nodes
+    and the executor threads, and does not affect concurrent requests.
+
+    :param enabled: True or False, or None to use the configured default.
+    """
+    token = _cache_enabled.set(enabled)
+    try:
+        yield
+    finally:
+        _cache_enabled.reset(token)
+
+
+class LLMCache(BaseCache):
+    """Two-tier LLM response cache: an in-memory LRU over a SQLite store."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        memory_entries: int = 1024,
+        ttl_seconds: float = 86400.0,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        """
+        :param db_path: The SQLite database of the disk tier, or None for memory only.
+        :param memory_entries: The maximum number of responses kept in memory.
+        :param ttl_seconds: The lifetime of a response; 0 disables expiry.
+        :param max_bytes: The maximum total size of the disk tier.
+        """
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._schema_ready = False
+
+    def _connect(
+        self, lock: Optional[threading.Lock] = None
+    ) -> ContextManager[sqlite3.Connection]:
+        """Opens a connection to the disk tier, see `sqlite_utils.connect`.
+
+        The database is only created on first use, so a disabled cache leaves no file.
+        """
+        db_path = self.db_path
+        if db_path is None:
+            raise ValueError("The cache has no disk tier")
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    create_schema(db_path, SCHEMA)
+                    self._schema_ready = True
+        return connect(db_path, lock)
+
+    def _expired(self, created: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created > self.ttl_seconds
+
+    def _remember(self, key: str, created: float, value: str) -> None:
+        """Stores a serialized response in the memory tier."""
+        with self._lock:
+            self._memory[key] = (created, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Returns the cached generations of a model call, or None."""
+        if not is_cache_enabled():
+            with self._lock:
+                self.bypassed += 1
+            return None
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and self._expired(cached[0], now):
+                del self._memory[key]
+                cached = None
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+        if cached is not None:
+            # Deserialized on every hit: the graph mutates the returned messages
+            return loads(cached[1])
+
+        row = None
+        if self.db_path is not None:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT created, value FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self._expired(row[0], now):
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    row = None
+                elif row is not None:
+                    conn.execute(
+                        "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+                    )
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, row[0], row[1])
+        return loads(row[1])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Stores the generations of a model call in both tiers."""
+        if not is_cache_enabled():
+            return
+        key = cache_key(prompt, llm_string)
+        value = dumps(return_val)
+        now = time.time()
+        self._remember(key, now, value)
+        if self.db_path is None:
+            return
+        with self._connect(self._write_lock) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drops expired entries, then the least recently used ones above the limit."""
+        if self.ttl_seconds:
+            conn.execute(
+                "DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,)
+            )
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        excess = total[0] - self.max_bytes
+        if excess <= 0:
+            return
+        evicted = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ).fetchall():
+            if excess <= 0:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            excess -= size
+            evicted += 1
+        logger.info("Evicted %d responses from the LLM cache", evicted)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Drops every cached response from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self.db_path is not None:
+            with self._connect(self._write_lock) as conn:
+                conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        """Returns the hit and miss counters and the size of both tiers."""
+        with self._lock:
+            stats = {
+                "enabled": llm_cache_config.get("enabled", False),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "memory_entries": len(self._memory),
+            }
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4)
+            if lookups
+            else 0.0
+        )
+        if self.db_path is not None:
+            with self._connect() as conn:
+                stats["disk_entries"], stats["disk_bytes"] = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+        return stats
+
+
+# An empty path keeps the cache in memory only
+DB_PATH = llm_cache_config.get("db_path", ".llm_cache.sqlite3")
+
+llm_cache = LLMCache(
+    db_path=resolve_path(DB_PATH) if DB_PATH else None,
+    memory_entries=llm_cache_config.get("memory_entries", 1024),
+    ttl_seconds=llm_cache_config.get("ttl_seconds", 86400),
+    max_bytes=llm_cache_config.get("max_bytes", 256 * 1024 * 1024),
+)
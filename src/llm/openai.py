@@ -12,5 +12,6 @@ from langchain_openai import ChatOpenAI
 
 # Ensure the import path for configuration_utils is correct
 from src.utils.configuration_utils import config
+from src.llm.cache import llm_cache
 
-llm = ChatOpenAI(**config["openai"])
+llm = ChatOpenAI(**config["openai"], cache=llm_cache)
@@ -22,11 +22,13 @@ from .file_operations import (
 )
 
 from .file_search import (
+    grep,
     search_file,
     search_file_by_content,
     search_files_by_extension,
     search_files_containing_keyword_in_name,
     search_files_modified_after,
+    search_files_by_criteria,
     get_tools_file_search,
 )
 
@@ -36,6 +38,7 @@ from .folder_operations import (
     create_folder,
     filter_folders_by_name,
     get_folder_size,
+    get_folder_stats,
     go_to_child_folder,
     go_to_parent_folder,
     list_folders,
@@ -46,8 +49,24 @@ from .folder_operations import (
     get_tools_folder_operations,
 )
 
+from .bulk_operations import (
+    bulk_copy_files,
+    bulk_delete_files,
+    bulk_move_files,
+    bulk_rename_files,
+)
+
+from .multi_read import read_many
+
+from .result_store import (
+    fetch_results,
+    summarize_results,
+    get_tools_results,
+)
+
 from .file_utils import (
     move_file,
+    archive_folder,
     compress_files_to_zip,
     copy_file,
     delete_file,
@@ -63,6 +82,13 @@ __all__ = [
     "get_tools_file_operations",
     "get_tools_file_search",
     "get_tools_folder_operations",
+    "get_tools_results",
+    "bulk_copy_files",
+    "bulk_delete_files",
+    "bulk_move_files",
+    "bulk_rename_files",
+    "fetch_results",
+    "summarize_results",
     "list_files_in_directory",
     "find_files_by_extension",
     "get_file_size",
@@ -73,13 +99,17 @@ __all__ = [
     "list_files",
     "move_file",
     "read_file",
+    "read_many",
     "rename_file",
     "write_to_file",
     "search_file",
     "search_file_by_content",
+    "grep",
     "search_files_by_extension",
     "search_files_containing_keyword_in_name",
     "search_files_modified_after",
+    "search_files_by_criteria",
+    "archive_folder",
     "compress_files_to_zip",
     "copy_folder",
     "count_files_in_directory",
@@ -88,6 +118,7 @@ __all__ = [
     "create_folder",
     "filter_folders_by_name",
     "get_folder_size",
+    "get_folder_stats",
     "go_to_child_folder",
     "go_to_parent_folder",
     "list_folders",
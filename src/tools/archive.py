@@ -0,0 +1,346 @@
+"""
+Archive Module.
+
+This module builds zip and tar.gz archives of whole folder trees, compressing on all
+cores while writing a single archive:
+
+- zip: every member is compressed on its own by a worker thread (deflate, bzip2 and
+  lzma release the GIL) into a spooled temporary file, which spills to disk above
+  `archive.spool_bytes`; the members are then appended to the archive in order. At
+  most two members per worker are in flight, so memory stays bounded for any tree.
+  `zipfile` has no public API to append data compressed elsewhere, so this relies on
+  its internals; they are checked once by building and reading back a small archive,
+  and if the check fails the members are written one by one with `ZipFile.write`.
+- tar.gz: the tar stream is cut into blocks of `archive.block_size` bytes, each
+  compressed by a worker into an independent gzip member; the members are
+  concatenated in order, which gzip and tarfile read as one stream.
+
+Files are read in chunks, never as a whole, and progress is logged every
+`archive.progress_seconds` and reported to an optional callback after each file.
+Empty folders are not archived.
+"""
+
+import functools
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Deque, List, NamedTuple, Optional, Tuple
+from src.tools.progress import ProgressCallback, ProgressTracker
+from src.tools.traversal import iter_file_entries
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+archive_config = config.get("archive", {})
+
+FORMAT = archive_config.get("format", "zip")
+COMPRESSION = archive_config.get("compression", "deflate")
+LEVEL = archive_config.get("level", 6)
+WORKERS = archive_config.get("workers", 0) or os.cpu_count() or 1
+BLOCK_SIZE = archive_config.get("block_size", 4 * 1024 * 1024)
+SPOOL_BYTES = archive_config.get("spool_bytes", 8 * 1024 * 1024)
+PROGRESS_SECONDS = archive_config.get("progress_seconds", 2.0)
+CHUNK_SIZE = 1024 * 1024
+
+FORMATS = ("zip", "tar.gz")
+ZIP_METHODS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+
+class CompressedMember(NamedTuple):
+    """A zip member compressed by a worker, waiting to be appended."""
+
+    info: zipfile.ZipInfo
+    crc: int
+    file_size: int
+    compress_size: int
+    data: IO[bytes]
+
+
+def _members(source: str, archive_path: str) -> List[Tuple[str, str, int]]:
+    """Returns the (path, archive name, size) of the files below `source`."""
+    archive_path = os.path.abspath(archive_path)
+    members = []
+    for entry in iter_file_entries(source):
+        if os.path.abspath(entry.path) == archive_path:
+            continue
+        try:
+            size = entry.stat().st_size
+        except OSError as e:
+            logger.error("Cannot archive '%s': %s", entry.path, e)
+            continue
+        members.append((entry.path, os.path.relpath(entry.path, source), size))
+    return members
+
+
+def _compress_member(
+    path: str, arcname: str, method: int, level: int
+) -> CompressedMember:
+    """Compresses one file into a spooled temporary file, reading it in chunks."""
+    info = zipfile.ZipInfo.from_file(path, arcname)
+    info.compress_type = method
+    # The compressor zipfile itself would use, so that the member is readable by it
+    # pylint: disable-next=protected-access
+    compressor = zipfile._get_compressor(method, level)  # type: ignore[attr-defined]
+    # Returned open: the writer closes it once the member is appended
+    # pylint: disable-next=consider-using-with
+    data = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    crc = file_size = 0
+    try:
+        with open(path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                data.write(compressor.compress(chunk) if compressor else chunk)
+        if compressor:
+            data.write(compressor.flush())
+    except BaseException:
+        data.close()
+        raise
+    compress_size = data.tell()
+    data.seek(0)
+    return CompressedMember(info, crc, file_size, compress_size, data)
+
+
+def _append_member(archive: zipfile.ZipFile, member: CompressedMember) -> None:
+    """
+    Appends a compressed member to a zip archive opened for writing.
+
+    This is what `ZipFile.open(..., "w")` does for a seekable file, with the sizes and
+    CRC known upfront so that the data is copied as is instead of compressed again.
+    """
+    info = member.info
+    info.CRC = member.crc
+    info.file_size = member.file_size
+    info.compress_size = member.compress_size
+    info.flag_bits = 0
+    if info.compress_type == zipfile.ZIP_LZMA:
+        info.flag_bits |= 0x02  # the data ends with an end-of-stream marker
+    zip64 = max(member.file_size, member.compress_size) > zipfile.ZIP64_LIMIT
+    fp = archive.fp
+    if fp is None:
+        raise ValueError("Attempt to write to ZIP archive that was already closed")
+    # Private zipfile API, missing from its type stubs
+    # pylint: disable=protected-access
+    fp.seek(archive.start_dir)
+    info.header_offset = fp.tell()
+    archive._writecheck(info)  # type: ignore[attr-defined]
+    archive._didModify = True  # type: ignore[attr-defined]
+    fp.write(info.FileHeader(zip64))
+    shutil.copyfileobj(member.data, fp, CHUNK_SIZE)
+    archive.start_dir = fp.tell()
+    archive.filelist.append(info)
+    archive.NameToInfo[info.filename] = info
+
+
+@functools.cache
+def parallel_zip_supported() -> bool:
+    """
+    Checks once that the `zipfile` internals used to append members still work.
+
+    A small archive is built in memory with every compression method and read back;
+    any error or mismatch disables the parallel zip writer.
+    """
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "member.txt")
+            with open(path, "wb") as file:
+                file.write(b"zipfile check\n" * 100)
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w") as zf:
+                for name, method in ZIP_METHODS.items():
+                    member = _compress_member(path, name, method, LEVEL)
+                    with member.data:
+                        _append_member(zf, member)
+            with zipfile.ZipFile(buffer) as zf:
+                supported = zf.testzip() is None and all(
+                    zf.read(name) == b"zipfile check\n" * 100 for name in ZIP_METHODS
+                )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("Parallel zip writer unavailable: %s", e)
+        return False
+    if not supported:
+        logger.warning("Parallel zip writer unavailable: the check archive is invalid")
+    return supported
+
+
+def _write_zip_serial(
+    archive_path: str,
+    members: List[Tuple[str, str, int]],
+    method: int,
+    level: int,
+    progress: ProgressTracker,
+) -> None:
+    """Writes the members one by one through the public `zipfile` API."""
+    with zipfile.ZipFile(archive_path, "w", allowZip64=True) as archive:
+        for path, arcname, size in members:
+            archive.write(path, arcname, method, level)
+            progress.advance(size)
+
+
+def _write_zip(
+    archive_path: str,
+    members: List[Tuple[str, str, int]],
+    method: int,
+    level: int,
+    workers: int,
+    progress: ProgressTracker,
+) -> None:
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(workers, thread_name_prefix="archive") as pool:
+        with zipfile.ZipFile(archive_path, "w", allowZip64=True) as archive:
+
+            def append_oldest() -> None:
+                member = pending.popleft().result()
+                with member.data:
+                    _append_member(archive, member)
+                progress.advance(member.file_size)
+
+            for path, arcname, _ in members:
+                pending.append(
+                    pool.submit(_compress_member, path, arcname, method, level)
+                )
+                if len(pending) >= 2 * workers:
+                    append_oldest()
+            while pending:
+                append_oldest()
+
+
+class ParallelGzipWriter:
+    """
+    Write-only file object compressing its input into concatenated gzip members.
+
+    Input is cut into blocks compressed in parallel; the compressed blocks are
+    written to `fileobj` in order, with at most two blocks per worker in flight.
+    """
+
+    def __init__(
+        self, fileobj: IO[bytes], pool: ThreadPoolExecutor, level: int, workers: int
+    ):
+        self.fileobj = fileobj
+        self.pool = pool
+        self.level = level
+        self._buffer = bytearray()
+        self._pending: Deque[Future] = deque()
+        self._max_pending = 2 * workers
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(
+            self.pool.submit(gzip.compress, block, compresslevel=self.level, mtime=0)
+        )
+        while len(self._pending) >= self._max_pending:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def write(self, data: bytes) -> int:
+        """Buffers data, submitting a block for compression once it is full."""
+        self._buffer += data
+        while len(self._buffer) >= BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:BLOCK_SIZE]))
+            del self._buffer[:BLOCK_SIZE]
+        return len(data)
+
+    def close(self) -> None:
+        """Compresses the last block and writes every pending member."""
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self.fileobj.write(self._pending.popleft().result())
+
+
+def _write_tar_gz(
+    archive_path: str,
+    members: List[Tuple[str, str, int]],
+    level: int,
+    workers: int,
+    progress: ProgressTracker,
+) -> None:
+    with ThreadPoolExecutor(workers, thread_name_prefix="archive") as pool:
+        with open(archive_path, "wb") as file:
+            writer = ParallelGzipWriter(file, pool, level, workers)
+            # Stream mode: members are copied in chunks and never seeked back to, so
+            # the writer needs no read, seek or tell despite the type stubs
+            with tarfile.open(  # type: ignore[call-overload]
+                fileobj=writer, mode="w|", bufsize=CHUNK_SIZE
+            ) as tar:
+                for path, arcname, size in members:
+                    tar.add(path, arcname, recursive=False)
+                    progress.advance(size)
+            writer.close()
+
+
+def build_archive(
+    source: str,
+    archive_path: str,
+    archive_format: str = FORMAT,
+    compression: str = COMPRESSION,
+    level: int = LEVEL,
+    workers: int = WORKERS,
+    progress: Optional[ProgressCallback] = None,
+) -> dict:
+    """
+    Archives every file below a folder.
+
+    :param source: The folder to archive.
+    :param archive_path: The archive to create; it is skipped if it lies in `source`.
+    :param archive_format: "zip" or "tar.gz".
+    :param compression: For zip, "deflate", "bzip2", "lzma" or "stored".
+    :param level: The compression level, 1 (fastest) to 9 (smallest).
+    :param workers: The number of compressing threads.
+    :param progress: Called with a `Progress` after each archived file.
+    :return: The number of members, the input and output sizes and the duration.
+    :raises ValueError: If the format or compression method is unknown.
+    :raises NotADirectoryError: If `source` is not a folder.
+    """
+    if archive_format not in FORMATS:
+        raise ValueError(f"Unknown archive format '{archive_format}', use {FORMATS}.")
+    if archive_format == "zip" and compression not in ZIP_METHODS:
+        raise ValueError(
+            f"Unknown compression '{compression}', use one of {sorted(ZIP_METHODS)}."
+        )
+    if not os.path.isdir(source):
+        raise NotADirectoryError(f"The path '{source}' is not a directory.")
+    level = min(max(level, 1), 9)
+    workers = max(1, workers)
+
+    start = time.perf_counter()
+    members = _members(source, archive_path)
+    bytes_in = sum(size for _, _, size in members)
+    counter = ProgressTracker(
+        "Archived", len(members), bytes_in, progress, PROGRESS_SECONDS
+    )
+    if archive_format == "zip" and not parallel_zip_supported():
+        _write_zip_serial(
+            archive_path, members, ZIP_METHODS[compression], level, counter
+        )
+    elif archive_format == "zip":
+        _write_zip(
+            archive_path, members, ZIP_METHODS[compression], level, workers, counter
+        )
+    else:
+        _write_tar_gz(archive_path, members, level, workers, counter)
+
+    bytes_out = os.path.getsize(archive_path)
+    stats = {
+        "archive": archive_path,
+        "format": archive_format,
+        "compression": compression if archive_format == "zip" else "gzip",
+        "members": len(members),
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "ratio": round(bytes_out / bytes_in, 4) if bytes_in else 0.0,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info("Built archive %s", stats)
+    return stats
@@ -0,0 +1,337 @@
+"""
+Bulk Operations Module.
+
+This module provides bulk variants of the rename, move, copy and delete tools, so that
+an agent changes many files with a single tool call instead of one call per file.
+
+The files are given either as a list of paths or as a folder and a glob pattern
+matched against the file names (optionally in every subfolder). The operations run in
+parallel on a thread pool and the tools return a compact summary: the number of
+succeeded, skipped and failed files and one short status line per file, paged like
+other large results.
+"""
+
+import fnmatch
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from langchain.agents import tool
+from src.tools.copy_engine import copy_file
+from src.tools.result_store import paginate
+from src.tools.tool_cache import invalidate_paths
+from src.tools.traversal import file_entries, iter_file_entries
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+bulk_config = config.get("bulk_operations", {})
+
+WORKERS = bulk_config.get("workers", 8)
+MAX_FILES = bulk_config.get("max_files", 10000)
+
+OK = "ok"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+# A planned operation: the source file and its target, None for a deletion
+Operation = Tuple[str, Optional[str]]
+
+
+def select_files(
+    paths: Optional[List[str]] = None,
+    directory: str = "",
+    pattern: str = "*",
+    recursive: bool = False,
+) -> List[str]:
+    """
+    Returns the files a bulk operation applies to.
+
+    :param paths: Explicit file paths; when given, the other arguments are ignored.
+    :param directory: The folder whose files are matched against `pattern`.
+    :param pattern: A glob pattern matched against the file names, e.g. "*.txt".
+    :param recursive: Also match the files of every subfolder of `directory`.
+    :return: The selected file paths.
+    :raises ValueError: If neither paths nor a directory is given, or if the
+                        selection exceeds `bulk_operations.max_files`.
+    """
+    if paths:
+        selected = list(dict.fromkeys(paths))
+    elif directory:
+        if not os.path.isdir(directory):
+            raise NotADirectoryError(f"The path '{directory}' is not a directory.")
+        entries = iter_file_entries(directory) if recursive else file_entries(directory)
+        selected = [
+            entry.path for entry in entries if fnmatch.fnmatch(entry.name, pattern)
+        ]
+    else:
+        raise ValueError("Give either a list of paths or a directory and a pattern.")
+    if len(selected) > MAX_FILES:
+        raise ValueError(
+            f"The selection contains {len(selected)} files, more than the limit of "
+            f"{MAX_FILES}; narrow the pattern or split the operation."
+        )
+    return selected
+
+
+def rename_target(
+    path: str, new_extension: str = "", old: str = "", new: str = ""
+) -> str:
+    """
+    Returns the new path of a renamed file, in the same folder.
+
+    :param path: The file to rename.
+    :param new_extension: Replaces the extension, e.g. "log" or ".log".
+    :param old: A substring of the name to replace with `new`.
+    :param new: The replacement of `old`.
+    :return: The new path.
+    """
+    folder, name = os.path.split(path)
+    if old:
+        name = name.replace(old, new)
+    if new_extension:
+        name = os.path.splitext(name)[0] + "." + new_extension.lstrip(".")
+    return os.path.join(folder, name)
+
+
+def _normalize(operations: Sequence[Operation]) -> List[Operation]:
+    """Makes the paths absolute, so that different spellings of a path compare equal.
+
+    A source given twice is kept once, with its first target.
+    """
+    normalized: Dict[str, Optional[str]] = {}
+    for source, target in operations:
+        normalized.setdefault(
+            os.path.abspath(source), os.path.abspath(target) if target else None
+        )
+    return list(normalized.items())
+
+
+def _check_targets(operations: List[Operation], overwrite: bool) -> Dict[str, str]:
+    """Returns the skip reason of the operations whose target is taken."""
+    skipped = {}
+    claimed = set()
+    for source, target in operations:
+        if target is None:
+            continue
+        if target == source:
+            skipped[source] = "unchanged"
+        elif target in claimed:
+            skipped[source] = f"{target} is the target of another file"
+        elif not overwrite and os.path.exists(target):
+            skipped[source] = f"{target} already exists"
+        claimed.add(target)
+    return skipped
+
+
+def _waves(
+    operations: List[Operation], skipped: Dict[str, str]
+) -> Iterator[List[Operation]]:
+    """
+    Yields the operations in dependency order, as groups that can run in parallel.
+
+    An operation whose target is the source of another one of the batch waits until
+    that file has been handled, so that a chain such as a -> b, b -> c never writes
+    over b before b was moved or copied. If the other operation did not succeed,
+    the waiting one is skipped; operations that wait on each other in a cycle are
+    skipped too. The caller records the outcome of a wave in `skipped` (failures
+    included) before asking for the next one.
+
+    :param operations: The normalized (source, target) pairs.
+    :param skipped: The skip reasons, keyed by source; updated in place.
+    """
+    pending = list(operations)
+    while pending:
+        sources = {source for source, _ in pending}
+        ready = [
+            (source, target)
+            for source, target in pending
+            if target is None or target == source or target not in sources
+        ]
+        if not ready:
+            for source, _ in pending:
+                skipped[source] = "part of a cycle of operations"
+            ready = pending
+        for source, target in ready:
+            if target in skipped and source not in skipped:
+                skipped[source] = f"the operation on {target} did not succeed"
+        yield ready
+        done = {source for source, _ in ready}
+        pending = [operation for operation in pending if operation[0] not in done]
+
+
+def run_bulk(
+    name: str,
+    operations: Sequence[Operation],
+    apply: Callable[[str, Optional[str]], None],
+    overwrite: bool = False,
+) -> dict:
+    """
+    Applies a file operation to many files in parallel and summarizes the outcome.
+
+    An operation is skipped when its target already exists (unless `overwrite`) or
+    is claimed by another file of the same batch; a failing operation is reported
+    and does not stop the others. Operations whose target is the source of another
+    one run after it, see `_waves`.
+
+    :param name: The name of the bulk tool, used in logs and result handles.
+    :param operations: The (source, target) pairs; the target is None for deletions.
+    :param apply: Performs one operation.
+    :param overwrite: Replace existing targets instead of skipping them.
+    :return: The counts of succeeded, skipped and failed files and their status lines.
+    """
+    operations = _normalize(operations)
+    skipped = _check_targets(operations, overwrite)
+
+    def run(operation: Operation) -> Tuple[str, str]:
+        source, target = operation
+        label = source if target is None else f"{source} -> {target}"
+        if source in skipped:
+            return SKIPPED, f"{label}: skipped ({skipped[source]})"
+        try:
+            apply(source, target)
+        except OSError as e:
+            return FAILED, f"{label}: failed ({e.strerror or e})"
+        return OK, f"{label}: ok"
+
+    results: Dict[str, Tuple[str, str]] = {}
+    with ThreadPoolExecutor(WORKERS, thread_name_prefix="bulk") as pool:
+        for wave in _waves(operations, skipped):
+            for (source, _), outcome in zip(wave, pool.map(run, wave)):
+                results[source] = outcome
+                if outcome[0] == FAILED:
+                    skipped[source] = "failed"
+    outcomes = [results[source] for source, _ in operations]
+
+    changed = [
+        path
+        for (source, target), (status, _) in zip(operations, outcomes)
+        if status == OK
+        for path in (source, target)
+        if path is not None
+    ]
+    if changed:
+        invalidate_paths(*changed)
+    counts = {status: 0 for status in (OK, SKIPPED, FAILED)}
+    for status, _ in outcomes:
+        counts[status] += 1
+    logger.info(
+        "%s: %d succeeded, %d skipped, %d failed",
+        name,
+        counts[OK],
+        counts[SKIPPED],
+        counts[FAILED],
+    )
+    return {
+        "total": len(operations),
+        "succeeded": counts[OK],
+        "skipped": counts[SKIPPED],
+        "failed": counts[FAILED],
+        "results": paginate(name, [line for _, line in outcomes]),
+    }
+
+
+def _required(target: Optional[str]) -> str:
+    """Returns the target of a rename, move or copy, which cannot be missing."""
+    if target is None:
+        raise ValueError("The operation needs a target path.")
+    return target
+
+
+def _rename(source: str, target: Optional[str]) -> None:
+    os.rename(source, _required(target))
+
+
+def _move(source: str, target: Optional[str]) -> None:
+    shutil.move(source, _required(target))
+
+
+def _copy(source: str, target: Optional[str]) -> None:
+    copy_file(source, _required(target), preserve_metadata=True)
+
+
+def _delete(source: str, _: Optional[str]) -> None:
+    os.remove(source)
+
+
+def _into(destination: str, files: List[str]) -> List[Operation]:
+    """Pairs each file with its path inside the destination folder."""
+    if not os.path.isdir(destination):
+        raise NotADirectoryError(f"The path '{destination}' is not a directory.")
+    return [(path, os.path.join(destination, os.path.basename(path))) for path in files]
+
+
+@tool
+def bulk_rename_files(
+    paths: Optional[List[str]] = None,
+    directory: str = "",
+    pattern: str = "*",
+    recursive: bool = False,
+    new_extension: str = "",
+    old: str = "",
+    new: str = "",
+    overwrite: bool = False,
+) -> dict:
+    """Renames many files in one call, in place. Select the files with a list of
+    paths, or with a directory and a glob pattern on the names (e.g. '*.txt', with
+    recursive for subfolders). Each name gets new_extension (e.g. 'log') and/or has
+    the substring old replaced by new. Existing files are skipped unless overwrite.
+    Returns counts and one status line per file."""
+    if not (new_extension or old):
+        raise ValueError("Give a new_extension or an old substring to replace.")
+    files = select_files(paths, directory, pattern, recursive)
+    operations: List[Operation] = [
+        (path, rename_target(path, new_extension, old, new)) for path in files
+    ]
+    return run_bulk("bulk_rename_files", operations, _rename, overwrite)
+
+
+@tool
+def bulk_move_files(
+    destination: str,
+    paths: Optional[List[str]] = None,
+    directory: str = "",
+    pattern: str = "*",
+    recursive: bool = False,
+    overwrite: bool = False,
+) -> dict:
+    """Moves many files into the destination folder in one call. Select the files
+    with a list of paths, or with a directory and a glob pattern on the names (with
+    recursive for subfolders). Existing files are skipped unless overwrite. Returns
+    counts and one status line per file."""
+    operations = _into(destination, select_files(paths, directory, pattern, recursive))
+    return run_bulk("bulk_move_files", operations, _move, overwrite)
+
+
+@tool
+def bulk_copy_files(
+    destination: str,
+    paths: Optional[List[str]] = None,
+    directory: str = "",
+    pattern: str = "*",
+    recursive: bool = False,
+    overwrite: bool = False,
+) -> dict:
+    """Copies many files into the destination folder in one call. Select the files
+    with a list of paths, or with a directory and a glob pattern on the names (with
+    recursive for subfolders). Existing files are skipped unless overwrite. Returns
+    counts and one status line per file."""
+    operations = _into(destination, select_files(paths, directory, pattern, recursive))
+    return run_bulk("bulk_copy_files", operations, _copy, overwrite)
+
+
+@tool
+def bulk_delete_files(
+    paths: Optional[List[str]] = None,
+    directory: str = "",
+    pattern: str = "",
+    recursive: bool = False,
+) -> dict:
+    """Deletes many files in one call. Select the files with a list of paths, or
+    with a directory and a glob pattern on the names (e.g. '*.tmp', with recursive
+    for subfolders). Returns counts and one status line per file."""
+    if not paths and not pattern:
+        raise ValueError("Give a list of paths or a pattern of the files to delete.")
+    operations: List[Operation] = [
+        (path, None) for path in select_files(paths, directory, pattern, recursive)
+    ]
+    return run_bulk("bulk_delete_files", operations, _delete)
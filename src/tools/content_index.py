@@ -0,0 +1,385 @@
+"""
+Content Index Module.
+
+This module maintains an optional on-disk trigram index of text file contents. A keyword
+search looks up the files containing every trigram of the keyword and only reads those
+candidates to confirm the match, instead of reading the whole tree.
+
+Each file is indexed with its size and modification time. The index is kept fresh by
+the file watcher and by the write tools, which re-index the paths they change in the
+background; searches only read the index and the candidate files, so they take
+milliseconds whatever the size of the tree. With `verify_freshness`, forced on when
+the watcher is not running, the candidates are also stat'ed and those that changed
+are re-indexed in the background. Binary files and files above the content search
+size limit never match and are stored without trigrams; files above the trigram size
+limit are stored as always-candidates and verified on every search.
+
+Usage:
+    poetry run python -m src.tools.content_index build <path>
+    poetry run python -m src.tools.content_index refresh <path>
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from src.tools.content_search import (
+    BINARY_SNIFF_SIZE,
+    CHUNK_SIZE,
+    is_binary,
+    parallel_search,
+    within_size_limit,
+)
+from src.tools.file_index import (
+    RootedIndex,
+    index_cli,
+    index_config,
+    subtree_bounds,
+    within_roots,
+)
+from src.tools.file_watcher import watcher_config
+from src.tools.traversal import iter_file_entries
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+from src.utils.sqlite_utils import connect
+
+content_index_config = config.get("content_index", {})
+
+# Keywords shorter than a trigram cannot use the index
+TRIGRAM = 3
+# Number of keyword trigrams intersected per query; more only narrow the candidates
+MAX_QUERY_TRIGRAMS = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    indexed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    trigram BLOB NOT NULL,
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings(doc_id);
+"""
+
+
+def trigrams(data: bytes) -> Set[bytes]:
+    """Returns the distinct 3-byte substrings of `data`."""
+    return {data[i : i + TRIGRAM] for i in range(len(data) - TRIGRAM + 1)}
+
+
+def file_trigrams(file_path: str, max_size: int) -> Optional[Set[bytes]]:
+    """
+    Streams a file and collects its trigrams.
+
+    :param file_path: The file to index.
+    :param max_size: Files larger than this are not broken into trigrams.
+    :return: The trigrams of the file, an empty set for files that can never match a
+             content search (binary or above the search size limit), or None for files
+             too large to index that must always be verified.
+    """
+    with open(file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if not within_size_limit(size):
+            return set()
+        if max_size and size > max_size:
+            return None
+        chunk = file.read(max(CHUNK_SIZE, BINARY_SNIFF_SIZE))
+        if is_binary(chunk):
+            return set()
+        found: Set[bytes] = set()
+        tail = b""
+        while chunk:
+            window = tail + chunk
+            found |= trigrams(window)
+            tail = window[-(TRIGRAM - 1) :]
+            chunk = file.read(CHUNK_SIZE)
+    return found
+
+
+class ContentIndex(RootedIndex):
+    """SQLite-backed trigram index of text file contents."""
+
+    def __init__(
+        self, db_path: str, max_file_size: int = 0, verify_freshness: bool = False
+    ):
+        super().__init__(db_path, SCHEMA)
+        self.max_file_size = max_file_size
+        self.verify_freshness = verify_freshness
+        # Re-indexing requested by searches and write tools, off their call path
+        self._updates = ThreadPoolExecutor(1, thread_name_prefix="content-index")
+
+    # Maintenance ------------------------------------------------------------
+
+    def refresh(self, root: str, full: bool = False) -> Dict[str, int]:
+        """
+        Indexes the files below `root` that are new or changed since the last refresh.
+
+        :param root: The directory to index.
+        :param full: Index every file regardless of its size and modification time.
+        :return: Counters of indexed, unchanged and removed files.
+        """
+        root = os.path.abspath(root)
+        if not os.path.isdir(root):
+            raise NotADirectoryError(f"The path '{root}' is not a directory.")
+
+        started = time.perf_counter()
+        stats = {"files_indexed": 0, "files_unchanged": 0, "files_removed": 0}
+        with connect(self.db_path, self._write_lock) as conn:
+            known = self._load_docs(conn, root)
+            current = _stat_tree(root)
+            for path, (size, mtime_ns) in current.items():
+                doc = known.get(path)
+                if not full and doc is not None and doc[1:] == (size, mtime_ns):
+                    stats["files_unchanged"] += 1
+                    continue
+                self._index_file(conn, path, size, mtime_ns)
+                stats["files_indexed"] += 1
+            removed = [path for path in known if path not in current]
+            self._remove_files(conn, removed)
+            stats["files_removed"] = len(removed)
+            conn.execute(
+                "INSERT OR REPLACE INTO roots (path, indexed_at) VALUES (?, ?)",
+                (root, time.time()),
+            )
+        logger.info(
+            "Refreshed content index for '%s' in %.2fs: %s",
+            root,
+            time.perf_counter() - started,
+            stats,
+        )
+        return stats
+
+    def update_paths(self, paths: Iterable[str]) -> None:
+        """
+        Re-indexes changed files; usable as a file watcher listener.
+
+        Directories are refreshed with their subtree and vanished paths are removed
+        together with anything indexed below them.
+
+        :param paths: The created, modified, renamed or deleted paths.
+        """
+        roots = self.roots()
+        for path in paths:
+            if not within_roots(path, roots):
+                continue
+            if os.path.isdir(path):
+                self._refresh_subtree(path)
+                continue
+            with connect(self.db_path, self._write_lock) as conn:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    low, high = subtree_bounds(path)
+                    vanished = [path] + [
+                        row[0]
+                        for row in conn.execute(
+                            "SELECT path FROM docs WHERE path >= ? AND path < ?",
+                            (low, high),
+                        )
+                    ]
+                    self._remove_files(conn, vanished)
+                    continue
+                self._index_file(conn, path, stat.st_size, stat.st_mtime_ns)
+
+    def schedule_update(self, paths: Iterable[str]) -> Future:
+        """Re-indexes changed paths in the background, one update at a time."""
+        return self._updates.submit(self.update_paths, list(paths))
+
+    def _refresh_subtree(self, path: str) -> None:
+        """Refreshes a directory without registering it as a root."""
+        with connect(self.db_path, self._write_lock) as conn:
+            known = self._load_docs(conn, path)
+            current = _stat_tree(path)
+            for file_path, (size, mtime_ns) in current.items():
+                doc = known.get(file_path)
+                if doc is None or doc[1:] != (size, mtime_ns):
+                    self._index_file(conn, file_path, size, mtime_ns)
+            self._remove_files(conn, [p for p in known if p not in current])
+
+    @staticmethod
+    def _load_docs(conn: sqlite3.Connection, root: str) -> Dict[str, tuple]:
+        """Returns the indexed files below `root` as path -> (id, size, mtime_ns)."""
+        low, high = subtree_bounds(root)
+        rows = conn.execute(
+            "SELECT path, id, size, mtime_ns FROM docs WHERE path >= ? AND path < ?",
+            (low, high),
+        )
+        return {path: (doc_id, size, mtime_ns) for path, doc_id, size, mtime_ns in rows}
+
+    def _index_file(
+        self, conn: sqlite3.Connection, path: str, size: int, mtime_ns: int
+    ) -> None:
+        """Replaces the postings of one file."""
+        try:
+            grams = file_trigrams(path, self.max_file_size)
+        except OSError as e:
+            logger.warning("Cannot index '%s': %s", path, e)
+            return
+        row = conn.execute("SELECT id FROM docs WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+        doc_id = conn.execute(
+            "INSERT OR REPLACE INTO docs (id, path, size, mtime_ns, indexed) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (row[0] if row else None, path, size, mtime_ns, int(grams is not None)),
+        ).lastrowid
+        if grams:
+            conn.executemany(
+                "INSERT OR IGNORE INTO postings (trigram, doc_id) VALUES (?, ?)",
+                ((gram, doc_id) for gram in grams),
+            )
+
+    @staticmethod
+    def _remove_files(conn: sqlite3.Connection, paths: Iterable[str]) -> None:
+        """Removes files and their postings from the index."""
+        for path in paths:
+            row = conn.execute("SELECT id FROM docs WHERE path = ?", (path,)).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+                conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+
+    # Queries ----------------------------------------------------------------
+
+    def candidates(self, path: str, needle: bytes) -> Dict[str, tuple]:
+        """
+        Returns the indexed files below `path` that may contain `needle`.
+
+        :param path: The directory to search.
+        :param needle: The encoded keyword, at least three bytes long.
+        :return: The candidate paths mapped to their indexed (size, mtime_ns).
+        """
+        grams = sorted(trigrams(needle))[:MAX_QUERY_TRIGRAMS]
+        low, high = subtree_bounds(os.path.abspath(path))
+        placeholders = ", ".join("?" * len(grams))
+        sql = (
+            "SELECT path, size, mtime_ns FROM docs WHERE path >= ? AND path < ? "
+            "AND (indexed = 0 OR id IN ("
+            f"SELECT doc_id FROM postings WHERE trigram IN ({placeholders}) "
+            "GROUP BY doc_id HAVING count(*) = ?))"
+        )
+        with connect(self.db_path) as conn:
+            rows = conn.execute(sql, (low, high, *grams, len(grams)))
+            return {row[0]: (row[1], row[2]) for row in rows}
+
+    def search(self, path: str, needle: bytes, limit: int = 0) -> List[str]:
+        """
+        Returns the files below `path` containing `needle`, in path order.
+
+        Candidates from the index are confirmed by reading them. With freshness
+        verification enabled the candidates are also stat'ed: vanished files are
+        dropped and changed ones are re-indexed in the background. Files changed
+        outside the candidates are picked up by the watcher and the write tools.
+
+        :param path: The directory to search.
+        :param needle: The encoded keyword, at least three bytes long.
+        :param limit: Stop after this many results; 0 means no limit.
+        :return: The matching file paths.
+        """
+        candidates = self.candidates(path, needle)
+        if self.verify_freshness:
+            stale = []
+            for file_path, meta in list(candidates.items()):
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    del candidates[file_path]
+                    stale.append(file_path)
+                    continue
+                if (stat.st_size, stat.st_mtime_ns) != meta:
+                    stale.append(file_path)
+            if stale:
+                self.schedule_update(stale)
+        return parallel_search(sorted(candidates), needle, limit=limit)
+
+    def status(self) -> Dict[str, object]:
+        """Returns the indexed roots and the number of indexed files and postings."""
+        with connect(self.db_path) as conn:
+            docs = conn.execute("SELECT count(*) FROM docs").fetchone()[0]
+            postings = conn.execute("SELECT count(*) FROM postings").fetchone()[0]
+        return {
+            "db_path": self.db_path,
+            "roots": self.roots(),
+            "files": docs,
+            "postings": postings,
+        }
+
+
+def _stat_tree(root: str) -> Dict[str, Tuple[int, int]]:
+    """Returns every file below `root` mapped to its (size, mtime_ns)."""
+    files: Dict[str, Tuple[int, int]] = {}
+    for entry in iter_file_entries(root):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+_content_index: Optional[ContentIndex] = None
+_content_index_lock = threading.Lock()
+
+
+def is_watched() -> bool:
+    """Checks whether the server runs the file watcher that feeds the content index.
+
+    Without it, nothing reports the files changed outside the tools, so the index
+    verifies the candidates of every search instead.
+    """
+    return index_config.get("enabled", False) and watcher_config.get("enabled", False)
+
+
+def open_content_index() -> ContentIndex:
+    """Returns the shared content index, creating its database if needed."""
+    global _content_index  # pylint: disable=global-statement
+    if _content_index is None:
+        with _content_index_lock:
+            if _content_index is None:
+                _content_index = ContentIndex(
+                    content_index_config.get("db_path", ".content_index.sqlite3"),
+                    max_file_size=content_index_config.get(
+                        "max_file_size", 16 * 1024 * 1024
+                    ),
+                    verify_freshness=content_index_config.get("verify_freshness", False)
+                    or not is_watched(),
+                )
+    return _content_index
+
+
+def get_content_index(path: str) -> Optional[ContentIndex]:
+    """
+    Returns the content index if it is enabled and covers `path`, otherwise None.
+
+    :param path: The directory the caller is about to search.
+    :return: The shared content index or None.
+    """
+    if not content_index_config.get("enabled", False):
+        return None
+    index = open_content_index()
+    return index if index.covers(path) else None
+
+
+def update_content_index(paths: Iterable[str]) -> None:
+    """Re-indexes changed paths in the background if the content index is enabled."""
+    if content_index_config.get("enabled", False):
+        open_content_index().schedule_update(paths)
+
+
+def main() -> None:
+    """Command line entry point to build, refresh or inspect the content index."""
+    index_cli("Manage the trigram content index.", open_content_index)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Content Search Module.
+
+This module provides the streaming matcher used by the content search tools. Files are
+read in fixed-size chunks, with an overlap so that matches spanning two chunks are
+found, and reading stops at the first hit. Binary files and files above the configured
+size limit are skipped, so memory use does not depend on the size of the files.
+
+Files are matched in parallel: a traversal producer feeds a thread or process pool
+through a bounded window, results are returned in traversal order, and outstanding
+work is cancelled as soon as the requested number of results is reached.
+
+`grep_file` returns the matching lines themselves, with their numbers and context.
+It reads the same chunks, cut at line boundaries, and only splits into lines the
+chunks the pattern matches somewhere, so files with few matches are scanned at the
+speed of the regular expression engine.
+"""
+
+import os
+import re
+import threading
+from collections import deque
+from contextlib import closing
+from functools import partial
+from itertools import islice
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    IO,
+    Callable,
+    Deque,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+search_config = config.get("search", {})
+
+CHUNK_SIZE = search_config.get("chunk_size", 1024 * 1024)
+MAX_FILE_SIZE = search_config.get("max_file_size", 0)
+WORKERS = search_config.get("workers", os.cpu_count() or 4)
+EXECUTOR = search_config.get("executor", "thread")
+MAX_MATCHES = search_config.get("max_matches", 200)
+MAX_MATCHES_PER_FILE = search_config.get("max_matches_per_file", 20)
+MAX_LINE_CHARS = search_config.get("max_line_chars", 300)
+MAX_LINE_BYTES = search_config.get("max_line_bytes", 1024 * 1024)
+BINARY_SNIFF_SIZE = 8192
+# Number of files queued per worker ahead of the one being collected
+PREFETCH_PER_WORKER = 4
+
+
+def is_binary(sample: bytes) -> bool:
+    """Returns True if the sample looks like binary data (it contains a NUL byte)."""
+    return b"\0" in sample[:BINARY_SNIFF_SIZE]
+
+
+def within_size_limit(size: int, max_file_size: Optional[int] = None) -> bool:
+    """Checks a file size against the limit; a limit of 0 disables the check."""
+    limit = MAX_FILE_SIZE if max_file_size is None else max_file_size
+    return not limit or size <= limit
+
+
+def file_contains(
+    file_path: str,
+    needle: bytes,
+    chunk_size: int = CHUNK_SIZE,
+    max_file_size: Optional[int] = None,
+    cancel: Optional[threading.Event] = None,
+) -> bool:
+    """
+    Streams a file and reports whether it contains `needle`.
+
+    :param file_path: The file to search.
+    :param needle: The encoded keyword to look for.
+    :param chunk_size: The number of bytes read at a time.
+    :param max_file_size: Skip larger files; defaults to the configured limit.
+    :param cancel: Optional event that stops reading when set.
+    :return: True at the first occurrence of `needle`, False otherwise or if the file
+             is binary or too large.
+    :raises OSError: If the file cannot be opened or read.
+    """
+    with open(file_path, "rb") as file:
+        if not within_size_limit(os.fstat(file.fileno()).st_size, max_file_size):
+            logger.debug("Skipping '%s': above the size limit", file_path)
+            return False
+
+        chunk = file.read(max(chunk_size, BINARY_SNIFF_SIZE))
+        if is_binary(chunk):
+            logger.debug("Skipping binary file '%s'", file_path)
+            return False
+
+        overlap = len(needle) - 1
+        tail = b""
+        while chunk:
+            if cancel is not None and cancel.is_set():
+                return False
+            window = tail + chunk
+            if needle in window:
+                return True
+            tail = window[-overlap:] if overlap > 0 else b""
+            chunk = file.read(chunk_size)
+    return False
+
+
+def _match_file(
+    file_path: str,
+    needle: bytes,
+    chunk_size: int,
+    max_file_size: Optional[int],
+    cancel: Optional[threading.Event] = None,
+) -> bool:
+    """Pool task: matches one file, logging and ignoring unreadable files."""
+    try:
+        return file_contains(file_path, needle, chunk_size, max_file_size, cancel)
+    except OSError as e:
+        logger.error("Error reading file '%s': %s", file_path, e)
+        return False
+
+
+class GrepLine(NamedTuple):
+    """A line returned by `grep_file`: a match or a line of context around one."""
+
+    number: int
+    is_match: bool
+    text: str
+
+
+def _line_blocks(
+    file: IO[bytes], first: bytes, chunk_size: int, max_line_bytes: int
+) -> Iterator[bytes]:
+    """
+    Yields the content of a file in blocks of whole lines.
+
+    A line longer than `max_line_bytes` is cut to that length and the rest of it is
+    skipped while reading, so memory stays bounded for files without line breaks.
+    """
+    carry = b""
+    chunk = first
+    skipping = False
+    while chunk:
+        if skipping:
+            end = chunk.find(b"\n")
+            if end < 0:
+                chunk = file.read(chunk_size)
+                continue
+            chunk, skipping = chunk[end + 1 :], False
+        block = carry + chunk
+        cut = block.rfind(b"\n") + 1
+        block, carry = block[:cut], block[cut:]
+        if block:
+            yield block
+        if len(carry) > max_line_bytes:
+            # The line break stands for the one ending the skipped rest of the line
+            yield carry[:max_line_bytes] + b"\n"
+            carry, skipping = b"", True
+        chunk = file.read(chunk_size)
+    if carry:
+        yield carry
+
+
+def compile_pattern(
+    pattern: str, fixed_strings: bool = False, ignore_case: bool = False
+) -> "re.Pattern[bytes]":
+    """
+    Compiles a pattern for `grep_file`.
+
+    :param pattern: A regular expression, or a literal string if `fixed_strings`.
+    :param fixed_strings: Match `pattern` literally.
+    :param ignore_case: Ignore the case of ASCII letters.
+    :raises ValueError: If the regular expression is invalid.
+    """
+    source = re.escape(pattern) if fixed_strings else pattern
+    # Multiline, so that ^ and $ match at each line of the blocks searched at once
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    try:
+        return re.compile(source.encode("utf-8"), flags)
+    except re.error as e:
+        raise ValueError(f"Invalid regular expression '{pattern}': {e}") from e
+
+
+def _display(line: bytes) -> str:
+    text = line.rstrip(b"\r").decode("utf-8", errors="replace")
+    return text if len(text) <= MAX_LINE_CHARS else text[:MAX_LINE_CHARS] + "..."
+
+
+def grep_file(
+    file_path: str,
+    regex: "re.Pattern[bytes]",
+    context: int = 0,
+    max_matches: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+    max_file_size: Optional[int] = None,
+    cancel: Optional[threading.Event] = None,
+    max_line_bytes: int = MAX_LINE_BYTES,
+) -> List[GrepLine]:
+    """
+    Streams a file and returns its lines matching a regular expression.
+
+    :param file_path: The file to search.
+    :param regex: The pattern from `compile_pattern`, matched against each line
+                  without its line break.
+    :param context: The number of lines returned before and after each match.
+    :param max_matches: Stop after this many matching lines; 0 means no limit.
+    :param chunk_size: The number of bytes read at a time.
+    :param max_file_size: Skip larger files; defaults to the configured limit.
+    :param cancel: Optional event that stops reading when set.
+    :param max_line_bytes: Longer lines are only matched on their first
+                           `max_line_bytes` bytes, e.g. in minified files.
+    :return: The matching lines and their context, in order; empty if the file is
+             binary or too large.
+    :raises OSError: If the file cannot be opened or read.
+    """
+    found: List[GrepLine] = []
+    with open(file_path, "rb") as file:
+        if not within_size_limit(os.fstat(file.fileno()).st_size, max_file_size):
+            logger.debug("Skipping '%s': above the size limit", file_path)
+            return found
+        first = file.read(max(chunk_size, BINARY_SNIFF_SIZE))
+        if is_binary(first):
+            logger.debug("Skipping binary file '%s'", file_path)
+            return found
+
+        before: Deque[Tuple[int, bytes]] = deque(maxlen=context)
+        after = matches = number = 0
+        for block in _line_blocks(file, first, chunk_size, max_line_bytes):
+            if cancel is not None and cancel.is_set():
+                break
+            lines = block.split(b"\n")
+            if block.endswith(b"\n"):
+                lines.pop()
+            if not after and not regex.search(block):
+                # No match in the whole block: only keep its last lines as context
+                if context:
+                    tail = lines[-context:]
+                    before.extend(enumerate(tail, number + len(lines) - len(tail) + 1))
+                number += len(lines)
+                continue
+            for line in lines:
+                number += 1
+                if regex.search(line):
+                    if max_matches and matches >= max_matches:
+                        return found
+                    found.extend(GrepLine(n, False, _display(l)) for n, l in before)
+                    before.clear()
+                    found.append(GrepLine(number, True, _display(line)))
+                    matches += 1
+                    after = context
+                elif after:
+                    found.append(GrepLine(number, False, _display(line)))
+                    after -= 1
+                elif context:
+                    before.append((number, line))
+                if max_matches and matches >= max_matches and not after:
+                    return found
+    return found
+
+
+def _grep_task(
+    file_path: str,
+    regex: "re.Pattern[bytes]",
+    context: int,
+    max_matches: int,
+    cancel: Optional[threading.Event] = None,
+) -> List[GrepLine]:
+    """Pool task: greps one file, logging and ignoring unreadable files."""
+    try:
+        return grep_file(file_path, regex, context, max_matches, cancel=cancel)
+    except OSError as e:
+        logger.error("Error reading file '%s': %s", file_path, e)
+        return []
+
+
+def _make_executor(workers: int, executor: str) -> Executor:
+    """Creates the pool used by the parallel search."""
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+
+
+def _ordered_results(
+    file_paths: Iterable[str], task: Callable, workers: int, executor: str
+) -> Generator[tuple, None, None]:
+    """
+    Runs `task(path, cancel=...)` on a pool and yields the (path, result) pairs.
+
+    At most ``workers * PREFETCH_PER_WORKER`` files are in flight, so the traversal is
+    consumed lazily and memory stays bounded. Results keep the order of `file_paths`;
+    closing the generator cancels the outstanding work.
+    """
+    workers = max(1, workers)
+    cancel = threading.Event() if executor != "process" else None
+    paths = iter(file_paths)
+    pool = _make_executor(workers, executor)
+
+    def submit(file_path: str) -> tuple:
+        return file_path, pool.submit(task, file_path, cancel=cancel)
+
+    window = deque(submit(p) for p in islice(paths, workers * PREFETCH_PER_WORKER))
+    try:
+        while window:
+            file_path, future = window.popleft()
+            window.extend(submit(p) for p in islice(paths, 1))
+            yield file_path, future.result()
+    finally:
+        if cancel is not None:
+            cancel.set()
+        for _, future in window:
+            future.cancel()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parallel_search(
+    file_paths: Iterable[str],
+    needle: bytes,
+    workers: int = WORKERS,
+    limit: int = 0,
+    executor: str = EXECUTOR,
+    chunk_size: int = CHUNK_SIZE,
+    max_file_size: Optional[int] = None,
+) -> List[str]:
+    """
+    Returns the files containing `needle`, matched on a pool of workers.
+
+    Results keep the order of `file_paths`, which makes the output, and the cut-off
+    at `limit`, deterministic.
+
+    :param file_paths: The candidate files, typically from `traversal.iter_files`.
+    :param needle: The encoded keyword to look for.
+    :param workers: The number of parallel matchers.
+    :param limit: Stop after this many results; 0 means no limit.
+    :param executor: "thread" or "process".
+    :param chunk_size: The number of bytes read at a time.
+    :param max_file_size: Skip larger files; defaults to the configured limit.
+    :return: The matching file paths in traversal order.
+    """
+    found: List[str] = []
+    task = partial(
+        _match_file, needle=needle, chunk_size=chunk_size, max_file_size=max_file_size
+    )
+    with closing(_ordered_results(file_paths, task, workers, executor)) as results:
+        for file_path, matched in results:
+            if matched:
+                found.append(file_path)
+                if limit and len(found) >= limit:
+                    break
+    return found
+
+
+def parallel_grep(
+    file_paths: Iterable[str],
+    regex: "re.Pattern[bytes]",
+    context: int = 0,
+    max_matches: int = MAX_MATCHES,
+    max_per_file: int = MAX_MATCHES_PER_FILE,
+    workers: int = WORKERS,
+    executor: str = EXECUTOR,
+) -> Iterator[Tuple[str, List[GrepLine]]]:
+    """
+    Yields the files with matching lines and their lines, grepped on a pool.
+
+    :param file_paths: The candidate files, typically from `traversal.iter_files`.
+    :param regex: The compiled bytes pattern.
+    :param context: The number of lines returned around each match.
+    :param max_matches: Stop after this many matching lines in all; 0 means no limit.
+    :param max_per_file: The most matching lines returned per file; 0 means no limit.
+    :param workers: The number of parallel matchers.
+    :param executor: "thread" or "process".
+    :return: The (path, lines) of the matching files, in traversal order.
+    """
+    task = partial(_grep_task, regex=regex, context=context, max_matches=max_per_file)
+    remaining = max_matches
+    with closing(_ordered_results(file_paths, task, workers, executor)) as results:
+        for file_path, lines in results:
+            matches = [line.number for line in lines if line.is_match]
+            if not matches:
+                continue
+            if max_matches and len(matches) >= remaining:
+                # Keep the context after the last match within the total limit
+                last = matches[remaining - 1] + context
+                if len(matches) > remaining:
+                    last = min(last, matches[remaining] - 1)
+                yield file_path, [line for line in lines if line.number <= last]
+                return
+            remaining -= len(matches)
+            yield file_path, lines
@@ -0,0 +1,307 @@
+"""
+Copy Engine Module.
+
+This module copies files and folder trees for the copy and move tools:
+
+- File data is copied by the kernel with `os.copy_file_range` (which also lets file
+  systems clone or copy server-side), then `os.sendfile`, falling back to a buffered
+  copy where neither is available.
+- The files of a tree are copied in parallel on `copy.workers` threads, after the
+  folders are created; metadata (permissions, timestamps) is optionally preserved.
+- Each file is written to a temporary name and renamed once complete, so an
+  interrupted copy never leaves a truncated file under its final name. In sync mode
+  the files whose size and modification time already match at the destination are
+  skipped, so an interrupted copy resumes where it stopped.
+- `move_tree` renames the folder and, across file systems, copies it then removes
+  the source once every file was copied.
+"""
+
+import errno
+import os
+import shutil
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Set, Tuple
+from src.tools.progress import ProgressCallback, ProgressTracker
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+copy_config = config.get("copy", {})
+
+WORKERS = copy_config.get("workers", 8)
+PRESERVE_METADATA = copy_config.get("preserve_metadata", True)
+BUFFER_SIZE = copy_config.get("buffer_size", 1024 * 1024)
+PROGRESS_SECONDS = copy_config.get("progress_seconds", 2.0)
+MAX_ERRORS = 20
+PARTIAL_SUFFIX = ".part"
+
+# Errors meaning that a kernel copy is not supported for this pair of files
+UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+
+def _copy_file_range(source_fd: int, target_fd: int, size: int) -> int:
+    """Copies up to `size` bytes in the kernel; returns the number of bytes copied."""
+    copied = 0
+    while copied < size:
+        sent = os.copy_file_range(source_fd, target_fd, size - copied)
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def _sendfile(source_fd: int, target_fd: int, size: int) -> int:
+    """Copies up to `size` bytes in the kernel; returns the number of bytes copied."""
+    copied = 0
+    while copied < size:
+        sent = os.sendfile(target_fd, source_fd, copied, size - copied)
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def copy_data(source: str, target: str) -> str:
+    """
+    Copies the content of a file, with the fastest method the platform supports.
+
+    :param source: The file to copy.
+    :param target: The file to create or overwrite.
+    :return: The method used: "copy_file_range", "sendfile" or "buffered".
+    """
+    with open(source, "rb") as source_file, open(target, "wb") as target_file:
+        size = os.fstat(source_file.fileno()).st_size
+        for method, copy in (
+            ("copy_file_range", getattr(os, "copy_file_range", None)),
+            ("sendfile", getattr(os, "sendfile", None)),
+        ):
+            if copy is None:
+                continue
+            try:
+                if method == "copy_file_range":
+                    copied = _copy_file_range(
+                        source_file.fileno(), target_file.fileno(), size
+                    )
+                else:
+                    copied = _sendfile(source_file.fileno(), target_file.fileno(), size)
+                if copied < size:
+                    # The kernel stopped early, e.g. the file changed size while it
+                    # was copied: read the rest, up to the current end of the file
+                    logger.warning(
+                        "%s stopped after %d of %d bytes of '%s', reading the rest",
+                        method,
+                        copied,
+                        size,
+                        source,
+                    )
+                    source_file.seek(copied)
+                    target_file.seek(copied)
+                    shutil.copyfileobj(source_file, target_file, BUFFER_SIZE)
+                return method
+            except OSError as e:
+                if e.errno not in UNSUPPORTED:
+                    raise
+                # Nothing was written if the first call failed, but start over anyway
+                source_file.seek(0)
+                target_file.seek(0)
+                target_file.truncate()
+        shutil.copyfileobj(source_file, target_file, BUFFER_SIZE)
+        return "buffered"
+
+
+def is_unchanged(source: os.stat_result, target: str) -> bool:
+    """Returns True if `target` has the size and modification time of `source`."""
+    try:
+        stat = os.stat(target)
+    except OSError:
+        return False
+    return stat.st_size == source.st_size and int(stat.st_mtime) == int(source.st_mtime)
+
+
+def copy_file(
+    source: str,
+    target: str,
+    preserve_metadata: bool = PRESERVE_METADATA,
+    sync: bool = False,
+) -> Optional[str]:
+    """
+    Copies a file through a temporary name.
+
+    :param source: The file to copy.
+    :param target: The path of the copy; an existing file is replaced.
+    :param preserve_metadata: Also copy the timestamps and flags; the permission bits
+                              are always copied.
+    :param sync: Skip the copy if `target` has the size and mtime of `source`.
+    :return: The copy method used, or None if the file was skipped.
+    """
+    if sync and is_unchanged(os.stat(source), target):
+        return None
+    partial = target + PARTIAL_SUFFIX
+    try:
+        method = copy_data(source, partial)
+        if preserve_metadata or sync:
+            shutil.copystat(source, partial)
+        else:
+            shutil.copymode(source, partial)
+        os.replace(partial, target)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return method
+
+
+def _plan_tree(
+    source: str, target: str
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str, int]], List[Tuple[str, str]]]:
+    """
+    Lists a tree to copy.
+
+    :return: The (source, target) folders top-down, the (source, target, size) files
+             and the (link, target) of the symbolic links to folders.
+    """
+    folders = [(source, target)]
+    files = []
+    links = []
+    index = 0
+    while index < len(folders):
+        folder, copy = folders[index]
+        index += 1
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                destination = os.path.join(copy, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append((entry.path, destination))
+                elif entry.is_symlink() and entry.is_dir():
+                    links.append((entry.path, destination))
+                elif entry.is_file():
+                    files.append((entry.path, destination, entry.stat().st_size))
+    return folders, files, links
+
+
+def copy_tree(
+    source: str,
+    target: str,
+    workers: int = WORKERS,
+    preserve_metadata: bool = PRESERVE_METADATA,
+    sync: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> dict:
+    """
+    Copies a folder tree, copying its files in parallel.
+
+    Symbolic links to files are copied as files, like `shutil.copytree`; symbolic
+    links to folders are copied as links, so the copy cannot loop.
+
+    :param source: The folder to copy.
+    :param target: The copy to create.
+    :param workers: The number of files copied at the same time.
+    :param preserve_metadata: Also copy the timestamps of the files and folders.
+    :param sync: Update an existing copy: only the files whose size or modification
+                 time differ are copied. Implies `preserve_metadata`.
+    :param progress: Called with a `Progress` after each file.
+    :return: The number of copied, skipped and failed files, the bytes copied, the
+             copy methods used and the first errors.
+    :raises NotADirectoryError: If `source` is not a folder.
+    :raises FileExistsError: If `target` exists and `sync` is False.
+    """
+    if not os.path.isdir(source):
+        raise NotADirectoryError(f"The path '{source}' is not a directory.")
+    if os.path.exists(target) and not sync:
+        raise FileExistsError(f"The destination '{target}' already exists.")
+    start = time.perf_counter()
+    folders, files, links = _plan_tree(source, target)
+    for _, folder in folders:
+        os.makedirs(folder, exist_ok=True)
+    for link, copy in links:
+        if not os.path.lexists(copy):
+            os.symlink(os.readlink(link), copy)
+
+    total = sum(size for _, _, size in files)
+    tracker = ProgressTracker("Copied", len(files), total, progress, PROGRESS_SECONDS)
+    methods: Counter = Counter()
+    errors: Dict[str, str] = {}
+    copied_bytes = 0
+
+    def collect(done: Set[Future]) -> None:
+        nonlocal copied_bytes
+        for future in done:
+            path, size = pending.pop(future)
+            try:
+                method = future.result()
+            except OSError as e:
+                errors[path] = e.strerror or str(e)
+                method = "failed"
+            methods[method or "skipped"] += 1
+            if method not in (None, "failed"):
+                copied_bytes += size
+            tracker.advance(size)
+
+    pending: Dict[Future, Tuple[str, int]] = {}
+    with ThreadPoolExecutor(max(1, workers), thread_name_prefix="copy") as pool:
+        for path, copy, size in files:
+            future = pool.submit(copy_file, path, copy, preserve_metadata, sync)
+            pending[future] = (path, size)
+            if len(pending) >= 4 * max(1, workers):
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+        collect(set(pending))
+
+    if preserve_metadata or sync:
+        # Bottom-up, once their content is written
+        for folder, copy in reversed(folders):
+            shutil.copystat(folder, copy)
+
+    skipped = methods.pop("skipped", 0)
+    failed = methods.pop("failed", 0)
+    stats = {
+        "source": source,
+        "destination": target,
+        "files": len(files),
+        "copied": len(files) - skipped - failed,
+        "skipped": skipped,
+        "failed": failed,
+        "bytes_copied": copied_bytes,
+        "methods": dict(methods),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    if errors:
+        stats["errors"] = dict(list(errors.items())[:MAX_ERRORS])
+    logger.info(
+        "Copied '%s' to '%s': %d copied, %d skipped, %d failed in %.2fs",
+        source,
+        target,
+        stats["copied"],
+        skipped,
+        failed,
+        stats["seconds"],
+    )
+    return stats
+
+
+def move_tree(source: str, target: str, workers: int = WORKERS) -> Optional[dict]:
+    """
+    Moves a folder, copying it when the destination is on another file system.
+
+    :param source: The folder to move.
+    :param target: Its new path.
+    :param workers: The number of files copied at the same time across devices.
+    :return: The copy statistics if the folder was copied, None if it was renamed.
+    :raises OSError: If the copy failed for some files; the source is then kept.
+    """
+    try:
+        os.rename(source, target)
+        return None
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    logger.info("'%s' and '%s' are on different devices, copying", source, target)
+    stats = copy_tree(source, target, workers, preserve_metadata=True)
+    if stats["failed"]:
+        raise OSError(
+            errno.EIO,
+            f"{stats['failed']} files could not be copied to '{target}'; "
+            f"'{source}' was kept: {stats['errors']}",
+        )
+    shutil.rmtree(source)
+    return stats
@@ -0,0 +1,437 @@
+"""
+File Index Module.
+
+This module maintains an optional on-disk SQLite index of file metadata (path, name,
+extension, size, modification time and inode) that the search tools query instead of
+walking the tree. The index is refreshed incrementally: only directories whose
+modification time changed since the last scan are listed again.
+
+Usage:
+    poetry run python -m src.tools.file_index build <path>
+    poetry run python -m src.tools.file_index refresh <path>
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+from src.utils.sqlite_utils import connect, create_schema
+
+index_config = config.get("file_index", {})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    inode INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+CREATE INDEX IF NOT EXISTS files_name ON files(name);
+CREATE INDEX IF NOT EXISTS files_ext ON files(ext);
+CREATE INDEX IF NOT EXISTS files_mtime ON files(mtime);
+"""
+
+
+def file_extension(name: str) -> str:
+    """Returns the text after the last dot of a file name, or '' if there is none."""
+    return name.rsplit(".", 1)[1] if "." in name else ""
+
+
+def subtree_bounds(path: str) -> Tuple[str, str]:
+    """Returns the [low, high) key range of all paths strictly below `path`."""
+    prefix = path.rstrip(os.sep) + os.sep
+    # chr(ord(os.sep) + 1) sorts right after the separator
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def within_roots(path: str, roots: Iterable[str]) -> bool:
+    """Checks whether the absolute `path` is one of `roots` or lies below one."""
+    return any(
+        path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in roots
+    )
+
+
+def _file_row(directory: str, entry: os.DirEntry) -> Optional[tuple]:
+    """Builds the index row for a directory entry, or None if it cannot be stat'ed."""
+    try:
+        stat = entry.stat()
+    except OSError:
+        try:
+            stat = entry.stat(follow_symlinks=False)
+        except OSError:
+            return None
+    return (
+        entry.path,
+        directory,
+        entry.name,
+        file_extension(entry.name),
+        stat.st_size,
+        stat.st_mtime,
+        stat.st_ino,
+    )
+
+
+class RootedIndex(ABC):
+    """Base of the SQLite-backed indexes covering a set of root directories.
+
+    Subclasses keep their roots in a `roots` table and implement `refresh` and `status`.
+    """
+
+    def __init__(self, db_path: str, schema: str):
+        self.db_path = db_path
+        self._write_lock = threading.Lock()
+        create_schema(self.db_path, schema)
+
+    # Coverage ---------------------------------------------------------------
+
+    def roots(self) -> List[str]:
+        """Returns the indexed root directories."""
+        with connect(self.db_path) as conn:
+            return [row[0] for row in conn.execute("SELECT path FROM roots")]
+
+    def covers(self, path: str) -> bool:
+        """Checks whether `path` lies inside an indexed root."""
+        return within_roots(os.path.abspath(path), self.roots())
+
+    # Maintenance ------------------------------------------------------------
+
+    def build(self, root: str) -> Dict[str, int]:
+        """Indexes every file below `root` again."""
+        return self.refresh(root, full=True)
+
+    @abstractmethod
+    def refresh(self, root: str, full: bool = False) -> Dict[str, int]:
+        """Indexes the files below `root`; `full` ignores the stored state."""
+
+    @abstractmethod
+    def status(self) -> Dict[str, object]:
+        """Returns the indexed roots and the size of the index."""
+
+
+class FileIndex(RootedIndex):
+    """SQLite-backed index of file metadata for one or more root directories."""
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path, SCHEMA)
+        self._root_listeners: List[Callable[[str], None]] = []
+
+    def add_root_listener(self, listener: Callable[[str], None]) -> None:
+        """Registers a callback notified with each root added by `refresh`."""
+        self._root_listeners.append(listener)
+
+    def remove_root_listener(self, listener: Callable[[str], None]) -> None:
+        """Unregisters a callback added with `add_root_listener`."""
+        if listener in self._root_listeners:
+            self._root_listeners.remove(listener)
+
+    # Maintenance ------------------------------------------------------------
+
+    def refresh(
+        self, root: str, full: bool = False, changed: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """
+        Brings the index of `root` up to date.
+
+        Directories whose modification time is unchanged are not listed again; their
+        subdirectories are taken from the index and visited in turn. Changes to the
+        size or modification time of an existing file do not touch the directory
+        modification time, so they are picked up by a full build or by the watcher.
+
+        :param root: The directory to index.
+        :param full: Rescan every directory regardless of its modification time.
+        :param changed: Optional list collecting the directories that were rescanned.
+        :return: Counters of scanned and skipped directories and indexed files.
+        """
+        root = os.path.abspath(root)
+        if not os.path.isdir(root):
+            raise NotADirectoryError(f"The path '{root}' is not a directory.")
+
+        started = time.perf_counter()
+        new_root = root not in self.roots()
+        with connect(self.db_path, self._write_lock) as conn:
+            stats = self._walk(conn, root, full, changed)
+            conn.execute(
+                "INSERT OR REPLACE INTO roots (path, indexed_at) VALUES (?, ?)",
+                (root, time.time()),
+            )
+        logger.info(
+            "Refreshed file index for '%s' in %.2fs: %s",
+            root,
+            time.perf_counter() - started,
+            stats,
+        )
+        if new_root:
+            for listener in list(self._root_listeners):
+                listener(root)
+        return stats
+
+    def update_paths(self, paths: Iterable[str]) -> int:
+        """
+        Applies changes reported for individual paths to the index.
+
+        Existing files are re-stat'ed, existing directories are rescanned with their
+        subtree, and paths that no longer exist are removed together with anything
+        indexed below them. Paths outside the indexed roots are ignored.
+
+        :param paths: The created, modified, renamed or deleted paths.
+        :return: The number of paths applied.
+        """
+        roots = self.roots()
+        applied = 0
+        with connect(self.db_path, self._write_lock) as conn:
+            for path in paths:
+                if not within_roots(path, roots):
+                    continue
+                applied += 1
+                if os.path.isdir(path) and not os.path.islink(path):
+                    self._walk(conn, path, full=True)
+                elif os.path.lexists(path):
+                    self._update_file(conn, path)
+                else:
+                    self._drop_subtree(conn, path)
+        return applied
+
+    def _walk(
+        self,
+        conn: sqlite3.Connection,
+        top: str,
+        full: bool,
+        changed: Optional[List[str]] = None,
+    ) -> Dict[str, int]:
+        """Rescans the changed directories of the subtree rooted at `top`."""
+        stats = {"dirs_scanned": 0, "dirs_skipped": 0, "files_indexed": 0}
+        known, children = self._load_dirs(conn, top)
+        seen = set()
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(directory)
+            if not full and known.get(directory) == mtime_ns:
+                stats["dirs_skipped"] += 1
+                stack.extend(children.get(directory, ()))
+                continue
+            stats["dirs_scanned"] += 1
+            if changed is not None:
+                changed.append(directory)
+            subdirs, indexed = self._scan_directory(conn, directory, mtime_ns)
+            stats["files_indexed"] += indexed
+            stack.extend(subdirs)
+
+        self._drop_directories(conn, set(known) - seen)
+        return stats
+
+    def _load_dirs(
+        self, conn: sqlite3.Connection, root: str
+    ) -> Tuple[Dict[str, int], Dict[str, List[str]]]:
+        """Loads the known directories below `root` and their children."""
+        low, high = subtree_bounds(root)
+        known: Dict[str, int] = {}
+        children: Dict[str, List[str]] = {}
+        rows = conn.execute(
+            "SELECT path, parent, mtime_ns FROM dirs "
+            "WHERE path = ? OR (path >= ? AND path < ?)",
+            (root, low, high),
+        )
+        for path, parent, mtime_ns in rows:
+            known[path] = mtime_ns
+            children.setdefault(parent, []).append(path)
+        return known, children
+
+    def _scan_directory(
+        self, conn: sqlite3.Connection, directory: str, mtime_ns: int
+    ) -> Tuple[List[str], int]:
+        """Lists one directory and replaces its file rows; returns its subdirectories."""
+        subdirs, rows = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    else:
+                        row = _file_row(directory, entry)
+                        if row is not None:
+                            rows.append(row)
+        except OSError as e:
+            logger.warning("Cannot list '%s' while indexing: %s", directory, e)
+            return [], 0
+
+        conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+            (directory, os.path.dirname(directory), mtime_ns),
+        )
+        return subdirs, len(rows)
+
+    @staticmethod
+    def _update_file(conn: sqlite3.Connection, path: str) -> None:
+        """Re-stats a single file and replaces its row."""
+        try:
+            stat = os.stat(path) if os.path.exists(path) else os.lstat(path)
+        except OSError:
+            return
+        directory, name = os.path.split(path)
+        conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                path,
+                directory,
+                name,
+                file_extension(name),
+                stat.st_size,
+                stat.st_mtime,
+                stat.st_ino,
+            ),
+        )
+
+    @staticmethod
+    def _drop_subtree(conn: sqlite3.Connection, path: str) -> None:
+        """Removes a path and everything indexed below it."""
+        low, high = subtree_bounds(path)
+        conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        conn.execute("DELETE FROM files WHERE path >= ? AND path < ?", (low, high))
+        conn.execute(
+            "DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+            (path, low, high),
+        )
+
+    @staticmethod
+    def _drop_directories(conn: sqlite3.Connection, directories: Iterable[str]) -> None:
+        """Removes vanished directories and their files from the index."""
+        for directory in directories:
+            conn.execute("DELETE FROM dirs WHERE path = ?", (directory,))
+            conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+
+    # Queries ----------------------------------------------------------------
+
+    def _query(
+        self, path: str, where: str, params: tuple, order: str = "path"
+    ) -> List[str]:
+        """Returns the indexed file paths below `path` matching a SQL condition."""
+        low, high = subtree_bounds(os.path.abspath(path))
+        sql = (
+            f"SELECT path FROM files WHERE path >= ? AND path < ? AND ({where}) "
+            f"ORDER BY {order}"
+        )
+        with connect(self.db_path) as conn:
+            return [row[0] for row in conn.execute(sql, (low, high) + params)]
+
+    def find_by_name(self, path: str, filename: str) -> Optional[str]:
+        """Returns the shallowest indexed file called `filename` below `path`."""
+        matches = self._query(
+            path,
+            "name = ?",
+            (filename,),
+            order="length(dir) - length(replace(dir, '/', '')), path",
+        )
+        return matches[0] if matches else None
+
+    def find_by_extension(self, path: str, extension: str) -> List[str]:
+        """Returns the indexed files below `path` whose name ends with '.<extension>'."""
+        if "." in extension:
+            return self._query(
+                path, "substr(name, ?) = ?", (-(len(extension) + 1), f".{extension}")
+            )
+        return self._query(path, "ext = ?", (extension,))
+
+    def find_by_name_keyword(self, path: str, keyword: str) -> List[str]:
+        """Returns the indexed files below `path` whose name contains `keyword`."""
+        return self._query(path, "instr(name, ?) > 0", (keyword,))
+
+    def find_modified_after(self, path: str, timestamp: float) -> List[str]:
+        """Returns the indexed files below `path` modified after `timestamp`."""
+        return self._query(path, "mtime > ?", (timestamp,))
+
+    def status(self) -> Dict[str, object]:
+        """Returns the indexed roots and the number of indexed directories and files."""
+        with connect(self.db_path) as conn:
+            dirs = conn.execute("SELECT count(*) FROM dirs").fetchone()[0]
+            files = conn.execute("SELECT count(*) FROM files").fetchone()[0]
+        return {
+            "db_path": self.db_path,
+            "roots": self.roots(),
+            "dirs": dirs,
+            "files": files,
+        }
+
+
+_file_index: Optional[FileIndex] = None
+_file_index_lock = threading.Lock()
+
+
+def open_file_index() -> FileIndex:
+    """Returns the shared file index, creating its database if needed."""
+    global _file_index  # pylint: disable=global-statement
+    if _file_index is None:
+        with _file_index_lock:
+            if _file_index is None:
+                _file_index = FileIndex(
+                    index_config.get("db_path", ".file_index.sqlite3")
+                )
+    return _file_index
+
+
+def get_file_index(path: str) -> Optional[FileIndex]:
+    """
+    Returns the file index if it is enabled and covers `path`, otherwise None.
+
+    :param path: The directory the caller is about to search.
+    :return: The shared file index or None.
+    """
+    if not index_config.get("enabled", False):
+        return None
+    index = open_file_index()
+    return index if index.covers(path) else None
+
+
+def index_cli(description: str, open_index: Callable[[], RootedIndex]) -> None:
+    """
+    Builds, refreshes or prints the status of an index from the command line.
+
+    :param description: The help text of the command.
+    :param open_index: Returns the index to manage.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("command", choices=["build", "refresh", "status"])
+    parser.add_argument("path", nargs="?", default=os.getcwd())
+    args = parser.parse_args()
+
+    index = open_index()
+    if args.command == "status":
+        print(index.status())
+    else:
+        print(index.refresh(args.path, full=args.command == "build"))
+
+
+def main() -> None:
+    """Command line entry point to build, refresh or inspect the file index."""
+    index_cli("Manage the file metadata index.", open_file_index)
+
+
+if __name__ == "__main__":
+    main()
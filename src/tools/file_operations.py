@@ -4,8 +4,15 @@ This module provides functions to create, list, move, copy, rename, and search f
 """
 
 import os
-from typing import List
+from typing import Callable, List
 from langchain.agents import tool
+from src.tools.bulk_operations import bulk_rename_files
+from src.tools.line_index import READ_MAX_BYTES, read_bytes, read_lines
+from src.tools.multi_read import read_many
+from src.tools.result_store import paginated
+from src.tools.tool_cache import invalidate_paths, memoize
+from src.tools.tool_flags import read_only
+from src.tools.traversal import file_names
 from src.utils.logger_utils import logger
 
 
@@ -22,22 +29,86 @@ def write_to_file(path: str, filename: str, content: str) -> str:
     with open(file_path, "w", encoding="utf-8", errors="ignore") as file:
         file.write(content)  # Write the content to the file
 
+    invalidate_paths(file_path)
     logger.info("Wrote to file: %s", file_path)
     return file_path
 
 
+@read_only
 @tool
-def read_file(path: str, filename: str) -> str:
-    """Reads content from a file and returns it."""
+def read_file(
+    path: str,
+    filename: str,
+    mode: str = "full",
+    start: int = 0,
+    end: int = 0,
+    lines: int = 20,
+) -> str:
+    """Reads content from a file and returns it. mode 'full' reads the whole file,
+    'lines' the lines start to end (1-based, end included), 'bytes' the bytes start to
+    end (0-based, end excluded), 'head' and 'tail' the first and last `lines` lines;
+    end=0 reads to the end of the file. Long results are cut at a size limit and end
+    with a note telling where to continue."""
     logger.debug("Reading file from: %s/%s", path, filename)
     file_path = os.path.join(path, filename)
-    if os.path.isfile(file_path):
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as file:
-            content = file.read()
-        logger.info("Read from file: %s", file_path)
-        return content
-    logger.error("File '%s' does not exist in '%s'.", filename, path)
-    raise FileNotFoundError(f"The file '{filename}' does not exist in '{path}'.")
+    if not os.path.isfile(file_path):
+        logger.error("File '%s' does not exist in '%s'.", filename, path)
+        raise FileNotFoundError(f"The file '{filename}' does not exist in '{path}'.")
+    if mode in ("full", "bytes"):
+        first = start if mode == "bytes" else 0
+        last = end if mode == "bytes" and end > 0 else None
+        data, size = read_bytes(file_path, first, last, READ_MAX_BYTES + 1)
+        offset = first if first >= 0 else max(0, size + first)
+        content = _capped(data, lambda cut: _bytes_note(offset, cut, size))
+    elif mode in ("lines", "head", "tail"):
+        first, last = {
+            "lines": (start, end or None),
+            "head": (1, max(0, lines)),
+            "tail": (-max(1, lines), None),
+        }[mode]
+        data, total = read_lines(file_path, first, last, READ_MAX_BYTES + 1)
+        first = max(1, total + first + 1 if first < 0 else first)
+        content = _capped(data, lambda cut: _lines_note(first, cut, total))
+    else:
+        raise ValueError(
+            f"Unknown read mode '{mode}', use full, lines, bytes, head or tail."
+        )
+    logger.info("Read %d characters from file: %s", len(content), file_path)
+    return content
+
+
+def _capped(data: bytes, note: Callable[[bytes], str]) -> str:
+    """
+    Decodes a read result, cutting it at `read_file.max_bytes` with a note.
+
+    The reads stop one byte past the limit, so a longer result is never copied whole.
+    """
+    if len(data) <= READ_MAX_BYTES:
+        return data.decode("utf-8", errors="ignore")
+    cut = data[:READ_MAX_BYTES]
+    return cut.decode("utf-8", errors="ignore") + note(cut)
+
+
+def _bytes_note(offset: int, cut: bytes, size: int) -> str:
+    end = offset + len(cut)
+    return (
+        f"\n[Truncated: bytes {offset}-{end} of {size} shown. Continue with "
+        f"mode='bytes', start={end}.]"
+    )
+
+
+def _lines_note(first: int, cut: bytes, total: int) -> str:
+    shown = cut.count(b"\n")
+    if shown == 0:
+        return (
+            f"\n[Truncated: line {first} is longer than {READ_MAX_BYTES} bytes. Read "
+            "it with mode='bytes'.]"
+        )
+    # The line after the last newline is cut, so it is read again next time
+    return (
+        f"\n[Truncated: lines {first}-{first + shown - 1} of {total} shown in full. "
+        f"Continue with mode='lines', start={first + shown}.]"
+    )
 
 
 @tool
@@ -47,6 +118,7 @@ def append_to_file(path: str, filename: str, content: str) -> str:
     file_path = os.path.join(path, filename)
     with open(file_path, "a", encoding="utf-8", errors="ignore") as file:
         file.write(content + "\n")
+    invalidate_paths(file_path)
     logger.info("Appended content to file: %s", file_path)
     return file_path
 
@@ -59,6 +131,7 @@ def rename_file(path: str, old_filename: str, new_filename: str) -> str:
     new_file_path = os.path.join(path, new_filename)
     if os.path.isfile(old_file_path):
         os.rename(old_file_path, new_file_path)
+        invalidate_paths(old_file_path, new_file_path)
         logger.info(
             "Renamed file from '%s' to '%s' in '%s'", old_filename, new_filename, path
         )
@@ -73,13 +146,17 @@ def create_directory(path: str) -> str:
     logger.debug("Creating directory at: %s", path)
     if not os.path.exists(path):
         os.makedirs(path)
+        invalidate_paths(path)
         logger.info("Created directory: %s", path)
     else:
         logger.warning("Directory '%s' already exists.", path)
     return path
 
 
+@read_only
 @tool
+@paginated
+@memoize()
 def list_files_in_directory(path: str) -> List[str]:
     """Lists all files in a specified directory."""
     logger.debug("Listing files in directory: %s", path)
@@ -91,22 +168,23 @@ def list_files_in_directory(path: str) -> List[str]:
     raise NotADirectoryError(f"The path '{path}' is not a directory.")
 
 
+@read_only
 @tool
+@memoize()
 def count_files_in_directory(path: str) -> int:
     """Counts the number of files in a specified directory."""
     logger.debug("Counting files in directory: %s", path)
     if os.path.isdir(path):
-        files = os.listdir(path)
-        file_count = len(
-            [file for file in files if os.path.isfile(os.path.join(path, file))]
-        )
+        file_count = len(file_names(path))
         logger.info("Number of files in directory '%s': %d", path, file_count)
         return file_count
     logger.error("Path '%s' is not a directory.", path)
     raise NotADirectoryError(f"The path '{path}' is not a directory.")
 
 
+@read_only
 @tool
+@memoize()
 def file_exists(path: str, filename: str) -> bool:
     """Checks if a specified file exists."""
     logger.debug("Checking if file exists: %s/%s", path, filename)
@@ -120,11 +198,13 @@ def get_tools_file_operations() -> List:
     """Returns a list of file operation tools."""
     return [
         append_to_file,
+        bulk_rename_files,
         count_files_in_directory,
         create_directory,
         file_exists,
         list_files_in_directory,
         read_file,
+        read_many,
         rename_file,
         write_to_file,
     ]
@@ -4,18 +4,45 @@ File Search Module.
 This module provides various functions for searching files based on different criteria, such as 
 file name, content, and modification date. It uses the logger to provide detailed output during 
 the search operations.
+
+When the file index is enabled and covers the searched directory, the metadata searches
+query the index instead of walking the tree (see `src/tools/file_index.py`); likewise
+the content search narrows its candidates with the trigram content index
+(see `src/tools/content_index.py`).
 """
 
+import fnmatch
 import os
+import re
+from typing import Iterable, Optional
 from langchain.agents import tool
+from src.tools.content_index import get_content_index
+from src.tools.content_search import (
+    MAX_MATCHES,
+    MAX_MATCHES_PER_FILE,
+    compile_pattern,
+    parallel_grep,
+    parallel_search,
+)
+from src.tools.file_index import get_file_index
+from src.tools.result_store import paginate, paginated
+from src.tools.search_planner import plan_predicates, run_search
+from src.tools.tool_flags import read_only
+from src.tools.traversal import iter_files
 from src.utils.logger_utils import logger
 
 
+@read_only
 @tool
-def search_file(path: str, filename: str) -> str:
+def search_file(path: str, filename: str) -> Optional[str]:
     """Searches for a specific file by name within a given directory and returns
     its path if found."""
     logger.debug("Starting search for file '%s' in directory: %s", filename, path)
+    index = get_file_index(path)
+    if index is not None:
+        found_path = index.find_by_name(path, filename)
+        logger.info("Indexed search for file '%s' returned: %s", filename, found_path)
+        return found_path
     for root, _, files in os.walk(path):  # Unused 'dirs' variable replaced with '_'
         if filename in files:
             found_path = os.path.join(root, filename)
@@ -25,35 +52,103 @@ def search_file(path: str, filename: str) -> str:
     return None
 
 
+@read_only
 @tool
-def search_file_by_content(path: str, keyword: str) -> list:
+@paginated
+def search_file_by_content(path: str, keyword: str, max_results: int = 0) -> list:
     """Finds all files containing a specified keyword in their content within a
-    given directory."""
-    found_files = []
+    given directory. Optionally stops after max_results files (0 means no limit)."""
     logger.debug(
         "Starting search for files containing keyword '%s' in directory: %s",
         keyword,
         path,
     )
-    for root, _, files in os.walk(path):  # Unused 'dirs' variable replaced with '_'
-        for filename in files:
-            file_path = os.path.join(root, filename)
-            try:
-                with open(
-                    file_path, "r", encoding="utf-8", errors="ignore"
-                ) as file:  # Specified encoding
-                    if keyword in file.read():
-                        found_files.append(file_path)
-            except (
-                IOError,
-                OSError,
-            ) as e:  # Specific exceptions instead of general Exception
-                logger.error("Error reading file '%s': %s", file_path, e)
+    needle = keyword.encode("utf-8")
+    index = get_content_index(path)
+    if index is not None and len(needle) >= 3:
+        found_files = index.search(path, needle, limit=max_results)
+        logger.info("Indexed files containing '%s': %s", keyword, found_files)
+        return found_files
+    # Files are streamed in chunks on a pool of workers, skipping binary and
+    # oversized files; unreadable files are logged and ignored
+    found_files = parallel_search(iter_files(path), needle, limit=max_results)
     logger.info("Found files containing '%s': %s", keyword, found_files)
     return found_files
 
 
+@read_only
 @tool
+def grep(
+    path: str,
+    pattern: str,
+    fixed_strings: bool = False,
+    ignore_case: bool = False,
+    context: int = 2,
+    file_pattern: str = "*",
+    max_per_file: int = 0,
+    max_matches: int = 0,
+) -> dict:
+    """Finds the lines matching a regular expression (or a literal string with
+    fixed_strings) in the files below a directory, or in one file. Returns each
+    matching line as 'file:number:text', with context lines before and after as
+    'file-number-text' and '--' between groups; files are relative to path.
+    file_pattern filters the file names (e.g. '*.py'). max_per_file and max_matches
+    limit the matching lines per file and in all (0 uses the default limits)."""
+    logger.debug("Grepping '%s' in: %s", pattern, path)
+    regex = compile_pattern(pattern, fixed_strings, ignore_case)
+    context = min(max(context, 0), 10)
+    candidates: Iterable[str]
+    if os.path.isfile(path):
+        root, candidates = os.path.dirname(path), [path]
+    else:
+        root = path
+        index = get_content_index(path)
+        needle = pattern.encode("utf-8")
+        if index is not None and fixed_strings and not ignore_case and len(needle) >= 3:
+            candidates = index.search(path, needle)
+        else:
+            candidates = iter_files(path)
+        if file_pattern != "*":
+            candidates = (
+                file_path
+                for file_path in candidates
+                if fnmatch.fnmatch(os.path.basename(file_path), file_pattern)
+            )
+    max_matches = max_matches or MAX_MATCHES
+    max_per_file = max_per_file or MAX_MATCHES_PER_FILE
+
+    lines = []
+    matches = files = 0
+    for file_path, found in parallel_grep(
+        candidates, regex, context, max_matches, max_per_file
+    ):
+        name = os.path.relpath(file_path, root)
+        files += 1
+        previous = None
+        for line in found:
+            if context and previous is not None and line.number > previous + 1:
+                lines.append("--")
+            separator = ":" if line.is_match else "-"
+            lines.append(f"{name}{separator}{line.number}{separator}{line.text}")
+            previous = line.number
+        found_matches = sum(line.is_match for line in found)
+        matches += found_matches
+        if found_matches >= max_per_file:
+            lines.append(f"{name}: limit of {max_per_file} matches per file reached")
+        if context:
+            lines.append("--")
+    if lines and lines[-1] == "--":
+        lines.pop()
+    logger.info("Found %d lines matching '%s' in %d files", matches, pattern, files)
+    result = {"matches": matches, "files": files, "lines": paginate("grep", lines)}
+    if matches >= max_matches:
+        result["note"] = f"Stopped after {max_matches} matches; narrow the search."
+    return result
+
+
+@read_only
+@tool
+@paginated
 def search_files_by_extension(path: str, extension: str) -> list:
     """Retrieves all files with a specified extension located in a given directory."""
     found_files = []
@@ -62,6 +157,11 @@ def search_files_by_extension(path: str, extension: str) -> list:
         extension,
         path,
     )
+    index = get_file_index(path)
+    if index is not None:
+        found_files = index.find_by_extension(path, extension)
+        logger.info("Indexed files with extension '.%s': %s", extension, found_files)
+        return found_files
     for root, _, files in os.walk(path):  # Unused 'dirs' variable replaced with '_'
         for filename in files:
             if filename.endswith(f".{extension}"):
@@ -71,7 +171,9 @@ def search_files_by_extension(path: str, extension: str) -> list:
     return found_files
 
 
+@read_only
 @tool
+@paginated
 def search_files_modified_after(path: str, timestamp: float) -> list:
     """Identifies files that have been modified after a specified timestamp in a given directory."""
     found_files = []
@@ -80,6 +182,11 @@ def search_files_modified_after(path: str, timestamp: float) -> list:
         timestamp,
         path,
     )
+    index = get_file_index(path)
+    if index is not None:
+        found_files = index.find_modified_after(path, timestamp)
+        logger.info("Indexed files modified after %s: %s", timestamp, found_files)
+        return found_files
     for root, _, files in os.walk(path):  # Unused 'dirs' variable replaced with '_'
         for filename in files:
             file_path = os.path.join(root, filename)
@@ -90,7 +197,9 @@ def search_files_modified_after(path: str, timestamp: float) -> list:
     return found_files
 
 
+@read_only
 @tool
+@paginated
 def search_files_containing_keyword_in_name(path: str, keyword: str) -> list:
     """Locates files whose names contain a specified keyword within a given directory."""
     found_files = []
@@ -99,6 +208,13 @@ def search_files_containing_keyword_in_name(path: str, keyword: str) -> list:
         keyword,
         path,
     )
+    index = get_file_index(path)
+    if index is not None:
+        found_files = index.find_by_name_keyword(path, keyword)
+        logger.info(
+            "Indexed files containing '%s' in their name: %s", keyword, found_files
+        )
+        return found_files
     for root, _, files in os.walk(path):  # Unused 'dirs' variable replaced with '_'
         for filename in files:
             if keyword in filename:
@@ -107,12 +223,52 @@ def search_files_containing_keyword_in_name(path: str, keyword: str) -> list:
     return found_files
 
 
+@read_only
+@tool
+@paginated
+def search_files_by_criteria(
+    path: str,
+    name_pattern: Optional[str] = None,
+    use_regex: bool = False,
+    extension: Optional[str] = None,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    modified_after: Optional[float] = None,
+    modified_before: Optional[float] = None,
+    keyword: Optional[str] = None,
+    max_results: int = 0,
+) -> list:
+    """Finds files matching all the given criteria in a single pass over a directory:
+    name glob (or regex with use_regex), extension, size range in bytes, modification
+    timestamp range and a keyword in the content. Prefer it to chaining several
+    searches. max_results limits the number of results (0 means no limit)."""
+    logger.debug("Starting search by criteria in directory: %s", path)
+    try:
+        predicates = plan_predicates(
+            name_pattern,
+            use_regex,
+            extension,
+            min_size,
+            max_size,
+            modified_after,
+            modified_before,
+        )
+    except re.error as e:
+        logger.error("Invalid name pattern '%s': %s", name_pattern, e)
+        raise ValueError(f"Invalid regular expression '{name_pattern}': {e}") from e
+    found_files = run_search(path, predicates, keyword, max_results)
+    logger.info("Found files matching the criteria: %s", found_files)
+    return found_files
+
+
 def get_tools_file_search() -> list:
     """Returns a list of file operation tools."""
     return [
         search_file,
         search_file_by_content,
+        grep,
         search_files_by_extension,
         search_files_containing_keyword_in_name,
         search_files_modified_after,
+        search_files_by_criteria,
     ]
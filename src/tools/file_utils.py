@@ -6,14 +6,26 @@ size retrieval, listing, deletion, copying, moving, and extension-based search.
 """
 
 import os
-import zipfile
 import shutil
 import glob
 from langchain.agents import tool
+from src.tools import copy_engine
+from src.tools.archive import build_archive
+from src.tools.bulk_operations import (
+    bulk_copy_files,
+    bulk_delete_files,
+    bulk_move_files,
+)
+from src.tools.result_store import paginated
+from src.tools.tool_cache import invalidate_paths, memoize
+from src.tools.tool_flags import read_only
+from src.tools.traversal import file_names
 from src.utils.logger_utils import logger
 
 
+@read_only
 @tool
+@memoize(watch=os.path.join)
 def get_file_size(path: str, filename: str) -> int:
     """Returns the size of a specified file in bytes."""
     file_path = os.path.join(path, filename)
@@ -27,21 +39,40 @@ def get_file_size(path: str, filename: str) -> int:
 
 @tool
 def compress_files_to_zip(path: str, zip_filename: str) -> str:
-    """Compresses all files in the specified directory into a zip archive."""
+    """Compresses all files in the specified directory and its subfolders into a zip
+    archive."""
     zip_path = os.path.join(path, zip_filename)
-    with zipfile.ZipFile(zip_path, "w") as zip_file:
-        for item in os.listdir(path):
-            item_path = os.path.join(path, item)
-            if os.path.isfile(item_path):
-                zip_file.write(item_path, os.path.relpath(item_path, path))
+    build_archive(path, zip_path, archive_format="zip")
+    invalidate_paths(zip_path)
     logger.info("Compressed files into: %s", zip_path)
     return zip_path
 
 
 @tool
+def archive_folder(
+    path: str,
+    archive_filename: str,
+    archive_format: str = "zip",
+    compression: str = "deflate",
+    level: int = 6,
+) -> dict:
+    """Archives all files in the specified directory and its subfolders into
+    archive_filename inside it. archive_format is 'zip' or 'tar.gz'; for zip,
+    compression is 'deflate', 'bzip2', 'lzma' or 'stored'; level goes from 1 (fastest)
+    to 9 (smallest). Returns the number of files and the sizes before and after."""
+    archive_path = os.path.join(path, archive_filename)
+    stats = build_archive(path, archive_path, archive_format, compression, level)
+    invalidate_paths(archive_path)
+    return stats
+
+
+@read_only
+@tool
+@paginated
+@memoize()
 def list_files(path: str) -> list:
     """Returns a list of all files in the specified directory."""
-    files = [f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
+    files = file_names(path)
     logger.info("Files in '%s': %s", path, files)
     return files
 
@@ -52,6 +83,7 @@ def delete_file(path: str, filename: str) -> str:
     file_path = os.path.join(path, filename)
     if os.path.isfile(file_path):
         os.remove(file_path)
+        invalidate_paths(file_path)
         logger.info("Deleted file: %s", file_path)
         return f"File '{filename}' deleted."
     logger.error("File '%s' does not exist in '%s'.", filename, path)
@@ -64,14 +96,17 @@ def copy_file(source_path: str, destination_path: str, filename: str) -> str:
     source_file = os.path.join(source_path, filename)
     destination_file = os.path.join(destination_path, filename)
     if os.path.isfile(source_file):
-        shutil.copy(source_file, destination_file)
+        copy_engine.copy_file(source_file, destination_file)
+        invalidate_paths(destination_file)
         logger.info("Copied file from '%s' to '%s'", source_file, destination_file)
         return destination_file
     logger.error("File '%s' does not exist in '%s'.", filename, source_path)
     raise FileNotFoundError(f"Il file '{filename}' non esiste in '{source_path}'.")
 
 
+@read_only
 @tool
+@paginated
 def find_files_by_extension(path: str, extension: str) -> list:
     """Finds and returns a list of files with the specified extension."""
     search_pattern = os.path.join(path, f"*.{extension}")
@@ -87,6 +122,7 @@ def move_file(source_path: str, destination_path: str, filename: str) -> str:
     destination_file = os.path.join(destination_path, filename)
     if os.path.isfile(source_file):
         shutil.move(source_file, destination_file)
+        invalidate_paths(source_file, destination_file)
         logger.info("Moved file from '%s' to '%s'", source_file, destination_file)
         return destination_file
     logger.error("File '%s' does not exist in '%s'.", filename, source_path)
@@ -98,9 +134,13 @@ def get_tools_file_utils() -> list:
     return [
         get_file_size,
         compress_files_to_zip,
+        archive_folder,
         list_files,
         delete_file,
         copy_file,
         find_files_by_extension,
         move_file,
+        bulk_copy_files,
+        bulk_delete_files,
+        bulk_move_files,
     ]
@@ -0,0 +1,393 @@
+"""
+File Watcher Module.
+
+This module keeps the file index, and any cache registered as a listener, fresh while the
+server runs. On Linux it subscribes to inotify events for the indexed roots; elsewhere,
+or when inotify watches cannot be added, it falls back to periodically refreshing the
+index, which only rescans directories whose modification time changed.
+
+Raw events are coalesced per path and applied in batches, so an event storm on a single
+file costs a single index update.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import queue
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Union
+from src.tools.file_index import FileIndex
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+watcher_config = config.get("file_watcher", {})
+
+# Listener called with the set of paths changed by each applied batch.
+ChangeListener = Callable[[Set[str]], None]
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """Recursive directory watch built on the Linux inotify API."""
+
+    name = "inotify"
+
+    def __init__(self, roots: List[str], emit: Callable[[str], None]):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._emit = emit
+        self._watches: Dict[int, str] = {}
+        # Watches change on the reader thread and when a root is added
+        self._lock = threading.RLock()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        try:
+            for root in roots:
+                self._watch_tree(root)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def add_root(self, root: str) -> None:
+        """Watches a new root directory and its subtree."""
+        self._watch_tree(root)
+
+    def _watch_tree(self, top: str) -> None:
+        """Adds a watch on `top` and every directory below it."""
+        with self._lock:
+            for directory, subdirs, _ in os.walk(top):
+                wd = self._libc.inotify_add_watch(
+                    self._fd, os.fsencode(directory), WATCH_MASK
+                )
+                if wd < 0:
+                    error = ctypes.get_errno()
+                    if directory == top or error == errno.ENOSPC:  # out of watches
+                        raise OSError(
+                            error, f"inotify_add_watch failed for {directory}"
+                        )
+                    subdirs.clear()
+                    continue
+                self._watches[wd] = directory
+
+    def _unwatch_tree(self, top: str) -> None:
+        """Removes the watches of `top` and every directory below it."""
+        prefix = top.rstrip(os.sep) + os.sep
+        with self._lock:
+            for wd, directory in list(self._watches.items()):
+                if directory == top or directory.startswith(prefix):
+                    self._libc.inotify_rm_watch(self._fd, wd)
+                    self._watches.pop(wd, None)
+
+    def run(self, stop: threading.Event) -> None:
+        """Reads inotify events until `stop` is set."""
+        while not stop.is_set():
+            readable, _, _ = select.select([self._fd], [], [], 0.5)
+            if not readable:
+                continue
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            with self._lock:
+                self._dispatch(buffer)
+
+    def _dispatch(self, buffer: bytes) -> None:
+        """Translates a buffer of raw inotify events into changed paths."""
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify queue overflow, rescanning watched roots")
+                for directory in set(self._watches.values()):
+                    self._emit(directory)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            watched = self._watches.get(wd)
+            if watched is None:
+                continue
+            path = os.path.join(watched, name) if name else watched
+            if mask & IN_ISDIR:
+                if mask & IN_MOVED_FROM:
+                    self._unwatch_tree(path)
+                elif mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        self._watch_tree(path)
+                    except OSError as e:
+                        logger.warning("Cannot watch '%s': %s", path, e)
+            self._emit(path)
+
+    def close(self) -> None:
+        """Releases the inotify file descriptor."""
+        os.close(self._fd)
+
+
+class PollingBackend:
+    """Fallback that periodically refreshes the index of the watched roots."""
+
+    name = "polling"
+
+    def __init__(
+        self,
+        index: FileIndex,
+        roots: List[str],
+        emit: Callable[[str], None],
+        interval: float,
+    ):
+        self._index = index
+        self._roots = roots
+        self._emit = emit
+        self._interval = interval
+
+    def run(self, stop: threading.Event) -> None:
+        """Refreshes the roots every interval until `stop` is set."""
+        while not stop.wait(self._interval):
+            for root in list(self._roots):
+                changed: List[str] = []
+                try:
+                    self._index.refresh(root, changed=changed)
+                except OSError as e:
+                    logger.warning("Cannot refresh '%s': %s", root, e)
+                for directory in changed:
+                    self._emit(directory)
+
+    def add_root(self, root: str) -> None:
+        """Refreshes a new root directory at every interval too."""
+        self._roots.append(root)
+
+    def close(self) -> None:
+        """Nothing to release for the polling backend."""
+
+
+class FileWatcher:
+    """Background watcher applying file system changes to the file index."""
+
+    def __init__(
+        self,
+        index: FileIndex,
+        debounce: float = 0.5,
+        max_batch: int = 10000,
+        poll_interval: float = 30.0,
+        use_inotify: bool = True,
+    ):
+        self.index = index
+        self.debounce = debounce
+        self.max_batch = max_batch
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self._events: "queue.Queue[tuple]" = queue.Queue()
+        self._pending: Dict[str, float] = {}
+        self._listeners: List[ChangeListener] = []
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._backend: Optional[Union[InotifyBackend, PollingBackend]] = None
+        self._counters = {"events_received": 0, "paths_applied": 0, "batches": 0}
+        self._last_batch_latency = 0.0
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Registers a callback notified with the paths of each applied batch."""
+        self._listeners.append(listener)
+
+    def add_root(self, root: str) -> None:
+        """
+        Watches a root added to the index while the watcher runs.
+
+        Registered with `FileIndex.add_root_listener`, so every root indexed through
+        `FileIndex.refresh` (e.g. by POST /index) is watched from then on.
+
+        :param root: The absolute path of the new root.
+        """
+        if self._backend is None:
+            return
+        try:
+            self._backend.add_root(root)
+        except OSError as e:
+            logger.warning("Cannot watch new root '%s': %s", root, e)
+            return
+        logger.info("File watcher now watching '%s'", root)
+
+    def _emit(self, path: str) -> None:
+        """Queues a raw change event."""
+        self._events.put((path, time.monotonic()))
+
+    def start(self) -> None:
+        """Starts the event reader and the batch applier threads."""
+        roots = self.index.roots()
+        self.index.add_root_listener(self.add_root)
+        backend: Optional[Union[InotifyBackend, PollingBackend]] = None
+        if self.use_inotify and hasattr(select, "select"):
+            try:
+                backend = InotifyBackend(roots, self._emit)
+            except (OSError, AttributeError) as e:
+                logger.warning("inotify unavailable (%s), falling back to polling", e)
+        if backend is None:
+            backend = PollingBackend(self.index, roots, self._emit, self.poll_interval)
+        self._backend = backend
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(
+                target=backend.run,
+                args=(self._stop,),
+                name="file-watcher-reader",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._apply_loop, name="file-watcher-applier", daemon=True
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("File watcher started (%s) on %s", backend.name, roots)
+
+    def stop(self) -> None:
+        """Stops the watcher threads and releases the backend."""
+        self.index.remove_root_listener(self.add_root)
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if self._backend is not None:
+            self._backend.close()
+        logger.info("File watcher stopped")
+
+    def _apply_loop(self) -> None:
+        """Coalesces raw events and applies them in batches."""
+        while not self._stop.is_set() or not self._events.empty():
+            try:
+                path, seen_at = self._events.get(timeout=self.debounce)
+                self._counters["events_received"] += 1
+                self._pending.setdefault(path, seen_at)
+            except queue.Empty:
+                pass
+            if not self._pending:
+                continue
+            oldest = min(self._pending.values())
+            if (
+                time.monotonic() - oldest >= self.debounce
+                or len(self._pending) >= self.max_batch
+            ):
+                self._flush()
+
+    def _flush(self) -> None:
+        """Applies the pending paths to the index and notifies the listeners."""
+        pending, self._pending = self._pending, {}
+        polling = isinstance(self._backend, PollingBackend)
+        # The polling backend reports exactly the rescanned directories and has
+        # already refreshed the index itself
+        paths = list(pending) if polling else _collapse_subtrees(pending)
+        started = time.perf_counter()
+        if not polling:
+            try:
+                self.index.update_paths(paths)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Failed to apply %d file changes: %s", len(paths), e)
+        for listener in self._listeners:
+            try:
+                listener(set(paths))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("File change listener failed: %s", e)
+        self._last_batch_latency = time.perf_counter() - started
+        self._counters["paths_applied"] += len(paths)
+        self._counters["batches"] += 1
+        logger.debug("Applied %d coalesced file changes", len(paths))
+
+    def status(self) -> Dict[str, object]:
+        """Returns the backend, the lag and the queue depth of the watcher."""
+        pending = dict(self._pending)
+        lag = time.monotonic() - min(pending.values()) if pending else 0.0
+        return {
+            "running": any(thread.is_alive() for thread in self._threads),
+            "backend": self._backend.name if self._backend else None,
+            "queue_depth": self._events.qsize() + len(pending),
+            "lag_seconds": round(lag, 3),
+            "last_batch_seconds": round(self._last_batch_latency, 3),
+            **self._counters,
+        }
+
+
+def _collapse_subtrees(paths: Dict[str, float]) -> List[str]:
+    """Drops the paths that lie below another changed path of the same batch."""
+    collapsed: List[str] = []
+    for path in sorted(paths):
+        if collapsed and path.startswith(collapsed[-1].rstrip(os.sep) + os.sep):
+            if os.path.isdir(collapsed[-1]):
+                continue
+        collapsed.append(path)
+    return collapsed
+
+
+_file_watcher: Optional[FileWatcher] = None
+
+
+def get_file_watcher() -> Optional[FileWatcher]:
+    """Returns the running file watcher, or None if it was not started."""
+    return _file_watcher
+
+
+def start_file_watcher(index: FileIndex) -> FileWatcher:
+    """
+    Creates and starts the shared file watcher for the roots of `index`.
+
+    :param index: The file index to keep fresh.
+    :return: The started watcher.
+    """
+    global _file_watcher  # pylint: disable=global-statement
+    _file_watcher = FileWatcher(
+        index,
+        debounce=watcher_config.get("debounce_seconds", 0.5),
+        max_batch=watcher_config.get("max_batch", 10000),
+        poll_interval=watcher_config.get("poll_interval_seconds", 30.0),
+        use_inotify=watcher_config.get("use_inotify", True),
+    )
+    _file_watcher.start()
+    return _file_watcher
+
+
+def stop_file_watcher() -> None:
+    """Stops the shared file watcher if it is running."""
+    global _file_watcher  # pylint: disable=global-statement
+    if _file_watcher is not None:
+        _file_watcher.stop()
+        _file_watcher = None
@@ -7,8 +7,13 @@ searching, renaming, moving, and copying folders, as well as retrieving folder s
 """
 
 import os
-import shutil
 from langchain.agents import tool
+from src.tools.copy_engine import copy_tree, move_tree
+from src.tools.folder_stats import get_folder_stats_engine
+from src.tools.result_store import paginated
+from src.tools.tool_cache import invalidate_paths, memoize
+from src.tools.tool_flags import read_only
+from src.tools.traversal import dir_names
 from src.utils.logger_utils import logger
 
 
@@ -17,10 +22,12 @@ def create_folder(path: str, folder_name: str) -> str:
     """Creates a new folder in the specified path."""
     folder_path = os.path.join(path, folder_name)
     os.makedirs(folder_path, exist_ok=True)
+    invalidate_paths(folder_path)
     logger.info("Created folder: %s", folder_path)
     return folder_path
 
 
+@read_only
 @tool
 def get_current_folder() -> str:
     """Returns the current working directory."""
@@ -29,16 +36,18 @@ def get_current_folder() -> str:
     return current_folder
 
 
+@read_only
 @tool
+@paginated
+@memoize()
 def list_folders(path: str) -> list:
     """Returns a list of all folders in the specified directory."""
-    folders = [
-        item for item in os.listdir(path) if os.path.isdir(os.path.join(path, item))
-    ]
+    folders = dir_names(path)
     logger.info("Folders in '%s': %s", path, folders)
     return folders
 
 
+@read_only
 @tool
 def go_to_parent_folder(path: str) -> str:
     """Returns the absolute path of the parent folder."""
@@ -47,6 +56,7 @@ def go_to_parent_folder(path: str) -> str:
     return parent_folder
 
 
+@read_only
 @tool
 def go_to_child_folder(path: str, child_folder: str) -> str:
     """Returns the absolute path of the specified child folder."""
@@ -60,6 +70,7 @@ def go_to_child_folder(path: str, child_folder: str) -> str:
     )
 
 
+@read_only
 @tool
 def search_folder_by_name(path: str, folder_name: str) -> str:
     """Searches for a folder by name in the specified directory and its parent directories,
@@ -79,24 +90,23 @@ def search_folder_by_name(path: str, folder_name: str) -> str:
     return None
 
 
+@read_only
 @tool
+@memoize()
 def count_folders(path: str) -> int:
     """Counts the number of folders in the specified directory and returns the count."""
-    folder_count = sum(
-        os.path.isdir(os.path.join(path, name)) for name in os.listdir(path)
-    )
+    folder_count = len(dir_names(path))
     logger.info("Number of folders in '%s': %d", path, folder_count)
     return folder_count
 
 
+@read_only
 @tool
+@paginated
+@memoize()
 def filter_folders_by_name(path: str, filter_name: str) -> list:
     """Returns a list of folders in the specified directory that contain the filter name."""
-    folders = [
-        name
-        for name in os.listdir(path)
-        if os.path.isdir(os.path.join(path, name)) and filter_name in name
-    ]
+    folders = [name for name in dir_names(path) if filter_name in name]
     logger.info(
         "Filtered folders containing '%s' in '%s': %s", filter_name, path, folders
     )
@@ -110,6 +120,7 @@ def rename_folder(path: str, old_folder_name: str, new_folder_name: str) -> str:
     new_folder_path = os.path.join(path, new_folder_name)
     if os.path.isdir(old_folder_path):
         os.rename(old_folder_path, new_folder_path)
+        invalidate_paths(old_folder_path, new_folder_path)
         logger.info(
             "Renamed folder from '%s' to '%s' in '%s'",
             old_folder_name,
@@ -123,11 +134,13 @@ def rename_folder(path: str, old_folder_name: str, new_folder_name: str) -> str:
 
 @tool
 def move_folder(source_path: str, destination_path: str, folder_name: str) -> str:
-    """Moves a folder from the source path to the destination path."""
+    """Moves a folder from the source path to the destination path, also across
+    file systems."""
     source_folder = os.path.join(source_path, folder_name)
     destination_folder = os.path.join(destination_path, folder_name)
     if os.path.isdir(source_folder):
-        os.rename(source_folder, destination_folder)
+        move_tree(source_folder, destination_folder)
+        invalidate_paths(source_folder, destination_folder)
         logger.info("Moved folder from '%s' to '%s'", source_folder, destination_folder)
         return destination_folder
     logger.error("Folder '%s' does not exist in '%s'.", folder_name, source_path)
@@ -137,46 +150,80 @@ def move_folder(source_path: str, destination_path: str, folder_name: str) -> st
 
 
 @tool
-def copy_folder(source_path: str, destination_path: str, folder_name: str) -> str:
-    """Copies a folder from the source path to the destination path."""
+def copy_folder(
+    source_path: str,
+    destination_path: str,
+    folder_name: str,
+    sync: bool = False,
+    preserve_metadata: bool = True,
+) -> dict:
+    """Copies a folder from the source path to the destination path, copying its
+    files in parallel. With sync, an existing copy is updated: only files whose size
+    or modification time differ are copied. Returns the number of copied, skipped and
+    failed files."""
     source_folder = os.path.join(source_path, folder_name)
     destination_folder = os.path.join(destination_path, folder_name)
     if os.path.isdir(source_folder):
-        shutil.copytree(source_folder, destination_folder)
+        stats = copy_tree(
+            source_folder,
+            destination_folder,
+            preserve_metadata=preserve_metadata,
+            sync=sync,
+        )
+        invalidate_paths(destination_folder)
         logger.info(
             "Copied folder from '%s' to '%s'", source_folder, destination_folder
         )
-        return destination_folder
+        return stats
     logger.error("Folder '%s' does not exist in '%s'.", folder_name, source_path)
     raise FileNotFoundError(
         f"La cartella '{folder_name}' non esiste in '{source_path}'."
     )
 
 
+@read_only
 @tool
+@paginated
+@memoize()
 def list_subfolders(path: str) -> list:
     """Returns a list of all subfolders in the specified directory."""
-    subfolders = [f for f in os.listdir(path) if os.path.isdir(os.path.join(path, f))]
+    subfolders = dir_names(path)
     logger.info("Subfolders in '%s': %s", path, subfolders)
     return subfolders
 
 
+@read_only
 @tool
 def get_folder_size(path: str, folder_name: str) -> int:
-    """Returns the total size of the specified folder in bytes."""
+    """Returns the total size of the specified folder in bytes, including all subfolders."""
     folder_path = os.path.join(path, folder_name)
     if os.path.isdir(folder_path):
-        total_size = sum(
-            os.path.getsize(os.path.join(folder_path, f))
-            for f in os.listdir(folder_path)
-            if os.path.isfile(os.path.join(folder_path, f))
-        )
+        total_size = get_folder_stats_engine().stats(folder_path)["total_size"]
         logger.info("Total size of folder '%s': %d bytes", folder_name, total_size)
         return total_size
     logger.error("Folder '%s' does not exist in '%s'.", folder_name, path)
     raise FileNotFoundError(f"La cartella '{folder_name}' non esiste in '{path}'.")
 
 
+@read_only
+@tool
+def get_folder_stats(path: str, folder_name: str) -> dict:
+    """Returns the statistics of the specified folder and all its subfolders: total size,
+    file and folder counts, file count and bytes per extension, and depth statistics."""
+    folder_path = os.path.join(path, folder_name)
+    if os.path.isdir(folder_path):
+        stats = get_folder_stats_engine().stats(folder_path)
+        logger.info(
+            "Stats of folder '%s': %d files, %d bytes",
+            folder_name,
+            stats["files"],
+            stats["total_size"],
+        )
+        return stats
+    logger.error("Folder '%s' does not exist in '%s'.", folder_name, path)
+    raise FileNotFoundError(f"La cartella '{folder_name}' non esiste in '{path}'.")
+
+
 def get_tools_folder_operations() -> list:
     """Returns a list of folder operation tools."""
     return [
@@ -192,4 +239,5 @@ def get_tools_folder_operations() -> list:
         copy_folder,
         list_subfolders,
         get_folder_size,
+        get_folder_stats,
     ]
@@ -0,0 +1,231 @@
+"""
+Folder Stats Module.
+
+This module computes du-style statistics of a folder tree: total size, file and folder
+counts, per-extension counts and bytes, and depth statistics. Directories are listed in
+parallel on a thread pool, each listing relying on the cached type and `stat` of the
+`os.scandir` entries.
+
+The summary of each directory's own files is cached with the directory's modification
+time. Adding, removing or renaming an entry changes that time, so a repeated query over
+a mostly unchanged tree costs one `stat` per directory and only lists again the
+directories that changed. Rewriting a file in place does not change its directory's
+time; the write tools and the file watcher invalidate those directories explicitly, so
+the cache is off by default (`folder_stats.cache_enabled`) and meant to be turned on
+with the watcher, or when files are only changed through the agents.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from src.tools.file_index import file_extension
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+folder_stats_config = config.get("folder_stats", {})
+
+# Directories modified this recently are not cached: a second change within the
+# timestamp granularity of the file system would leave the same modification time
+RACY_WINDOW_NS = 20_000_000
+
+
+class DirectorySummary(NamedTuple):
+    """The statistics of the files directly inside one directory.
+
+    Attributes:
+        mtime_ns: The modification time of the directory when it was listed.
+        files: The number of files.
+        size: The total size of the files in bytes.
+        extensions: The (count, bytes) of the files per extension.
+        subdirs: The paths of the subdirectories; symbolic links are not followed.
+    """
+
+    mtime_ns: int
+    files: int
+    size: int
+    extensions: Dict[str, Tuple[int, int]]
+    subdirs: Tuple[str, ...]
+
+
+def summarize_directory(path: str, mtime_ns: int) -> DirectorySummary:
+    """
+    Lists a directory once and summarizes its own files.
+
+    :param path: The directory to list.
+    :param mtime_ns: The modification time of the directory, stored with the summary.
+    :return: The summary of the directory.
+    :raises OSError: If the directory cannot be listed.
+    """
+    files = size = 0
+    extensions: Dict[str, Tuple[int, int]] = {}
+    subdirs: List[str] = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+                file_size = entry.stat().st_size
+            except OSError:
+                continue
+            files += 1
+            size += file_size
+            extension = file_extension(entry.name)
+            count, total = extensions.get(extension, (0, 0))
+            extensions[extension] = (count + 1, total + file_size)
+    return DirectorySummary(mtime_ns, files, size, extensions, tuple(subdirs))
+
+
+class FolderStatsEngine:
+    """Parallel folder statistics with per-directory summaries cached by mtime."""
+
+    def __init__(
+        self, workers: int = 8, cache_entries: int = 100_000, cache_enabled: bool = True
+    ):
+        """
+        :param workers: The number of directories listed in parallel.
+        :param cache_entries: The maximum number of cached directory summaries.
+        :param cache_enabled: False lists every directory on every query.
+        """
+        self.workers = max(1, workers)
+        self.cache_entries = cache_entries
+        self.cache_enabled = cache_enabled
+        self._cache: "OrderedDict[str, DirectorySummary]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _summary(self, path: str) -> Optional[DirectorySummary]:
+        """Pool task: returns the summary of a directory, from the cache if unchanged."""
+        try:
+            mtime_ns = os.stat(path, follow_symlinks=False).st_mtime_ns
+            with self._lock:
+                cached = self._cache.get(path) if self.cache_enabled else None
+                if cached is not None and cached.mtime_ns == mtime_ns:
+                    self._cache.move_to_end(path)
+                    self.hits += 1
+                    return cached
+                self.misses += 1
+            summary = summarize_directory(path, mtime_ns)
+        except OSError as e:
+            logger.error("Error listing directory '%s': %s", path, e)
+            return None
+        if not self.cache_enabled:
+            return summary
+        with self._lock:
+            if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+                self._cache.pop(path, None)
+                return summary
+            self._cache[path] = summary
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return summary
+
+    def invalidate(self, paths: Iterable[str]) -> None:
+        """Drops the cached summaries of the directories containing `paths`."""
+        with self._lock:
+            for path in paths:
+                path = os.path.abspath(path)
+                for directory in (path, os.path.dirname(path)):
+                    self._cache.pop(directory, None)
+
+    def clear(self) -> None:
+        """Drops every cached summary."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self, path: str) -> dict:
+        """
+        Computes the statistics of the tree below `path`.
+
+        :param path: The folder to measure.
+        :return: A dict with the total size, file and folder counts, the per-extension
+                 counts and bytes (largest first) and the depth statistics, where the
+                 files directly inside `path` are at depth 1.
+        :raises NotADirectoryError: If `path` is not a directory.
+        """
+        if not os.path.isdir(path):
+            raise NotADirectoryError(path)
+        root = os.path.abspath(path)
+        total_files = total_size = folders = max_depth = depth_sum = 0
+        extensions: Dict[str, List[int]] = {}
+        files_by_depth: Dict[int, int] = {}
+
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="du") as pool:
+            pending: Dict[Future, int] = {pool.submit(self._summary, root): 0}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth = pending.pop(future)
+                    summary = future.result()
+                    if summary is None:
+                        continue
+                    max_depth = max(max_depth, depth)
+                    total_files += summary.files
+                    total_size += summary.size
+                    depth_sum += summary.files * (depth + 1)
+                    if summary.files:
+                        files_by_depth[depth + 1] = (
+                            files_by_depth.get(depth + 1, 0) + summary.files
+                        )
+                    for extension, (count, size) in summary.extensions.items():
+                        totals = extensions.setdefault(extension, [0, 0])
+                        totals[0] += count
+                        totals[1] += size
+                    folders += len(summary.subdirs)
+                    for subdir in summary.subdirs:
+                        pending[pool.submit(self._summary, subdir)] = depth + 1
+
+        return {
+            "path": root,
+            "total_size": total_size,
+            "files": total_files,
+            "folders": folders,
+            "extensions": {
+                extension: {"files": count, "bytes": size}
+                for extension, (count, size) in sorted(
+                    extensions.items(), key=lambda item: (-item[1][1], item[0])
+                )
+            },
+            "max_depth": max_depth,
+            "mean_file_depth": round(depth_sum / total_files, 2) if total_files else 0,
+            "files_by_depth": dict(sorted(files_by_depth.items())),
+        }
+
+    def status(self) -> dict:
+        """Returns the cache size and hit counters."""
+        with self._lock:
+            return {
+                "cache_enabled": self.cache_enabled,
+                "cached_directories": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_folder_stats_engine: Optional[FolderStatsEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_folder_stats_engine() -> FolderStatsEngine:
+    """Returns the shared folder statistics engine, creating it on first use."""
+    global _folder_stats_engine  # pylint: disable=global-statement
+    with _engine_lock:
+        if _folder_stats_engine is None:
+            _folder_stats_engine = FolderStatsEngine(
+                workers=folder_stats_config.get("workers", 8),
+                cache_entries=folder_stats_config.get("cache_entries", 100_000),
+                cache_enabled=folder_stats_config.get("cache_enabled", False),
+            )
+        return _folder_stats_engine
+
+
+def invalidate_folder_stats(paths: Set[str]) -> None:
+    """File watcher listener: drops the summaries of the directories that changed."""
+    get_folder_stats_engine().invalidate(paths)
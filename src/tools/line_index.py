@@ -0,0 +1,208 @@
+"""
+Line Index Module.
+
+This module reads ranges of large files without loading them: byte ranges are sliced
+from a memory map, and line ranges are located with a line-offset index.
+
+The index stores the byte offset of every `stride`-th line. It is built in one pass
+over the memory map, in chunks, and cached per file with the device, inode,
+modification time and size of the file; any change rebuilds it. Locating a line then
+costs one lookup plus at most `stride - 1` newline searches, whatever its number.
+"""
+
+import mmap
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import accumulate
+from typing import Iterator, Optional, Tuple, Union
+from src.tools.tool_cache import RACY_WINDOW_NS
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+read_config = config.get("read_file", {})
+
+# Largest result returned by the read_file tool
+READ_MAX_BYTES = read_config.get("max_bytes", 32768)
+STRIDE = read_config.get("index_stride", 1024)
+CACHE_ENTRIES = read_config.get("index_cache_entries", 64)
+CHUNK_SIZE = 16 * 1024 * 1024
+
+# A mapped file; an empty file cannot be mapped and is read as empty bytes
+Buffer = Union[mmap.mmap, bytes]
+
+
+@contextmanager
+def mapped(path: str) -> Iterator[Buffer]:
+    """Maps a file read-only."""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+
+def _stamp(path: str) -> Tuple[int, int, int, int]:
+    stat = os.stat(path)
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class LineIndex:
+    """Byte offsets of every `stride`-th line of a file."""
+
+    def __init__(self, offsets: array, lines: int, size: int, stride: int):
+        """
+        :param offsets: The offset of lines 0, stride, 2 * stride, ... (0-based).
+        :param lines: The number of lines; a last line without newline counts.
+        :param size: The size of the indexed file.
+        :param stride: The number of lines between two stored offsets.
+        """
+        self.offsets = offsets
+        self.lines = lines
+        self.size = size
+        self.stride = stride
+
+    @classmethod
+    def build(cls, view: Buffer, stride: Optional[int] = None) -> "LineIndex":
+        """Indexes a mapped file in one pass, storing every `stride`-th line."""
+        stride = stride or STRIDE
+        offsets = array("q", [0])
+        if not view:
+            return cls(offsets, 0, 0, stride)
+        size = len(view)
+        newlines = 0
+        for start in range(0, size, CHUNK_SIZE):
+            chunk = view[start : start + CHUNK_SIZE]
+            count = chunk.count(b"\n")
+            # The k-th newline of the chunk starts line `newlines + k + 1`; only
+            # chunks where a stored line starts are split into lines
+            first = (-newlines - 1) % stride
+            if first < count:
+                pieces = chunk.split(b"\n")[:count]
+                starts = list(accumulate(len(piece) + 1 for piece in pieces))
+                offsets.extend(start + offset for offset in starts[first::stride])
+            newlines += count
+        lines = newlines + (0 if view[size - 1 : size] == b"\n" else 1)
+        if offsets[-1] == size:
+            offsets.pop()  # the end of the file does not start a line
+        return cls(offsets, lines, size, stride)
+
+    def line_offset(self, view: Buffer, line: int) -> int:
+        """
+        Returns the byte offset where a line starts.
+
+        :param view: The mapped file.
+        :param line: The 0-based line number; `lines` gives the end of the file.
+        """
+        if line >= self.lines:
+            return self.size
+        offset = self.offsets[line // self.stride]
+        for _ in range(line % self.stride):
+            offset = view.find(b"\n", offset) + 1
+        return offset
+
+
+class LineIndexCache:
+    """LRU cache of line indexes, validated against the state of each file."""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[tuple, LineIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, path: str, view: Buffer) -> LineIndex:
+        """Returns the index of a mapped file, building it if the file changed."""
+        path = os.path.abspath(path)
+        stamp = _stamp(path)
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+        start = time.perf_counter()
+        index = LineIndex.build(view)
+        logger.info(
+            "Indexed %d lines of '%s' in %.3fs",
+            index.lines,
+            path,
+            time.perf_counter() - start,
+        )
+        with self._lock:
+            self.builds += 1
+            # A file modified this recently could change again with the same mtime
+            if time.time_ns() - stamp[2] >= RACY_WINDOW_NS:
+                self._entries[path] = (stamp, index)
+                self._entries.move_to_end(path)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return index
+
+    def clear(self) -> None:
+        """Drops every cached index."""
+        with self._lock:
+            self._entries.clear()
+
+
+line_index_cache = LineIndexCache()
+
+
+def _clamp(offset: int, size: int) -> int:
+    """Resolves a slice bound: negative counts from the end, like in a slice."""
+    return max(0, size + offset) if offset < 0 else min(offset, size)
+
+
+def read_bytes(
+    path: str, start: int, end: Optional[int] = None, limit: Optional[int] = None
+) -> Tuple[bytes, int]:
+    """
+    Reads a byte range of a file.
+
+    :param path: The file to read.
+    :param start: The first byte, 0-based; negative counts from the end.
+    :param end: The byte after the last one; None reads to the end of the file.
+    :param limit: The most bytes returned, whatever the range; only those are copied.
+    :return: The bytes and the size of the file.
+    """
+    with mapped(path) as view:
+        size = len(view)
+        begin = _clamp(start, size)
+        stop = size if end is None else max(begin, _clamp(end, size))
+        if limit is not None:
+            stop = min(stop, begin + limit)
+        return view[begin:stop], size
+
+
+def read_lines(
+    path: str, first: int, last: Optional[int] = None, limit: Optional[int] = None
+) -> Tuple[bytes, int]:
+    """
+    Reads a range of lines of a file.
+
+    :param path: The file to read.
+    :param first: The first line, 1-based (0 is the first line too); negative counts
+                  from the end (-1 is the last line).
+    :param last: The last line, included; None reads to the end of the file.
+    :param limit: The most bytes returned, whatever the range; only those are copied.
+    :return: The bytes of the lines and the number of lines of the file.
+    """
+    with mapped(path) as view:
+        index = line_index_cache.get(path, view)
+        if first > 0:
+            start = first - 1
+        elif first < 0:
+            start = max(0, index.lines + first)
+        else:
+            start = 0
+        stop = index.lines if last is None else min(max(last, start), index.lines)
+        begin = index.line_offset(view, start)
+        end = index.line_offset(view, stop)
+        if limit is not None:
+            end = min(end, begin + limit)
+        return view[begin:end], index.lines
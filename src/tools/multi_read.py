@@ -0,0 +1,169 @@
+"""
+Multi Read Module.
+
+This module provides the `read_many` tool, which reads many files in a single tool
+call instead of one `read_file` call, and one LLM round trip, per file.
+
+The files are read concurrently on a bounded thread pool. The output is bounded too:
+each file contributes at most a per-file byte budget, and the files share a total
+budget handed out in the order they were given, so the memory used and the size of
+the tool message stay bounded however many or large the files are. Files beyond the
+total budget are listed without content, with the sizes needed to read them later.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from langchain.agents import tool
+from src.tools.bulk_operations import select_files
+from src.tools.tool_flags import read_only
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+read_many_config = config.get("read_many", {})
+
+WORKERS = read_many_config.get("workers", 8)
+MAX_FILES = read_many_config.get("max_files", 200)
+MAX_BYTES_PER_FILE = read_many_config.get("max_bytes_per_file", 16384)
+MAX_TOTAL_BYTES = read_many_config.get("max_total_bytes", 65536)
+
+# Bytes inspected to tell binary files from text files
+SNIFF_BYTES = 1024
+
+
+def allocate_budgets(
+    sizes: List[Optional[int]], per_file: int, total: int
+) -> List[int]:
+    """
+    Splits the total byte budget between files, in order.
+
+    :param sizes: The size of each file, None for a file that cannot be read.
+    :param per_file: The most bytes read from one file.
+    :param total: The most bytes read from all the files.
+    :return: The number of bytes to read from each file; 0 once `total` is spent.
+    """
+    budgets = []
+    remaining = total
+    for size in sizes:
+        budget = min(size or 0, per_file, remaining)
+        budgets.append(budget)
+        remaining -= budget
+    return budgets
+
+
+def _stat(path: str) -> Tuple[Optional[int], Optional[str]]:
+    """Returns the size of a file, or the reason it cannot be read."""
+    try:
+        if not os.path.isfile(path):
+            return None, "not a file"
+        return os.path.getsize(path), None
+    except OSError as e:
+        return None, e.strerror or str(e)
+
+
+def _read(path: str, budget: int) -> Tuple[Optional[bytes], Optional[str]]:
+    """Reads the first `budget` bytes of a file, or returns why it failed."""
+    try:
+        with open(path, "rb") as file:
+            return file.read(budget), None
+    except OSError as e:
+        return None, e.strerror or str(e)
+
+
+def read_files(
+    paths: List[str],
+    max_bytes_per_file: int = MAX_BYTES_PER_FILE,
+    max_total_bytes: int = MAX_TOTAL_BYTES,
+    workers: int = WORKERS,
+) -> dict:
+    """
+    Reads files concurrently within per-file and total byte budgets.
+
+    :param paths: The files to read; their order decides who gets the total budget.
+    :param max_bytes_per_file: The most bytes returned for one file.
+    :param max_total_bytes: The most bytes returned for all the files.
+    :param workers: The number of files read at the same time.
+    :return: The counts of read, truncated, unread and failed files, the bytes read
+             and one entry per file: its path and size, then its content, a
+             `truncated` flag, `binary` or an `error`.
+    """
+    stats = [_stat(path) for path in paths]
+    budgets = allocate_budgets(
+        [size for size, _ in stats], max_bytes_per_file, max_total_bytes
+    )
+    with ThreadPoolExecutor(max(1, workers), thread_name_prefix="read") as pool:
+        reads = list(
+            pool.map(
+                lambda job: _read(*job) if job[1] else (b"", None),
+                zip(paths, budgets),
+            )
+        )
+
+    entries = []
+    counts = {"read": 0, "truncated": 0, "not_read": 0, "failed": 0}
+    total = 0
+    for path, (size, stat_error), (data, read_error) in zip(paths, stats, reads):
+        entry: Dict[str, Any] = {"path": path}
+        error = stat_error or read_error
+        if error or size is None or data is None:
+            entry["error"] = error
+            counts["failed"] += 1
+        elif size and not data:
+            entry["size"] = size
+            entry["not_read"] = "total byte budget spent"
+            counts["not_read"] += 1
+        else:
+            entry["size"] = size
+            total += len(data)
+            if b"\0" in data[:SNIFF_BYTES]:
+                entry["binary"] = True
+            else:
+                entry["content"] = data.decode("utf-8", errors="ignore")
+            if len(data) < size:
+                entry["truncated"] = True
+                counts["truncated"] += 1
+            counts["read"] += 1
+        entries.append(entry)
+
+    result = {"files": len(paths), **counts, "bytes": total, "results": entries}
+    if counts["truncated"] or counts["not_read"]:
+        result["note"] = (
+            "Some files were cut or not read to stay within the byte budgets; read "
+            "them with read_file (mode 'bytes' or 'lines') or with a smaller list."
+        )
+    logger.info(
+        "Read %d of %d files (%d truncated, %d not read, %d failed), %d bytes",
+        counts["read"],
+        len(paths),
+        counts["truncated"],
+        counts["not_read"],
+        counts["failed"],
+        total,
+    )
+    return result
+
+
+@read_only
+@tool
+def read_many(
+    paths: Optional[List[str]] = None,
+    directory: str = "",
+    pattern: str = "*",
+    recursive: bool = False,
+    max_bytes_per_file: int = 0,
+    max_total_bytes: int = 0,
+) -> dict:
+    """Reads many files in one call. Select the files with a list of paths, or with a
+    directory and a glob pattern on the names (e.g. '*.yaml', with recursive for
+    subfolders). Each file returns at most max_bytes_per_file bytes and all of them
+    at most max_total_bytes, given out in order (0 uses the default limits). Returns
+    the path, size and content of each file, with truncated files flagged."""
+    files = select_files(paths, directory, pattern, recursive)
+    if len(files) > MAX_FILES:
+        raise ValueError(
+            f"The selection contains {len(files)} files, more than the limit of "
+            f"{MAX_FILES}; narrow the pattern or split the list."
+        )
+    total = min(max_total_bytes or MAX_TOTAL_BYTES, MAX_TOTAL_BYTES)
+    per_file = min(max_bytes_per_file or MAX_BYTES_PER_FILE, total)
+    return read_files(files, per_file, total)
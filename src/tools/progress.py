@@ -0,0 +1,72 @@
+"""
+Progress Module.
+
+This module tracks the progress of long file operations, such as building an archive
+or copying a tree: the files and bytes done out of the total are passed to an
+optional callback after each file and logged at a fixed interval.
+"""
+
+import time
+from typing import Callable, NamedTuple, Optional
+from src.utils.logger_utils import logger
+
+
+class Progress(NamedTuple):
+    """Progress of a file operation."""
+
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+
+
+ProgressCallback = Callable[[Progress], None]
+
+
+class ProgressTracker:
+    """Counts the processed files and bytes, logging and reporting them."""
+
+    def __init__(
+        self,
+        action: str,
+        files_total: int,
+        bytes_total: int,
+        callback: Optional[ProgressCallback] = None,
+        log_seconds: float = 2.0,
+    ):
+        """
+        :param action: The past participle logged with the counts, e.g. "Copied".
+        :param files_total: The number of files to process.
+        :param bytes_total: The number of bytes to process.
+        :param callback: Called with the `Progress` after each file.
+        :param log_seconds: The interval between two progress logs.
+        """
+        self.action = action
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.files_done = 0
+        self.bytes_done = 0
+        self.callback = callback
+        self.log_seconds = log_seconds
+        self._logged = time.monotonic()
+
+    def advance(self, size: int) -> None:
+        """Records one processed file of `size` bytes."""
+        self.files_done += 1
+        self.bytes_done += size
+        if self.callback is not None:
+            self.callback(
+                Progress(
+                    self.files_done, self.files_total, self.bytes_done, self.bytes_total
+                )
+            )
+        if time.monotonic() - self._logged >= self.log_seconds:
+            self._logged = time.monotonic()
+            logger.info(
+                "%s %d/%d files, %.1f/%.1f MiB",
+                self.action,
+                self.files_done,
+                self.files_total,
+                self.bytes_done / 2**20,
+                self.bytes_total / 2**20,
+            )
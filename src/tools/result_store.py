@@ -0,0 +1,194 @@
+"""
+Result Store Module.
+
+This module keeps large tool results out of the agents' message history. A list that
+fits in one page is returned unchanged; a longer one is stored server-side under a
+handle and the tool returns only its first page, the total and a cursor. The agents
+fetch further pages, or a summary counted by directory or by extension, with the
+`fetch_results` and `summarize_results` tools.
+
+A page holds at most `page_size` entries and `max_chars` characters, which bounds the
+prompt tokens a single tool call adds to every following turn.
+"""
+
+import functools
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, List, NamedTuple, Union
+from langchain.agents import tool
+from src.tools.file_index import file_extension
+from src.tools.tool_flags import read_only
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+results_config = config.get("tool_results", {})
+
+PAGE_SIZE = results_config.get("page_size", 50)
+MAX_CHARS = results_config.get("max_chars", 4000)
+
+
+def _directory(item: Any) -> str:
+    return os.path.dirname(str(item)) or "."
+
+
+def _extension(item: Any) -> str:
+    return file_extension(os.path.basename(str(item))) or "(none)"
+
+
+SUMMARY_KEYS = {"by_directory": _directory, "by_extension": _extension}
+
+
+class StoredResult(NamedTuple):
+    """A complete tool result kept server-side."""
+
+    tool: str
+    items: List[Any]
+    created: float
+
+
+class ResultStore:
+    """LRU store of tool results, addressed by handle and expired after a TTL."""
+
+    def __init__(self, max_results: int = 256, ttl_seconds: float = 3600.0):
+        """
+        :param max_results: The maximum number of stored results.
+        :param ttl_seconds: The lifetime of a stored result.
+        """
+        self.max_results = max_results
+        self.ttl_seconds = ttl_seconds
+        self._results: "OrderedDict[str, StoredResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, tool_name: str, items: List[Any]) -> str:
+        """Stores a result and returns its handle."""
+        handle = f"{tool_name}-{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._results[handle] = StoredResult(tool_name, items, time.monotonic())
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> StoredResult:
+        """
+        Returns a stored result.
+
+        :raises KeyError: If the handle is unknown or expired.
+        """
+        with self._lock:
+            stored = self._results.get(handle)
+            if (
+                stored is not None
+                and time.monotonic() - stored.created > self.ttl_seconds
+            ):
+                del self._results[handle]
+                stored = None
+            if stored is None:
+                raise KeyError(f"Unknown or expired result handle '{handle}'.")
+            self._results.move_to_end(handle)
+            return stored
+
+
+result_store = ResultStore(
+    max_results=results_config.get("max_results", 256),
+    ttl_seconds=results_config.get("ttl_seconds", 3600),
+)
+
+
+def _page_end(items: List[Any], cursor: int, limit: int) -> int:
+    """Returns the end of the page starting at `cursor`, within the item and char limits."""
+    end = cursor
+    chars = 0
+    while end < len(items) and end - cursor < limit:
+        chars += len(str(items[end])) + 4  # quotes, comma and space
+        if chars > MAX_CHARS and end > cursor:
+            break
+        end += 1
+    return end
+
+
+def _page(handle: str, stored: StoredResult, cursor: int, limit: int) -> dict:
+    """Builds the message for one page of a stored result."""
+    end = _page_end(stored.items, cursor, limit)
+    page = {
+        "handle": handle,
+        "total": len(stored.items),
+        "cursor": cursor,
+        "items": stored.items[cursor:end],
+    }
+    if end < len(stored.items):
+        page["next_cursor"] = end
+        page["note"] = (
+            f"Showing {end - cursor} of {len(stored.items)} results. Call "
+            f"fetch_results(handle='{handle}', cursor={end}) for more, or "
+            f"summarize_results(handle='{handle}') for counts by directory or "
+            "extension."
+        )
+    return page
+
+
+def paginate(tool_name: str, items: Any) -> Union[Any, dict]:
+    """
+    Returns small results unchanged and the first page of a stored handle otherwise.
+
+    :param tool_name: The tool that produced the result, used in the handle.
+    :param items: The result of the tool.
+    :return: `items` if it is not a list or fits in one page, else the first page.
+    """
+    if not isinstance(items, list) or _page_end(items, 0, PAGE_SIZE) == len(items):
+        return items
+    handle = result_store.put(tool_name, items)
+    logger.info("Stored %d results of '%s' as '%s'", len(items), tool_name, handle)
+    return _page(handle, result_store.get(handle), 0, PAGE_SIZE)
+
+
+def paginated(function: Callable) -> Callable:
+    """Pages the list returned by a tool function; apply it below `@tool`."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        return paginate(function.__name__, function(*args, **kwargs))
+
+    return wrapper
+
+
+@read_only
+@tool
+def fetch_results(handle: str, cursor: int = 0, limit: int = PAGE_SIZE) -> dict:
+    """Returns the next page of a large result stored under a handle, starting at
+    cursor (the next_cursor of the previous page). limit caps the number of entries."""
+    stored = result_store.get(handle)
+    cursor = max(0, cursor)
+    page = _page(handle, stored, cursor, max(1, min(limit, PAGE_SIZE)))
+    logger.info("Fetched %d results of '%s' at %d", len(page["items"]), handle, cursor)
+    return page
+
+
+@read_only
+@tool
+def summarize_results(handle: str, mode: str = "by_directory", top: int = 20) -> dict:
+    """Summarizes a large result stored under a handle without listing it: the number
+    of entries per directory (mode 'by_directory') or per extension ('by_extension'),
+    largest first, limited to the top entries."""
+    if mode not in SUMMARY_KEYS:
+        raise ValueError(
+            f"Unknown summary mode '{mode}', use one of {sorted(SUMMARY_KEYS)}."
+        )
+    stored = result_store.get(handle)
+    counts = Counter(SUMMARY_KEYS[mode](item) for item in stored.items)
+    summary = {
+        "handle": handle,
+        "total": len(stored.items),
+        "mode": mode,
+        "groups": len(counts),
+        "counts": dict(counts.most_common(max(1, top))),
+    }
+    logger.info("Summarized '%s' %s: %d groups", handle, mode, len(counts))
+    return summary
+
+
+def get_tools_results() -> list:
+    """Returns the tools reading stored results."""
+    return [fetch_results, summarize_results]
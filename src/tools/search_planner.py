@@ -0,0 +1,150 @@
+"""
+Search Planner Module.
+
+This module evaluates combined file search criteria (name glob or regular expression,
+extension, size range, modification time range and content keyword) in a single
+traversal. The planner orders the checks from cheapest to most expensive: name checks
+need no system call, size and time checks share the single cached `stat` of the
+directory entry, and only the files passing every metadata check are read, on the
+parallel content matcher.
+"""
+
+import fnmatch
+import os
+import re
+from itertools import islice
+from typing import Callable, Iterator, List, NamedTuple, Optional
+from src.tools.content_search import parallel_search
+from src.tools.traversal import iter_file_entries
+from src.utils.logger_utils import logger
+
+# Relative cost of each kind of check, used to order the plan
+COST_EXTENSION = 0
+COST_GLOB = 1
+COST_REGEX = 2
+COST_STAT = 10
+COST_CONTENT = 100
+
+
+class Predicate(NamedTuple):
+    """A single check of the search plan.
+
+    Attributes:
+        name: A short description of the check, used in logs.
+        cost: The relative cost of the check.
+        test: A function returning True if a directory entry passes the check.
+    """
+
+    name: str
+    cost: int
+    test: Callable[[os.DirEntry], bool]
+
+
+def plan_predicates(
+    name_pattern: Optional[str] = None,
+    use_regex: bool = False,
+    extension: Optional[str] = None,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    modified_after: Optional[float] = None,
+    modified_before: Optional[float] = None,
+) -> List[Predicate]:
+    """
+    Builds the metadata checks of a search, ordered from cheapest to most expensive.
+
+    :param name_pattern: A glob (or, with `use_regex`, a regular expression) on the
+                         file name.
+    :param use_regex: Interpret `name_pattern` as a regular expression.
+    :param extension: The extension the file name must end with, without the dot.
+    :param min_size: The minimum size in bytes.
+    :param max_size: The maximum size in bytes.
+    :param modified_after: Only files modified after this timestamp.
+    :param modified_before: Only files modified before this timestamp.
+    :return: The ordered checks.
+    :raises re.error: If `name_pattern` is not a valid regular expression.
+    """
+    predicates: List[Predicate] = []
+    if extension:
+        suffix = f".{extension.lstrip('.')}"
+        predicates.append(
+            Predicate(
+                f"extension {suffix}",
+                COST_EXTENSION,
+                lambda entry: entry.name.endswith(suffix),
+            )
+        )
+    if name_pattern and use_regex:
+        regex = re.compile(name_pattern)
+        predicates.append(
+            Predicate(
+                f"name ~ {name_pattern}",
+                COST_REGEX,
+                lambda entry: regex.search(entry.name) is not None,
+            )
+        )
+    elif name_pattern:
+        predicates.append(
+            Predicate(
+                f"name glob {name_pattern}",
+                COST_GLOB,
+                lambda entry: fnmatch.fnmatchcase(entry.name, name_pattern),
+            )
+        )
+    if min_size is not None or max_size is not None:
+        low = min_size if min_size is not None else 0
+        high = max_size if max_size is not None else float("inf")
+        predicates.append(
+            Predicate(
+                f"size in [{low}, {high}]",
+                COST_STAT,
+                lambda entry: low <= entry.stat().st_size <= high,
+            )
+        )
+    if modified_after is not None or modified_before is not None:
+        after = modified_after if modified_after is not None else float("-inf")
+        before = modified_before if modified_before is not None else float("inf")
+        predicates.append(
+            Predicate(
+                f"mtime in ({after}, {before})",
+                COST_STAT,
+                lambda entry: after < entry.stat().st_mtime < before,
+            )
+        )
+    return sorted(predicates, key=lambda predicate: predicate.cost)
+
+
+def run_search(
+    path: str,
+    predicates: List[Predicate],
+    keyword: Optional[str] = None,
+    limit: int = 0,
+) -> List[str]:
+    """
+    Evaluates a search plan in a single traversal of `path`.
+
+    :param path: The directory to search.
+    :param predicates: The ordered metadata checks from `plan_predicates`.
+    :param keyword: Optional text the file content must contain.
+    :param limit: Stop after this many results; 0 means no limit.
+    :return: The matching file paths in traversal order.
+    """
+    logger.debug(
+        "Search plan for '%s': %s%s",
+        path,
+        [predicate.name for predicate in predicates],
+        f" then content '{keyword}'" if keyword else "",
+    )
+
+    def candidates() -> Iterator[str]:
+        for entry in iter_file_entries(path):
+            try:
+                if all(predicate.test(entry) for predicate in predicates):
+                    yield entry.path
+            except OSError as e:
+                logger.error("Error reading metadata of '%s': %s", entry.path, e)
+
+    if keyword:
+        # Content is only read for the files passing every metadata check, while
+        # the traversal keeps feeding the matcher pool
+        return parallel_search(candidates(), keyword.encode("utf-8"), limit=limit)
+    return list(islice(candidates(), limit or None))
@@ -0,0 +1,199 @@
+"""
+Tool Cache Module.
+
+This module memoizes the read-only file system tools. A result is keyed by the tool and
+its arguments and stored with the modification time and inode of the file or folder it
+depends on; it is only served while both are unchanged, so a listing is refreshed as
+soon as an entry is added, removed or renamed in the folder, and a file size as soon as
+the file is rewritten or replaced.
+
+The write tools also invalidate the entries of the paths they change, which covers
+changes made within the timestamp granularity of the file system. The file watcher,
+when running, does the same for changes made outside the agents.
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+from src.tools.content_index import update_content_index
+from src.tools.folder_stats import get_folder_stats_engine
+from src.utils.configuration_utils import config
+from src.utils.logger_utils import logger
+
+tool_cache_config = config.get("tool_cache", {})
+
+# Results of paths modified this recently are not cached: a second change within the
+# timestamp granularity of the file system would leave the same modification time
+RACY_WINDOW_NS = 20_000_000
+
+
+class CachedResult(NamedTuple):
+    """A memoized tool result and the state of the path it was computed from."""
+
+    tool: str
+    path: str
+    stamp: Tuple[int, int, int]
+    value: Any
+
+
+def path_stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    """Returns the (device, inode, mtime_ns) of a path, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns
+
+
+class ToolCache:
+    """LRU cache of tool results validated against the modification time and inode."""
+
+    def __init__(self, max_entries: int = 4096, enabled: bool = True):
+        """
+        :param max_entries: The maximum number of cached results.
+        :param enabled: False disables lookups and stores.
+        """
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[tuple, CachedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, tool: str, counter: str) -> None:
+        counters = self._counters.setdefault(
+            tool, {"hits": 0, "misses": 0, "invalidations": 0}
+        )
+        counters[counter] += 1
+
+    def get(self, key: tuple, path: str) -> Tuple[bool, Any]:
+        """Returns (True, value) if a valid result is cached for `key`, else (False, None)."""
+        stamp = path_stamp(path)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.stamp == stamp:
+                self._entries.move_to_end(key)
+                self._count(key[0], "hits")
+                return True, cached.value
+            if cached is not None:
+                del self._entries[key]
+            self._count(key[0], "misses")
+        return False, None
+
+    def put(self, key: tuple, path: str, value: Any) -> None:
+        """Stores a result computed from `path`, unless the path is too fresh to trust."""
+        stamp = path_stamp(path)
+        if stamp is None or time.time_ns() - stamp[2] < RACY_WINDOW_NS:
+            return
+        with self._lock:
+            self._entries[key] = CachedResult(key[0], path, stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, paths: Iterable[str]) -> None:
+        """
+        Drops the results depending on `paths`: the paths themselves, their parent
+        folders and, for a moved or deleted folder, everything below it.
+        """
+        affected: Set[str] = set()
+        prefixes: List[str] = []
+        for path in paths:
+            path = os.path.abspath(path)
+            affected.update((path, os.path.dirname(path)))
+            prefixes.append(path.rstrip(os.sep) + os.sep)
+        below = tuple(prefixes)
+        with self._lock:
+            for key, cached in list(self._entries.items()):
+                if cached.path in affected or cached.path.startswith(below):
+                    del self._entries[key]
+                    self._count(cached.tool, "invalidations")
+
+    def clear(self) -> None:
+        """Drops every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns the number of cached results and the hit rate of each tool."""
+        with self._lock:
+            tools = {}
+            for tool, counters in sorted(self._counters.items()):
+                lookups = counters["hits"] + counters["misses"]
+                tools[tool] = {
+                    **counters,
+                    "hit_rate": (
+                        round(counters["hits"] / lookups, 4) if lookups else 0.0
+                    ),
+                }
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "tools": tools,
+            }
+
+
+tool_cache = ToolCache(
+    max_entries=tool_cache_config.get("max_entries", 4096),
+    enabled=tool_cache_config.get("enabled", True),
+)
+
+
+def memoize(watch: Optional[Callable[..., str]] = None) -> Callable:
+    """
+    Memoizes a read-only tool function; apply it below `@tool`.
+
+    :param watch: Returns the file or folder the result depends on, called with the
+                  tool arguments in order; defaults to the `path` argument.
+    :return: The decorator.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tool_cache.enabled:
+                return function(*args, **kwargs)
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            path = os.path.abspath(
+                watch(*arguments.args) if watch else arguments.arguments["path"]
+            )
+            key = (function.__name__, tuple(arguments.arguments.items()))
+            found, value = tool_cache.get(key, path)
+            if found:
+                logger.debug("Tool cache hit: %s%s", function.__name__, key[1])
+                # Lists are copied so that callers cannot alter the cached result
+                return list(value) if isinstance(value, list) else value
+            value = function(*args, **kwargs)
+            tool_cache.put(key, path, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_paths(*paths: str) -> None:
+    """Drops the cached tool results and folder summaries depending on the given paths,
+    and re-indexes their contents in the background.
+
+    Called by the write tools after changing the file system.
+    """
+    tool_cache.invalidate(paths)
+    get_folder_stats_engine().invalidate(paths)
+    update_content_index(os.path.abspath(path) for path in paths)
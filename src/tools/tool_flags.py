@@ -0,0 +1,29 @@
+"""
+Tool Flags Module.
+
+This module marks tools with the properties the agents rely on. The flags are stored
+in the metadata of the LangChain tool, so that they travel with its definition
+instead of being listed by name elsewhere.
+"""
+
+from langchain_core.tools import BaseTool
+
+READ_ONLY = "read_only"
+
+
+def read_only(tool: BaseTool) -> BaseTool:
+    """
+    Marks a tool as never changing the file system; apply it above `@tool`.
+
+    The calls of read-only tools run side by side even when their paths overlap.
+
+    :param tool: The tool to mark.
+    :return: The same tool.
+    """
+    tool.metadata = {**(tool.metadata or {}), READ_ONLY: True}
+    return tool
+
+
+def is_read_only(tool: BaseTool) -> bool:
+    """Checks whether a tool was marked with `read_only`."""
+    return bool((tool.metadata or {}).get(READ_ONLY))
@@ -0,0 +1,96 @@
+"""
+Traversal Module.
+
+This module provides the directory traversal shared by the tools. It is built on
+`os.scandir`, whose entries carry the file type reported by the directory listing and
+cache their `stat` result, so classifying an entry as file or folder costs no extra
+system call and its size or modification time costs at most one.
+"""
+
+import os
+from typing import Iterator, List
+from src.utils.logger_utils import logger
+
+
+def scan(path: str) -> List[os.DirEntry]:
+    """
+    Lists a directory once.
+
+    :param path: The directory to list.
+    :return: The entries of the directory.
+    :raises OSError: If the directory cannot be listed.
+    """
+    with os.scandir(path) as entries:
+        return list(entries)
+
+
+def is_dir(entry: os.DirEntry) -> bool:
+    """Returns True if the entry is a directory, following symlinks like `os.path.isdir`."""
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def is_file(entry: os.DirEntry) -> bool:
+    """Returns True if the entry is a file, following symlinks like `os.path.isfile`."""
+    try:
+        return entry.is_file()
+    except OSError:
+        return False
+
+
+def dir_entries(path: str) -> List[os.DirEntry]:
+    """Returns the entries of the folders directly inside `path`."""
+    return [entry for entry in scan(path) if is_dir(entry)]
+
+
+def file_entries(path: str) -> List[os.DirEntry]:
+    """Returns the entries of the files directly inside `path`."""
+    return [entry for entry in scan(path) if is_file(entry)]
+
+
+def dir_names(path: str) -> List[str]:
+    """Returns the names of the folders directly inside `path`."""
+    return [entry.name for entry in dir_entries(path)]
+
+
+def file_names(path: str) -> List[str]:
+    """Returns the names of the files directly inside `path`."""
+    return [entry.name for entry in file_entries(path)]
+
+
+def iter_file_entries(path: str) -> Iterator[os.DirEntry]:
+    """
+    Yields the entries of all files below `path`, top-down like `os.walk`.
+
+    Symbolic links to directories are not followed; unreadable directories are logged
+    and skipped.
+
+    :param path: The directory to traverse.
+    :return: An iterator over the file entries.
+    """
+    stack = [path]
+    while stack:
+        directory = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.error("Error listing directory '%s': %s", directory, e)
+            continue
+        stack.extend(reversed(subdirs))
+
+
+def iter_files(path: str) -> Iterator[str]:
+    """Yields the paths of all files below `path` in traversal order."""
+    for entry in iter_file_entries(path):
+        yield entry.path
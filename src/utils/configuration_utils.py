@@ -4,6 +4,7 @@ YAML Configuration Loader.
 This module provides functionality to load and parse YAML configuration files.
 """
 
+import os
 from typing import Dict, Any
 import yaml
 from src.utils.logger_utils import logger  # Ensure the path is correct
@@ -31,5 +32,18 @@ def load_yaml(file_path: str) -> Dict[str, Any]:
         raise  # Re-raise the exception to propagate it
 
 
+def resolve_path(path: str) -> str:
+    """
+    Resolves a path from the configuration against the folder of the config file.
+
+    :param path: An absolute path, or a path relative to the config file.
+    :return: The absolute path.
+    """
+    return os.path.join(CONFIG_DIR, os.path.expanduser(path))
+
+
+CONFIG_PATH = os.path.abspath("config.yaml")
+CONFIG_DIR = os.path.dirname(CONFIG_PATH)
+
 # Example usage of the load_yaml function
-config = load_yaml("config.yaml")
+config = load_yaml(CONFIG_PATH)
@@ -0,0 +1,89 @@
+"""
+Executor utilities for running blocking work off the event loop.
+
+This module owns the bounded thread pool used for filesystem tools and the
+limit on concurrently running agent sessions.
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from src.utils.configuration_utils import config
+
+server_config = config.get("server", {})
+
+_tool_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# One semaphore per event loop: an asyncio.Semaphore binds to the loop first using it
+_session_semaphores: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]"
+) = weakref.WeakKeyDictionary()
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """
+    Returns the shared, bounded thread pool used for blocking filesystem work.
+
+    :return: The shared thread pool executor.
+    """
+    global _tool_executor  # pylint: disable=global-statement
+    if _tool_executor is None:
+        with _executor_lock:
+            if _tool_executor is None:
+                _tool_executor = ThreadPoolExecutor(
+                    max_workers=server_config.get("tool_workers", 16),
+                    thread_name_prefix="fs-tools",
+                )
+    return _tool_executor
+
+
+def install_tool_executor(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Makes the bounded tool pool the default executor of the given loop.
+
+    LangChain runs synchronous tools through ``loop.run_in_executor(None, ...)``,
+    so installing the pool as default keeps every blocking tool off the loop
+    and within the configured number of threads.
+
+    :param loop: The running event loop.
+    """
+    loop.set_default_executor(get_tool_executor())
+
+
+def install_session_semaphore(
+    loop: asyncio.AbstractEventLoop, limit: Optional[int] = None
+) -> asyncio.Semaphore:
+    """
+    Creates the semaphore limiting concurrently running agent sessions on a loop.
+
+    Called from the app lifespan, so that the semaphore belongs to the loop
+    serving the requests rather than to whichever loop touched it first.
+
+    :param loop: The running event loop.
+    :param limit: The number of concurrent sessions; None uses the
+                  ``server.max_concurrent_sessions`` setting.
+    :return: The semaphore installed on the loop.
+    """
+    semaphore = asyncio.Semaphore(
+        limit or server_config.get("max_concurrent_sessions", 32)
+    )
+    _session_semaphores[loop] = semaphore
+    return semaphore
+
+
+def get_session_semaphore() -> asyncio.Semaphore:
+    """
+    Returns the semaphore limiting concurrently running agent sessions.
+
+    Outside the app, e.g. when the handlers are called directly, the semaphore
+    is installed on the running loop the first time it is needed.
+
+    :return: The session semaphore of the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _session_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = install_session_semaphore(loop)
+    return semaphore
@@ -0,0 +1,51 @@
+"""
+SQLite utilities shared by the on-disk stores.
+
+The file index, the content index, the job store and the LLM response cache each
+keep their data in a SQLite database in WAL mode, so that readers never wait for
+the single writer. Connections are not shared between threads: every unit of work
+opens its own one through `connect`.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional
+
+# Seconds a connection waits for a lock held by another one before failing
+TIMEOUT = 30
+
+
+@contextmanager
+def connect(
+    path: str, lock: Optional[threading.Lock] = None
+) -> Iterator[sqlite3.Connection]:
+    """
+    Opens a connection for one unit of work.
+
+    The transaction is committed when the block succeeds and rolled back when it
+    raises; the connection is closed in both cases.
+
+    :param path: The SQLite database.
+    :param lock: A lock held for the whole block, used to serialize the writers.
+    :return: A context manager yielding the open connection.
+    """
+    with lock or nullcontext():
+        conn = sqlite3.connect(path, timeout=TIMEOUT)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def create_schema(path: str, schema: str) -> None:
+    """
+    Switches a database to WAL mode and creates its tables if they do not exist.
+
+    :param path: The SQLite database, created if missing.
+    :param schema: The `CREATE ... IF NOT EXISTS` statements of the store.
+    """
+    with connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
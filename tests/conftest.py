@@ -0,0 +1,14 @@
+"""Shared fixtures of the test suite."""
+
+import pytest
+from src.jobs.job_queue import jobs_config
+from src.llm.cache import llm_cache
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _state_in_tmp_path(tmp_path_factory):
+    """Keeps the LLM cache and the job store of the app out of the repository."""
+    state = tmp_path_factory.mktemp("state")
+    llm_cache.db_path = str(state / "llm_cache.sqlite3")
+    jobs_config["db_path"] = str(state / "jobs.sqlite3")
+    yield
@@ -0,0 +1,302 @@
+"""Unit tests for the agent workflow graph."""
+
+import asyncio
+import threading
+import time
+import pytest
+from langchain_core.tools import tool
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from src.agents.fast_router import FastPathRouter
+from src.agents.graph_agent import get_graph, invalidate_graph
+from src.agents.supervisor_agent import build_supervisor_chain
+from src.agents.tool_node import ConcurrentToolNode, ToolSlots, plan_lanes
+from src.jobs import JobQueue, JobStore
+from src.llm.cache import LLMCache, llm_cache_enabled
+from src.tools import get_tools_file_operations, get_tools_file_search
+from src.tools.tool_flags import read_only
+
+
+def test_get_graph_is_compiled_once():
+    """The compiled graph is reused until it is invalidated."""
+    graph = get_graph()
+    assert get_graph() is graph
+
+    invalidate_graph()
+    rebuilt = get_graph()
+    assert rebuilt is not graph
+    assert get_graph() is rebuilt
+
+
+def test_supervisor_chain_is_built_once_per_member_set():
+    """The supervisor chain is reused across turns until the graph is invalidated."""
+    get_graph()
+    chain = build_supervisor_chain()
+    assert build_supervisor_chain() is chain
+    assert get_graph() is not None and build_supervisor_chain() is chain
+
+    subset = build_supervisor_chain(("FileOperationAgent",))
+    assert subset is not chain
+    assert build_supervisor_chain(("FileOperationAgent",)) is subset
+
+    invalidate_graph()
+    rebuilt = build_supervisor_chain()
+    assert rebuilt is not chain
+    assert build_supervisor_chain() is rebuilt
+    assert build_supervisor_chain(("FileOperationAgent",)) is not subset
+
+
+def test_fast_path_routes_single_intent_request():
+    """A single-step search request skips the supervisor on both hops."""
+    router = FastPathRouter()
+    state = {"messages": [HumanMessage(content="Find all txt files in /tmp")]}
+    decision = router.route(state)
+    assert decision == {
+        "next": "FileSearchAgents",
+        "routing_calls_saved": 1,
+        "fast_route": "FileSearchAgents",
+    }
+
+    answer = HumanMessage(content="/tmp/a.txt", name="FileSearchAgents")
+    state = {"messages": [answer], "fast_route": "FileSearchAgents"}
+    assert router.route(state) == {"next": "FINISH", "routing_calls_saved": 1}
+
+
+def test_fast_path_defers_ambiguous_steps_to_supervisor():
+    """Multi-step requests and failed answers are left to the LLM."""
+    router = FastPathRouter()
+    msg = (
+        "I want to find all files in directory /tmp with txt extension. Then "
+        "change their extension to .log"
+    )
+    assert router.route({"messages": [HumanMessage(content=msg)]}) is None
+
+    failure = HumanMessage(content="Error: /tmp not found", name="FileSearchAgents")
+    state = {"messages": [failure], "fast_route": "FileSearchAgents"}
+    assert router.route(state) is None
+
+
+def test_llm_cache_serves_repeated_calls(tmp_path):
+    """Repeated and near-identical prompts are answered from the memory or disk tier."""
+    cache = LLMCache(db_path=str(tmp_path / "cache.sqlite3"))
+    model = FakeListChatModel(responses=["first", "second", "third"], cache=cache)
+
+    with llm_cache_enabled(True):
+        assert model.invoke([HumanMessage("list  files", id="a")]).content == "first"
+        assert model.invoke([HumanMessage("list files ", id="b")]).content == "first"
+        cache._memory.clear()  # pylint: disable=protected-access
+        assert model.invoke([HumanMessage("list files")]).content == "first"
+    with llm_cache_enabled(False):
+        assert model.invoke([HumanMessage("list files")]).content == "second"
+
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+    assert (stats["bypassed"], stats["disk_entries"]) == (1, 1)
+
+
+def test_llm_cache_expires_and_evicts(tmp_path):
+    """Entries expire after the TTL and the disk tier stays under its size limit."""
+    cache = LLMCache(db_path=str(tmp_path / "cache.sqlite3"), ttl_seconds=60)
+    model = FakeListChatModel(responses=["a", "b", "c"], cache=cache)
+    with llm_cache_enabled(True):
+        model.invoke("expiring")
+        cache._memory.clear()  # pylint: disable=protected-access
+        cache.ttl_seconds = 1e-9
+        assert model.invoke("expiring").content == "b"
+
+        cache.ttl_seconds, cache.max_bytes = 0, 1
+        model.invoke("evicted")
+    assert cache.stats()["disk_entries"] == 0
+
+
+async def _fake_runner(command, _use_cache):
+    """Yields the progress events of a run; 'slow' commands never finish."""
+    yield {"event": "tool_call", "data": {"tool": "list_files", "args": {}}}
+    if command == "slow":
+        await asyncio.sleep(60)
+    yield {"event": "final", "data": {"msg": f"done: {command}"}}
+
+
+async def _wait_for_status(queue, job_id, expected):
+    for _ in range(200):
+        job = await queue.get(job_id)
+        if job["status"] == expected:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} is {job['status']}, expected {expected}")
+
+
+@pytest.mark.asyncio
+async def test_job_queue_runs_cancels_and_resumes_jobs(tmp_path):
+    """Jobs report progress and results, can be cancelled and are kept on restart."""
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    queue = JobQueue(store, _fake_runner, workers=1)
+    await queue.start()
+    try:
+        fast = await queue.submit("fast")
+        job = await _wait_for_status(queue, fast, "succeeded")
+        assert job["result"] == "done: fast"
+        assert job["progress"]["last_tool"] == "list_files"
+
+        slow = await queue.submit("slow")
+        await _wait_for_status(queue, slow, "running")
+        queued = await queue.submit("fast")
+        metrics = await queue.metrics()
+        assert metrics["queue_depth"] == 1 and metrics["running"] == 1
+
+        assert (await queue.cancel(slow))["status"] == "cancelled"
+        await _wait_for_status(queue, queued, "succeeded")
+        with pytest.raises(ValueError):
+            await queue.cancel(slow)
+        assert await queue.cancel("missing") is None
+
+        interrupted = await queue.submit("slow")
+        await _wait_for_status(queue, interrupted, "running")
+        waiting = await queue.submit("fast")
+    finally:
+        await queue.stop()
+
+    assert store.get(interrupted)["status"] == "running"
+    assert store.get(waiting)["status"] == "queued"
+    restarted = JobQueue(store, _fake_runner, workers=1)
+    await restarted.start()
+    try:
+        job = await restarted.get(interrupted)
+        assert job["status"] == "failed" and "shutdown" in job["error"]
+        await _wait_for_status(restarted, waiting, "succeeded")
+        assert (await restarted.get(interrupted))["status"] == "failed"
+    finally:
+        await restarted.stop()
+
+
+@pytest.mark.asyncio
+async def test_job_cancelled_while_starting_is_not_run(tmp_path):
+    """A job cancelled between its start and its run is stopped and stays cancelled."""
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    start = store.start
+
+    def slow_start(job_id):
+        started = start(job_id)
+        time.sleep(0.2)  # the job is running but its run has not begun
+        return started
+
+    store.start = slow_start
+    queue = JobQueue(store, _fake_runner, workers=1)
+    await queue.start()
+    try:
+        job_id = await queue.submit("fast")
+        await _wait_for_status(queue, job_id, "running")
+        assert (await queue.cancel(job_id))["status"] == "cancelled"
+        await asyncio.sleep(0.3)
+        job = await queue.get(job_id)
+        assert job["status"] == "cancelled" and job["result"] is None
+
+        job_id = await queue.submit("fast")
+        assert (await queue.cancel(job_id))["status"] == "cancelled"
+        await asyncio.sleep(0.3)
+        assert (await queue.get(job_id))["status"] == "cancelled"
+    finally:
+        await queue.stop()
+
+
+# The parameters are the tool schema: the lanes are planned on the "path" argument
+@read_only
+@tool
+def get_file_size(path: str, filename: str) -> str:  # pylint: disable=unused-argument
+    """Sleeps, then echoes the file name."""
+    time.sleep(0.2)
+    return filename
+
+
+@tool
+def write_to_file(  # pylint: disable=unused-argument
+    path: str, filename: str, content: str
+) -> str:
+    """Sleeps, then echoes the file name."""
+    time.sleep(0.2)
+    return f"{filename} written"
+
+
+def _calls(*calls):
+    return [
+        {"name": name, "args": {"path": "/data", "filename": filename}, "id": str(i)}
+        for i, (name, filename) in enumerate(calls)
+    ]
+
+
+def test_tool_calls_are_grouped_by_conflicting_paths():
+    """Reads run side by side; a write shares a lane with the calls on its path
+    and on the folders containing it."""
+    calls = _calls(
+        ("get_file_size", "a"),
+        ("get_file_size", "a"),
+        ("write_to_file", "a"),
+        ("get_file_size", "b"),
+        ("write_to_file", "c"),
+    )
+    calls.append({"name": "list_files", "args": {"path": "/data"}, "id": "5"})
+    reads = {"get_file_size", "list_files"}
+    assert plan_lanes(calls[:5], reads) == [[0, 1, 2], [3], [4]]
+    assert plan_lanes(calls, reads) == [[0, 1, 2, 4, 5], [3]]
+
+
+def test_read_only_tools_are_taken_from_the_tool_definitions():
+    """The tool node knows which tools only read from the flag on each tool."""
+    node = ConcurrentToolNode(get_tools_file_operations() + get_tools_file_search())
+    assert {"read_file", "read_many", "grep", "file_exists"} <= node.read_only_tools
+    assert not {"write_to_file", "delete_file", "bulk_rename_files"} & set(
+        node.read_only_tools
+    )
+    assert ConcurrentToolNode([get_file_size, write_to_file]).read_only_tools == {
+        "get_file_size"
+    }
+
+
+@pytest.mark.asyncio
+async def test_tool_node_runs_independent_calls_concurrently():
+    """The calls of one message run in parallel and keep their order."""
+    node = ConcurrentToolNode([get_file_size, write_to_file])
+    names = [f"{i}.txt" for i in range(6)]
+    message = AIMessage("", tool_calls=_calls(*(("get_file_size", n) for n in names)))
+
+    for invoke in (node.invoke, node.ainvoke):
+        start = time.perf_counter()
+        result = invoke({"messages": [message]})
+        if asyncio.iscoroutine(result):
+            result = await result
+        assert time.perf_counter() - start < 0.2 * len(names) / 2
+        assert [m.content for m in result["messages"]] == names
+
+
+@pytest.mark.asyncio
+async def test_tool_slots_are_shared_by_threads_and_event_loops():
+    """A tool limit holds across the sync and async paths of the tool node."""
+    slots = ToolSlots(1)
+    held = threading.Event()
+
+    def hold():
+        with slots:
+            held.set()
+            time.sleep(0.2)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    start = time.perf_counter()
+    async with slots:
+        assert time.perf_counter() - start >= 0.15
+    thread.join()
+
+    # A waiter cancelled before its turn does not keep the slot
+    async def wait_for_slot():
+        async with slots:
+            pass
+
+    async with slots:
+        waiter = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    async with slots:
+        pass
@@ -1,9 +1,56 @@
 """Unit tests for the routes in the application."""
 
+import asyncio
+import json
 import os  # Standard library import
 import pytest  # Third-party import
 from httpx import AsyncClient
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from src.agents.graph_agent import build_graph
 from src.app import app
+from src.handlers import forfilecommands_handler
+from src.utils.executor_utils import install_session_semaphore
+
+
+class ToolCallingModel(GenericFakeChatModel):
+    """Fake chat model replaying scripted messages, tool calls included."""
+
+    def bind_tools(self, tools, **kwargs):  # pylint: disable=unused-argument
+        return self
+
+
+def _scripted_graph(directory):
+    """Builds the graph on a model that searches `directory` once, then answers."""
+    model = ToolCallingModel(
+        disable_streaming=True,
+        messages=iter(
+            [
+                AIMessage(
+                    "",
+                    tool_calls=[
+                        {
+                            "name": "search_files_by_extension",
+                            "args": {"path": directory, "extension": "txt"},
+                            "id": "call_1",
+                        }
+                    ],
+                ),
+                AIMessage("Found one txt file."),
+            ]
+        ),
+    )
+    return build_graph(model), model
+
+
+def _parse_events(body):
+    """Splits a server-sent events body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
 
 
 @pytest.mark.asyncio
@@ -30,3 +77,118 @@ async def test_post_agent_invalid_payload():
         response = await client.post("/agent", json=payload)
 
     assert response.status_code == 422  # Unprocessable Entity
+
+
+@pytest.mark.asyncio
+async def test_post_agent_stream_emits_progress(tmp_path, monkeypatch):
+    """The /agent/stream endpoint streams routing, tool and message events."""
+    (tmp_path / "notes.txt").write_text("hello\n", encoding="utf-8")
+    graph, _ = _scripted_graph(str(tmp_path))
+    monkeypatch.setattr(forfilecommands_handler, "get_graph", lambda: graph)
+    payload = {"msg": f"Find all txt files in {tmp_path}", "use_cache": False}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/agent/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_events(response.text)
+    assert [event for event, _ in events] == [
+        "supervisor",
+        "tool_call",
+        "tool_result",
+        "message",
+        "supervisor",
+        "final",
+    ]
+    assert events[0][1] == {"next": "FileSearchAgents", "fast_path": True}
+    assert str(tmp_path / "notes.txt") in events[2][1]["output"]
+    assert events[-1][1] == {"msg": "Found one txt file."}
+
+
+@pytest.mark.asyncio
+async def test_stream_is_cancelled_when_the_consumer_stops(tmp_path, monkeypatch):
+    """Closing the stream early cancels the run before the agents finish."""
+    graph, model = _scripted_graph(str(tmp_path))
+    monkeypatch.setattr(forfilecommands_handler, "get_graph", lambda: graph)
+    monkeypatch.setattr(forfilecommands_handler, "STREAM_QUEUE_SIZE", 1)
+
+    events = forfilecommands_handler.astream_command("Find all txt files in /tmp")
+    first = await events.__anext__()
+    await events.aclose()
+
+    assert first["event"] == "supervisor"
+    # The executor never asked the model for its final answer
+    remaining = list(model.messages)
+    assert remaining and remaining[-1].content == "Found one txt file."
+
+
+@pytest.mark.asyncio
+async def test_post_agent_batch_runs_concurrently(monkeypatch):
+    """The /agent/batch endpoint bounds its fan-out and isolates failures."""
+    running = []
+    peak = []
+
+    async def fake_execute(command, use_cache=None):  # pylint: disable=unused-argument
+        running.append(command)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(command)
+        if command == "fail":
+            raise RuntimeError("boom")
+        return f"done: {command}", 200
+
+    monkeypatch.setattr(forfilecommands_handler, "aexecute_command", fake_execute)
+    messages = [{"msg": msg} for msg in ["a", "fail", "b", "c", "d"]]
+    payload = {"messages": messages, "concurrency": 2}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/agent/batch", json=payload)
+        empty = await client.post("/agent/batch", json={"messages": []})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["output"] for item in body["results"]] == [
+        "done: a",
+        "boom",
+        "done: b",
+        "done: c",
+        "done: d",
+    ]
+    assert [item["status"] for item in body["results"]] == [200, 500, 200, 200, 200]
+    assert body["succeeded"] == 4 and body["failed"] == 1
+    assert max(peak) == 2
+    assert empty.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_post_agent_serializes_sessions_over_the_limit(monkeypatch):
+    """Requests beyond server.max_concurrent_sessions wait for a free slot."""
+    running = []
+    peak = []
+
+    class SlowGraph:
+        """Fake graph recording how many sessions run at the same time."""
+
+        async def astream(self, state):
+            """Streams an executor answer after a short pause."""
+            command = state["messages"][0].content
+            running.append(command)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(command)
+            yield {"Executor": {"messages": [AIMessage(f"done: {command}")]}}
+            yield {"__end__": {}}
+            yield {"Supervisor": {"next": "FINISH"}}
+
+    monkeypatch.setattr(forfilecommands_handler, "get_graph", SlowGraph)
+    install_session_semaphore(asyncio.get_running_loop(), limit=2)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *(client.post("/agent", json={"msg": f"cmd {i}"}) for i in range(6))
+        )
+
+    assert [response.status_code for response in responses] == [200] * 6
+    assert len(peak) == 6
+    assert max(peak) == 2
@@ -0,0 +1,675 @@
+"""Unit tests for the file system tools."""
+
+import errno
+import os
+import tarfile
+import time
+import tracemalloc
+import zipfile
+import pytest
+from src.tools import archive, content_index, copy_engine, line_index
+from src.tools.bulk_operations import (
+    _rename,
+    bulk_copy_files,
+    bulk_delete_files,
+    bulk_rename_files,
+    run_bulk,
+)
+from src.tools.content_index import ContentIndex
+from src.tools.content_search import (
+    compile_pattern,
+    file_contains,
+    grep_file,
+    parallel_search,
+)
+from src.tools.file_index import FileIndex
+from src.tools.file_watcher import FileWatcher
+from src.tools.file_operations import read_file, write_to_file
+from src.tools.file_search import (
+    grep,
+    search_files_by_criteria,
+    search_files_by_extension,
+)
+from src.tools.file_utils import get_file_size, list_files
+from src.tools.folder_stats import FolderStatsEngine
+from src.tools.multi_read import read_many
+from src.tools.result_store import PAGE_SIZE, fetch_results, summarize_results
+from src.tools.search_planner import plan_predicates
+from src.tools.tool_cache import tool_cache
+from src.tools.traversal import dir_names, file_names, iter_files
+
+
+def _make_tree(root):
+    """Creates a small directory tree for the search tests."""
+    (root / "logs").mkdir()
+    (root / "logs" / "app.log").write_text("log line\n", encoding="utf-8")
+    (root / "notes.txt").write_text("hello\n", encoding="utf-8")
+    (root / "archive.tar.gz").write_bytes(b"\x1f\x8b")
+
+
+def test_file_index_queries(tmp_path):
+    """The index answers the metadata searches of the file search tools."""
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    _make_tree(tree)
+    index = FileIndex(str(tmp_path / "index.sqlite3"))
+    stats = index.build(str(tree))
+
+    assert stats["files_indexed"] == 3
+    assert index.covers(str(tree / "logs"))
+    assert not index.covers(str(tmp_path))
+    assert index.find_by_name(str(tree), "app.log") == str(tree / "logs" / "app.log")
+    assert index.find_by_extension(str(tree), "txt") == [str(tree / "notes.txt")]
+    assert index.find_by_extension(str(tree), "tar.gz") == [
+        str(tree / "archive.tar.gz")
+    ]
+    assert index.find_by_name_keyword(str(tree), "app") == [
+        str(tree / "logs" / "app.log")
+    ]
+
+
+def test_file_index_refresh_is_incremental(tmp_path):
+    """Only directories whose modification time changed are listed again."""
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    _make_tree(tree)
+    index = FileIndex(str(tmp_path / "index.sqlite3"))
+    index.build(str(tree))
+
+    stats = index.refresh(str(tree))
+    assert stats["dirs_scanned"] == 0
+    assert stats["dirs_skipped"] == 2
+
+    (tree / "logs" / "new.log").write_text("x", encoding="utf-8")
+    os.remove(tree / "notes.txt")
+    os.utime(tree / "logs", ns=(0, 1))
+    os.utime(tree, ns=(0, 1))
+    stats = index.refresh(str(tree))
+    assert stats["dirs_scanned"] == 2
+    assert index.find_by_extension(str(tree), "log") == [
+        str(tree / "logs" / "app.log"),
+        str(tree / "logs" / "new.log"),
+    ]
+    assert index.find_by_extension(str(tree), "txt") == []
+
+
+def test_file_index_applies_watched_changes(tmp_path):
+    """Changes reported by the watcher update single paths and subtrees."""
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    _make_tree(tree)
+    index = FileIndex(str(tmp_path / "index.sqlite3"))
+    index.build(str(tree))
+
+    os.rename(tree / "logs", tree / "old_logs")
+    (tree / "notes.txt").write_text("a longer note\n", encoding="utf-8")
+    applied = index.update_paths(
+        [str(tree / "logs"), str(tree / "old_logs"), str(tree / "notes.txt")]
+    )
+
+    assert applied == 3
+    assert index.find_by_extension(str(tree), "log") == [
+        str(tree / "old_logs" / "app.log")
+    ]
+    assert index.find_modified_after(str(tree), 0) == [
+        str(tree / "archive.tar.gz"),
+        str(tree / "notes.txt"),
+        str(tree / "old_logs" / "app.log"),
+    ]
+
+
+def test_file_watcher_watches_roots_indexed_later(tmp_path):
+    """A root indexed while the watcher runs is watched from then on."""
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    index = FileIndex(str(tmp_path / "index.sqlite3"))
+    index.build(str(first))
+    watcher = FileWatcher(index, debounce=0.05, poll_interval=0.1)
+    watcher.start()
+    try:
+        index.refresh(str(second))
+        (second / "late.log").write_text("log\n", encoding="utf-8")
+        for _ in range(100):
+            if index.find_by_extension(str(second), "log"):
+                break
+            time.sleep(0.05)
+        assert index.find_by_extension(str(second), "log") == [str(second / "late.log")]
+    finally:
+        watcher.stop()
+
+
+def test_file_contains_streams_across_chunks(tmp_path):
+    """Matches spanning chunk boundaries are found; binary and large files skipped."""
+    text = tmp_path / "big.log"
+    text.write_bytes(b"a" * 8190 + b"needle" + b"b" * 9000)
+    binary = tmp_path / "blob.bin"
+    binary.write_bytes(b"\0needle")
+
+    for chunk_size in (3, 7, 1003, 8192):
+        assert file_contains(str(text), b"needle", chunk_size=chunk_size)
+    assert not file_contains(str(text), b"needles", chunk_size=7)
+    assert not file_contains(str(binary), b"needle")
+    assert not file_contains(str(text), b"needle", max_file_size=100)
+
+
+def test_parallel_search_is_ordered_and_limited(tmp_path):
+    """Results follow traversal order for any worker count and honour the limit."""
+    for i in range(40):
+        content = "log entry" if i % 3 == 0 else "nothing here"
+        (tmp_path / f"f{i:02d}.txt").write_text(content, encoding="utf-8")
+    expected = [
+        p for p in iter_files(str(tmp_path)) if int(os.path.basename(p)[1:3]) % 3 == 0
+    ]
+
+    for workers in (1, 4):
+        found = parallel_search(iter_files(str(tmp_path)), b"log", workers=workers)
+        assert found == expected
+    limited = parallel_search(iter_files(str(tmp_path)), b"log", workers=4, limit=5)
+    assert limited == expected[:5]
+
+
+def test_content_index_narrows_and_stays_fresh(tmp_path):
+    """Indexed lookups verify candidates and pick up the changes they are told of."""
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    _make_tree(tree)
+    index = ContentIndex(str(tmp_path / "content.sqlite3"))
+    index.build(str(tree))
+
+    assert set(index.candidates(str(tree), b"log line")) == {
+        str(tree / "logs" / "app.log")
+    }
+    assert index.search(str(tree), b"line") == [str(tree / "logs" / "app.log")]
+
+    (tree / "notes.txt").write_text("another line\n", encoding="utf-8")
+    os.utime(tree / "notes.txt", ns=(0, 1))
+    assert index.search(str(tree), b"line") == [str(tree / "logs" / "app.log")]
+    index.schedule_update([str(tree / "notes.txt")]).result()
+    assert index.search(str(tree), b"line") == [
+        str(tree / "logs" / "app.log"),
+        str(tree / "notes.txt"),
+    ]
+    assert str(tree / "notes.txt") in index.candidates(str(tree), b"line")
+
+
+def test_content_index_verifies_only_the_candidates(tmp_path):
+    """Freshness checks stat the candidates and re-index them in the background."""
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    _make_tree(tree)
+    index = ContentIndex(str(tmp_path / "content.sqlite3"), verify_freshness=True)
+    index.build(str(tree))
+
+    (tree / "logs" / "app.log").write_text("nothing here\n", encoding="utf-8")
+    os.utime(tree / "logs" / "app.log", ns=(0, 1))
+    assert not index.search(str(tree), b"log line")
+    index.schedule_update([]).result()  # waits for the scheduled re-indexing
+    assert not index.candidates(str(tree), b"log line")
+
+
+def test_content_index_verifies_freshness_without_the_watcher(tmp_path, monkeypatch):
+    """Nothing else reports outside changes when the watcher is off."""
+    monkeypatch.setitem(
+        content_index.content_index_config, "db_path", str(tmp_path / "c.sqlite3")
+    )
+    monkeypatch.setitem(content_index.content_index_config, "verify_freshness", False)
+    monkeypatch.setattr(content_index, "_content_index", None)
+    monkeypatch.setattr(content_index, "is_watched", lambda: False)
+    assert content_index.open_content_index().verify_freshness
+
+    monkeypatch.setattr(content_index, "_content_index", None)
+    monkeypatch.setattr(content_index, "is_watched", lambda: True)
+    assert not content_index.open_content_index().verify_freshness
+
+
+def test_search_files_by_criteria_combines_predicates(tmp_path):
+    """Name, size, time and content criteria are applied in one search."""
+    _make_tree(tmp_path)
+    (tmp_path / "logs" / "old.log").write_text("log line\n", encoding="utf-8")
+    os.utime(tmp_path / "logs" / "old.log", (0, 0))
+    (tmp_path / "logs" / "empty.log").write_text("", encoding="utf-8")
+
+    found = search_files_by_criteria.invoke(
+        {
+            "path": str(tmp_path),
+            "extension": "log",
+            "min_size": 1,
+            "modified_after": 1.0,
+            "keyword": "line",
+        }
+    )
+    assert found == [str(tmp_path / "logs" / "app.log")]
+
+    found = search_files_by_criteria.invoke(
+        {"path": str(tmp_path), "name_pattern": r"^(app|notes)\.", "use_regex": True}
+    )
+    assert sorted(found) == [
+        str(tmp_path / "logs" / "app.log"),
+        str(tmp_path / "notes.txt"),
+    ]
+
+    plan = plan_predicates(min_size=1, name_pattern="*.log", extension="log")
+    assert [predicate.name for predicate in plan] == [
+        "extension .log",
+        "name glob *.log",
+        "size in [1, inf]",
+    ]
+
+
+def test_traversal_classifies_entries(tmp_path):
+    """Files, folders and symbolic links are classified like os.path does."""
+    _make_tree(tmp_path)
+    (tmp_path / "link").symlink_to(tmp_path / "logs")
+
+    assert sorted(dir_names(str(tmp_path))) == ["link", "logs"]
+    assert sorted(file_names(str(tmp_path))) == ["archive.tar.gz", "notes.txt"]
+    # Linked folders are listed but not traversed
+    assert sorted(iter_files(str(tmp_path))) == [
+        str(tmp_path / "archive.tar.gz"),
+        str(tmp_path / "logs" / "app.log"),
+        str(tmp_path / "notes.txt"),
+    ]
+
+
+def test_folder_stats_are_recursive_and_cached(tmp_path, monkeypatch):
+    """Statistics cover the whole tree and only changed directories are listed again."""
+    _make_tree(tmp_path)
+    (tmp_path / "logs" / "old").mkdir()
+    (tmp_path / "logs" / "old" / "app.1.log").write_text("rotated\n", encoding="utf-8")
+    for directory in (tmp_path, tmp_path / "logs", tmp_path / "logs" / "old"):
+        os.utime(directory, (1_000_000, 1_000_000))  # older than the racy window
+    engine = FolderStatsEngine(workers=4)
+
+    stats = engine.stats(str(tmp_path))
+    expected_size = sum(os.path.getsize(p) for p in iter_files(str(tmp_path)))
+    assert stats["total_size"] == expected_size
+    assert (stats["files"], stats["folders"], stats["max_depth"]) == (4, 2, 2)
+    assert stats["extensions"]["log"] == {"files": 2, "bytes": 17}
+    assert stats["files_by_depth"] == {1: 2, 2: 1, 3: 1}
+
+    (tmp_path / "logs" / "new.log").write_text("new\n", encoding="utf-8")
+    stats = engine.stats(str(tmp_path))
+    assert stats["extensions"]["log"] == {"files": 3, "bytes": 21}
+    # Only the directory that gained a file was listed again
+    assert engine.status()["misses"] == 3 + 1
+
+    # Invalidation accepts relative paths; a just-modified directory is not cached
+    monkeypatch.chdir(tmp_path)
+    engine.invalidate([os.path.join("logs", "old", "app.1.log")])
+    engine.stats(str(tmp_path))
+    assert engine.status()["misses"] == 3 + 1 + 2
+    # The root and logs/old are cached again, logs was modified too recently
+    assert engine.status()["cached_directories"] == 2
+
+
+def test_tool_cache_is_validated_and_invalidated(tmp_path):
+    """Read-only tools are memoized until their path changes or a write tool runs."""
+    _make_tree(tmp_path)
+    for path in (tmp_path, tmp_path / "notes.txt"):
+        os.utime(path, (1_000_000, 1_000_000))  # older than the racy window
+    tool_cache.clear()
+    size = {"path": str(tmp_path), "filename": "notes.txt"}
+
+    assert get_file_size.invoke(size) == 6
+    assert get_file_size.invoke(size) == 6
+    assert list_files.invoke({"path": str(tmp_path)}) == list_files.invoke(
+        {"path": str(tmp_path)}
+    )
+    stats = tool_cache.stats()["tools"]
+    assert stats["get_file_size"]["hits"] >= 1
+    assert stats["list_files"]["hit_rate"] > 0
+
+    # A file added by another process changes the folder modification time
+    (tmp_path / "new.txt").write_text("new\n", encoding="utf-8")
+    assert "new.txt" in list_files.invoke({"path": str(tmp_path)})
+
+    # A rewrite within the timestamp granularity is caught by the invalidation
+    write_to_file.invoke({**size, "content": "hello world\n"})
+    os.utime(tmp_path / "notes.txt", (1_000_000, 1_000_000))
+    assert get_file_size.invoke(size) == 12
+
+
+def test_large_results_are_paged_behind_a_handle(tmp_path):
+    """Only the first page of a long result enters the message; the rest is fetched."""
+    for directory in ("a", "b"):
+        (tmp_path / directory).mkdir()
+        for i in range(PAGE_SIZE):
+            (tmp_path / directory / f"{i}.log").write_text("", encoding="utf-8")
+
+    page = search_files_by_extension.invoke({"path": str(tmp_path), "extension": "log"})
+    assert page["total"] == 2 * PAGE_SIZE
+    items = list(page["items"])
+    while "next_cursor" in page:
+        page = fetch_results.invoke(
+            {"handle": page["handle"], "cursor": page["next_cursor"]}
+        )
+        items.extend(page["items"])
+    assert sorted(items) == sorted(str(path) for path in tmp_path.rglob("*.log"))
+
+    summary = summarize_results.invoke({"handle": page["handle"]})
+    assert summary["counts"] == {
+        str(tmp_path / "a"): PAGE_SIZE,
+        str(tmp_path / "b"): PAGE_SIZE,
+    }
+
+
+def test_bulk_tools_change_many_files_in_one_call(tmp_path):
+    """Bulk tools select by pattern or paths and report each file's status."""
+    for name in ("a.txt", "b.txt", "c.md"):
+        (tmp_path / name).write_text(name, encoding="utf-8")
+    (tmp_path / "b.log").write_text("taken", encoding="utf-8")
+
+    summary = bulk_rename_files.invoke(
+        {"directory": str(tmp_path), "pattern": "*.txt", "new_extension": "log"}
+    )
+    assert (summary["succeeded"], summary["skipped"], summary["failed"]) == (1, 1, 0)
+    assert (tmp_path / "a.log").exists() and (tmp_path / "b.txt").exists()
+    assert any("b.log already exists" in line for line in summary["results"])
+
+    backup = tmp_path / "backup"
+    backup.mkdir()
+    copied = bulk_copy_files.invoke(
+        {"destination": str(backup), "paths": [str(tmp_path / "c.md"), "missing"]}
+    )
+    assert (copied["succeeded"], copied["failed"]) == (1, 1)
+    assert (backup / "c.md").read_text(encoding="utf-8") == "c.md"
+
+    deleted = bulk_delete_files.invoke({"directory": str(tmp_path), "pattern": "*.log"})
+    assert deleted["succeeded"] == 2
+    assert sorted(file_names(str(tmp_path))) == ["b.txt", "c.md"]
+
+
+def test_bulk_rename_runs_chained_operations_in_order(tmp_path, monkeypatch):
+    """A rename whose target is another file of the batch waits for that file."""
+    monkeypatch.chdir(tmp_path)
+    for name in ("a.txt", "aa.txt"):
+        (tmp_path / name).write_text(name, encoding="utf-8")
+
+    # a.txt -> aa.txt and aa.txt -> aaaa.txt; the first path is spelled three ways
+    summary = bulk_rename_files.invoke(
+        {
+            "paths": ["a.txt", "./a.txt", str(tmp_path / "a.txt"), "aa.txt"],
+            "old": "a",
+            "new": "aa",
+            "overwrite": True,
+        }
+    )
+    assert (summary["total"], summary["succeeded"], summary["failed"]) == (2, 2, 0)
+    assert sorted(file_names(str(tmp_path))) == ["aa.txt", "aaaa.txt"]
+    assert (tmp_path / "aa.txt").read_text(encoding="utf-8") == "a.txt"
+    assert (tmp_path / "aaaa.txt").read_text(encoding="utf-8") == "aa.txt"
+
+    cycle = run_bulk(
+        "bulk_rename_files",
+        [("aa.txt", "aaaa.txt"), ("aaaa.txt", "aa.txt")],
+        _rename,
+        overwrite=True,
+    )
+    assert cycle["skipped"] == 2
+    assert (tmp_path / "aa.txt").read_text(encoding="utf-8") == "a.txt"
+
+
+@pytest.mark.parametrize(
+    "archive_format, compression, parallel",
+    [
+        ("zip", "deflate", True),
+        ("zip", "bzip2", True),
+        ("zip", "lzma", True),
+        ("zip", "deflate", False),
+        ("tar.gz", "deflate", True),
+    ],
+)
+def test_archives_are_recursive_and_readable(
+    tmp_path, monkeypatch, archive_format, compression, parallel
+):
+    """Archives hold the whole tree and are read back by zipfile and tarfile."""
+    assert archive.parallel_zip_supported()
+    monkeypatch.setattr(archive, "parallel_zip_supported", lambda: parallel)
+    monkeypatch.setattr(archive, "BLOCK_SIZE", 4096)  # several gzip members
+    monkeypatch.setattr(archive, "SPOOL_BYTES", 1024)  # members spill to disk
+    source = tmp_path / "tree"
+    expected = {}
+    for i in range(12):
+        path = source / f"d{i % 3}" / f"f{i}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        expected[f"d{i % 3}/f{i}.txt"] = (f"line {i}\n" * 500 * i).encode()
+        path.write_bytes(expected[f"d{i % 3}/f{i}.txt"])
+    target = source / f"out.{archive_format}"
+    progress = []
+
+    stats = archive.build_archive(
+        str(source),
+        str(target),
+        archive_format,
+        compression,
+        workers=4,
+        progress=progress.append,
+    )
+
+    assert stats["members"] == 12 and stats["bytes_out"] < stats["bytes_in"]
+    assert progress[-1] == (12, 12, stats["bytes_in"], stats["bytes_in"])
+    if archive_format == "zip":
+        with zipfile.ZipFile(target) as zf:
+            assert zf.testzip() is None
+            content = {name: zf.read(name) for name in zf.namelist()}
+    else:
+        with tarfile.open(target, "r:gz") as tar:
+            content = {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+    assert content == expected
+
+
+def test_copy_tree_is_parallel_and_syncs_incrementally(tmp_path, monkeypatch):
+    """Trees are copied with their metadata and a sync only copies changed files."""
+    source = tmp_path / "source"
+    for i in range(20):
+        path = source / f"d{i % 4}" / f"f{i}.bin"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(1000 + i))
+        os.utime(path, (1_000_000, 1_000_000))
+    (source / "empty").mkdir()
+    target = tmp_path / "target"
+
+    stats = copy_engine.copy_tree(str(source), str(target), workers=4)
+    assert (stats["copied"], stats["skipped"], stats["failed"]) == (20, 0, 0)
+    assert (target / "empty").is_dir()
+    assert (target / "d1" / "f5.bin").read_bytes() == (
+        source / "d1" / "f5.bin"
+    ).read_bytes()
+    assert os.stat(target / "d1" / "f5.bin").st_mtime == 1_000_000
+
+    (source / "d2" / "f6.bin").write_bytes(b"changed")
+    stats = copy_engine.copy_tree(str(source), str(target), sync=True)
+    assert (stats["copied"], stats["skipped"]) == (1, 19)
+    assert (target / "d2" / "f6.bin").read_bytes() == b"changed"
+
+    # A kernel copy that stops early is completed with ordinary reads
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+
+        def short_copy(src, dst, _count):
+            """Copies 7 bytes on the first call, then reports the end of the file."""
+            return (
+                copy_file_range(src, dst, 7)
+                if os.lseek(dst, 0, os.SEEK_CUR) == 0
+                else 0
+            )
+
+        monkeypatch.setattr(os, "copy_file_range", short_copy)
+        assert (
+            copy_engine.copy_data(
+                str(source / "d0" / "f4.bin"), str(tmp_path / "f4.bin")
+            )
+            == "copy_file_range"
+        )
+        assert (tmp_path / "f4.bin").read_bytes() == (
+            source / "d0" / "f4.bin"
+        ).read_bytes()
+
+    # Without kernel copies, the buffered fallback is used
+    monkeypatch.delattr(os, "copy_file_range", raising=False)
+    monkeypatch.delattr(os, "sendfile", raising=False)
+    assert (
+        copy_engine.copy_data(str(source / "d0" / "f0.bin"), str(tmp_path / "f0.bin"))
+        == "buffered"
+    )
+    assert (tmp_path / "f0.bin").read_bytes() == (source / "d0" / "f0.bin").read_bytes()
+
+
+def test_move_tree_copies_across_devices(tmp_path, monkeypatch):
+    """A move that os.rename cannot do across devices falls back to a copy."""
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "a.txt").write_text("a", encoding="utf-8")
+    rename = os.rename
+
+    def cross_device_rename(src, dst):
+        if os.path.basename(src) == "source":
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        return rename(src, dst)
+
+    monkeypatch.setattr(os, "rename", cross_device_rename)
+    stats = copy_engine.move_tree(str(source), str(tmp_path / "moved"))
+    assert stats["copied"] == 1
+    assert not source.exists()
+    assert (tmp_path / "moved" / "a.txt").read_text(encoding="utf-8") == "a"
+
+
+def test_read_file_ranges_are_capped_and_indexed(tmp_path, monkeypatch):
+    """Line and byte ranges are read through a cached index rebuilt on change."""
+    monkeypatch.setattr(line_index, "STRIDE", 4)
+    monkeypatch.setattr(line_index, "line_index_cache", line_index.LineIndexCache())
+    path = tmp_path / "big.log"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 101)), encoding="utf-8")
+    os.utime(path, (1_000_000, 1_000_000))
+
+    def read(**kwargs):
+        return read_file.invoke(
+            {"path": str(tmp_path), "filename": "big.log", **kwargs}
+        )
+
+    assert read(mode="lines", start=10, end=12) == "line 10\nline 11\nline 12\n"
+    assert read(mode="tail", lines=2) == "line 99\nline 100\n"
+    assert read(mode="head", lines=1) == "line 1\n"
+    assert read(mode="bytes", start=7, end=13) == "line 2"
+    assert line_index.line_index_cache.builds == 1
+
+    path.write_text("first\nsecond\n", encoding="utf-8")
+    os.utime(path, (2_000_000, 2_000_000))
+    assert read(mode="lines", start=2) == "second\n"
+    assert line_index.line_index_cache.builds == 2
+
+    monkeypatch.setattr("src.tools.file_operations.READ_MAX_BYTES", 10)
+    assert read(mode="lines", start=1).endswith("Continue with mode='lines', start=2.]")
+    assert read().startswith("first\nseco\n[Truncated: bytes 0-10 of 13")
+
+
+def test_read_file_copies_at_most_the_cap(tmp_path, monkeypatch):
+    """Reads of a large file copy the capped result, not the whole range."""
+    monkeypatch.setattr(line_index, "CHUNK_SIZE", 1024 * 1024)
+    monkeypatch.setattr(line_index, "line_index_cache", line_index.LineIndexCache())
+    path = tmp_path / "large.log"
+    with open(path, "wb") as file:
+        for _ in range(32):
+            file.write((b"x" * 99 + b"\n") * 10486)
+    args = {"path": str(tmp_path), "filename": "large.log"}
+    for extra in (
+        {},
+        {"mode": "bytes", "start": 1000},
+        {"mode": "lines", "start": 2},
+        {"mode": "tail", "lines": 100000},
+    ):
+        tracemalloc.start()
+        content = read_file.invoke({**args, **extra})
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert "[Truncated" in content
+        assert peak < 8 * 1024 * 1024, (extra, peak)
+
+
+def test_read_many_applies_byte_budgets(tmp_path):
+    """Files are read in one call, within the per-file and total budgets."""
+    for name, content in [("a.cfg", b"a" * 10), ("b.cfg", b"b" * 30), ("c.cfg", b"c")]:
+        (tmp_path / name).write_bytes(content)
+    (tmp_path / "d.bin").write_bytes(b"\0\1")
+    paths = [str(tmp_path / name) for name in ("a.cfg", "b.cfg", "missing", "c.cfg")]
+
+    result = read_many.invoke(
+        {"paths": paths, "max_bytes_per_file": 20, "max_total_bytes": 30}
+    )
+    entries = {os.path.basename(entry["path"]): entry for entry in result["results"]}
+    assert (result["read"], result["truncated"], result["failed"]) == (2, 1, 1)
+    assert result["not_read"] == 1 and result["bytes"] == 30
+    assert entries["a.cfg"]["content"] == "a" * 10
+    assert entries["b.cfg"]["content"] == "b" * 20 and entries["b.cfg"]["truncated"]
+    assert entries["c.cfg"] == {
+        "path": paths[3],
+        "size": 1,
+        "not_read": "total byte budget spent",
+    }
+    assert "error" in entries["missing"]
+
+    result = read_many.invoke({"directory": str(tmp_path), "pattern": "*.bin"})
+    assert result["results"][0]["binary"]
+
+
+def test_grep_returns_matching_lines_with_context(tmp_path):
+    """Matching lines come with their numbers, context and the match limits."""
+    lines = [f"line {i}" for i in range(1, 41)]
+    lines[9] = "def load_config(path):"
+    lines[11] = "    return Config(path)"
+    lines[30] = "config = load_config('a.yaml')"
+    (tmp_path / "app.py").write_text("\n".join(lines), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("load_config\n", encoding="utf-8")
+
+    result = grep.invoke(
+        {"path": str(tmp_path), "pattern": r"load_\w+\(", "file_pattern": "*.py"}
+    )
+    assert (result["matches"], result["files"]) == (2, 1)
+    assert result["lines"] == [
+        "app.py-8-line 8",
+        "app.py-9-line 9",
+        "app.py:10:def load_config(path):",
+        "app.py-11-line 11",
+        "app.py-12-    return Config(path)",
+        "--",
+        "app.py-29-line 29",
+        "app.py-30-line 30",
+        "app.py:31:config = load_config('a.yaml')",
+        "app.py-32-line 32",
+        "app.py-33-line 33",
+    ]
+
+    result = grep.invoke(
+        {
+            "path": str(tmp_path),
+            "pattern": "CONFIG",
+            "ignore_case": True,
+            "context": 0,
+            "max_matches": 2,
+        }
+    )
+    assert result["matches"] == 2 and "note" in result
+
+    # Blocks without a match are skipped whole, context is kept across blocks
+    regex = compile_pattern("^line 1500$")
+    (tmp_path / "big.txt").write_text(
+        "\n".join(f"line {i}" for i in range(1, 2001)), encoding="utf-8"
+    )
+    found = grep_file(str(tmp_path / "big.txt"), regex, context=1, chunk_size=16)
+    assert [(line.number, line.is_match) for line in found] == [
+        (1499, False),
+        (1500, True),
+        (1501, False),
+    ]
+
+    # Long lines are matched on their first bytes, without buffering the rest
+    (tmp_path / "minified.js").write_bytes(
+        b"key" + b"x" * 100_000 + b"late\nnext key\n" + b"y" * 50_000
+    )
+    regex = compile_pattern("key|late")
+    found = grep_file(
+        str(tmp_path / "minified.js"), regex, chunk_size=1000, max_line_bytes=5000
+    )
+    assert [line.number for line in found] == [1, 2]
+    assert found[0].text.endswith("...") and found[1].text == "next key"